@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     ribbonBenchmark
+@Author     ROOT
+
+@brief ribbon性能测试
+按参数生成N个category × M个pannel × K个action的ribbon（混合gallery和自定义窗口），
+对SARibbonBar的四种风格分别统计：
+    构建耗时、第一次绘制耗时、调整尺寸的吞吐量、切换标签页的延迟
+默认在QT_QPA_PLATFORM=offscreen下运行，结果为json，可保存后对比不同版本
+结果中记录了测试时的Python、Qt、PyQt版本、平台和样式，只有环境相同的结果才能直接对比
+
+@code
+python benchmark/ribbonBenchmark.py -n 10 -m 6 -k 8 --repeat 3 -o result.json
+python benchmark/ribbonBenchmark.py --styles OfficeStyle WpsLiteStyle
+@endcode
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+from typing import Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5.QtCore import QObject, QEvent, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtGui import QIcon, QPixmap, QColor
+from PyQt5.QtWidgets import QApplication, QAction, QComboBox, QLineEdit, QCheckBox
+
+from PySARibbon import SARibbonMainWindow, SARibbonBar, SARibbonCategory, SARibbonPannel, SARibbonGallery
+
+STYLES = {
+    'OfficeStyle': SARibbonBar.OfficeStyle,
+    'OfficeStyleTwoRow': SARibbonBar.OfficeStyleTwoRow,
+    'WpsLiteStyle': SARibbonBar.WpsLiteStyle,
+    'WpsLiteStyleTwoRow': SARibbonBar.WpsLiteStyleTwoRow,
+}
+ICON_COLORS = ['#2b579a', '#217346', '#b7472a', '#80397b', '#c19c00', '#0078d4']
+
+
+class PaintWatcher(QObject):
+    """记录窗口收到的绘制事件"""
+    def __init__(self, widget):
+        super().__init__(widget)
+        self.m_paintCount = 0
+        widget.installEventFilter(self)
+
+    def paintCount(self) -> int:
+        return self.m_paintCount
+
+    def eventFilter(self, watched, e) -> bool:
+        if e.type() == QEvent.Paint:
+            self.m_paintCount += 1
+        return False
+
+
+class RibbonBenchmark:
+    def __init__(self, categoryCount: int, pannelCount: int, actionCount: int):
+        self.m_categoryCount = categoryCount
+        self.m_pannelCount = pannelCount
+        self.m_actionCount = actionCount
+        self.m_icons: List[QIcon] = list()
+        for color in ICON_COLORS:
+            pixmap = QPixmap(32, 32)
+            pixmap.fill(QColor(color))
+            self.m_icons.append(QIcon(pixmap))
+
+    def icon(self, i: int) -> QIcon:
+        return self.m_icons[i % len(self.m_icons)]
+
+    def createPannel(self, window: SARibbonMainWindow, page: SARibbonCategory, ci: int, pi: int):
+        """
+        生成一个pannel，action按 大、小、小、中、中 的顺序循环，
+        每4个pannel中有一个带gallery，一个带自定义窗口
+        """
+        pannel: SARibbonPannel = page.addPannel('Pannel %d-%d' % (ci, pi))
+        for ai in range(self.m_actionCount):
+            act = QAction(self.icon(ci + pi + ai), 'Action %d-%d-%d' % (ci, pi, ai), window)
+            act.setObjectName('act_%d_%d_%d' % (ci, pi, ai))
+            kind = ai % 5
+            if kind == 0:
+                pannel.addLargeAction(act)
+            elif kind < 3:
+                pannel.addSmallAction(act)
+            else:
+                pannel.addMediumAction(act)
+        if pi % 4 == 2:
+            combo = QComboBox(window)
+            combo.addItems(['item %d' % i for i in range(5)])
+            pannel.addSmallWidget(combo)
+            pannel.addSmallWidget(QLineEdit(window))
+            pannel.addSmallWidget(QCheckBox('check', window))
+        elif pi % 4 == 3:
+            pannel.addSeparator()
+            gallery = SARibbonGallery(pannel)
+            group = gallery.addGalleryGroup()
+            for i in range(10):
+                group.addItem(str(i + 1), self.icon(i))
+            pannel.addGallery(gallery)
+
+    def build(self, window: SARibbonMainWindow):
+        ribbon: SARibbonBar = window.ribbonBar()
+        for ci in range(self.m_categoryCount):
+            page = ribbon.addCategoryPage('Category %d' % ci)
+            page.setObjectName('category_%d' % ci)
+            for pi in range(self.m_pannelCount):
+                self.createPannel(window, page, ci, pi)
+
+    @staticmethod
+    def processEvents(app: QApplication):
+        app.sendPostedEvents()
+        app.processEvents()
+
+    def run(self, app: QApplication, style: int, resizeWidths: List[int], switchRounds: int,
+            isPrewarm: bool) -> Dict[str, float]:
+        """运行一次完整的测试，返回各项耗时，单位ms"""
+        result = dict()
+        # 构建
+        t0 = time.perf_counter()
+        window = SARibbonMainWindow()
+        window.setIdlePrewarmEnabled(isPrewarm)
+        ribbon: SARibbonBar = window.ribbonBar()
+        ribbon.setRibbonStyle(style)
+        self.build(window)
+        result['build_ms'] = (time.perf_counter() - t0) * 1000
+        # 第一次绘制
+        watcher = PaintWatcher(ribbon)
+        window.resize(resizeWidths[0], 600)
+        t0 = time.perf_counter()
+        window.show()
+        deadline = t0 + 10
+        while watcher.paintCount() == 0 and time.perf_counter() < deadline:
+            self.processEvents(app)
+        result['first_paint_ms'] = (time.perf_counter() - t0) * 1000
+        self.processEvents(app)
+        # 调整尺寸
+        durations = list()
+        for w in resizeWidths:
+            t0 = time.perf_counter()
+            window.resize(w, 600)
+            self.processEvents(app)
+            durations.append((time.perf_counter() - t0) * 1000)
+        result.update(self.summarize('resize', durations))
+        total = sum(durations)
+        result['resize_per_second'] = len(durations) / total * 1000 if total > 0 else 0.0
+        # 切换标签页，第一轮为冷启动（首次显示各标签页），之后为热切换
+        count = ribbon.ribbonTabBar().count()
+        cold, warm = list(), list()
+        for r in range(switchRounds + 1):
+            for i in list(range(1, count)) + [0]:
+                t0 = time.perf_counter()
+                ribbon.setCurrentIndex(i)
+                self.processEvents(app)
+                (cold if r == 0 else warm).append((time.perf_counter() - t0) * 1000)
+        result.update(self.summarize('tab_switch_cold', cold))
+        result.update(self.summarize('tab_switch_warm', warm))
+        window.close()
+        window.deleteLater()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        return result
+
+    @staticmethod
+    def summarize(name: str, durations: List[float]) -> Dict[str, float]:
+        if not durations:
+            return dict()
+        s = sorted(durations)
+        return {
+            name + '_mean_ms': statistics.mean(s),
+            name + '_median_ms': statistics.median(s),
+            name + '_p95_ms': s[min(len(s) - 1, int(len(s) * 0.95))],
+            name + '_max_ms': s[-1],
+            name + '_count': len(s),
+        }
+
+
+def resizeSequence(maxWidth: int, minWidth: int, steps: int) -> List[int]:
+    """从maxWidth缩小到minWidth再放大回来"""
+    steps = max(steps, 2)
+    down = [int(maxWidth - (maxWidth - minWidth) * i / (steps - 1)) for i in range(steps)]
+    return down + down[-2::-1]
+
+
+def aggregate(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    """多次运行取中位数"""
+    keys = runs[0].keys()
+    return {k: statistics.median(r[k] for r in runs) for k in keys}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='SARibbon benchmark')
+    parser.add_argument('-n', '--categories', type=int, default=8, help='category数量')
+    parser.add_argument('-m', '--pannels', type=int, default=6, help='每个category的pannel数量')
+    parser.add_argument('-k', '--actions', type=int, default=8, help='每个pannel的action数量')
+    parser.add_argument('--styles', nargs='+', choices=list(STYLES.keys()), default=list(STYLES.keys()))
+    parser.add_argument('--repeat', type=int, default=3, help='每种风格的重复次数，结果取中位数')
+    parser.add_argument('--resize-steps', type=int, default=20, help='调整尺寸的步数')
+    parser.add_argument('--max-width', type=int, default=1600)
+    parser.add_argument('--min-width', type=int, default=600)
+    parser.add_argument('--switch-rounds', type=int, default=3, help='热切换标签页的轮数')
+    parser.add_argument('--prewarm', action='store_true', help='开启空闲预热，默认关闭以测量原始的切换延迟')
+    parser.add_argument('-o', '--output', default='', help='结果保存的json文件，默认输出到stdout')
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    environment = {
+        'python': '%s %s' % (platform.python_implementation(), platform.python_version()),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'platform': platform.platform(),
+        'qpa': app.platformName(),
+        'style': app.style().objectName(),
+    }
+    print(' '.join('%s=%s' % kv for kv in environment.items()), file=sys.stderr)
+    bench = RibbonBenchmark(args.categories, args.pannels, args.actions)
+    widths = resizeSequence(args.max_width, args.min_width, args.resize_steps)
+    results = list()
+    for name in args.styles:
+        runs = [bench.run(app, STYLES[name], widths, args.switch_rounds, args.prewarm) for _ in range(args.repeat)]
+        res = {'style': name}
+        res.update(aggregate(runs))
+        results.append(res)
+        print('%-20s build %8.1fms  first paint %7.1fms  resize %7.1f/s  tab switch cold %6.1fms warm %6.1fms' % (
+            name, res['build_ms'], res['first_paint_ms'], res['resize_per_second'],
+            res['tab_switch_cold_median_ms'], res['tab_switch_warm_median_ms']), file=sys.stderr)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'environment': environment,
+            'params': {'categories': args.categories, 'pannels': args.pannels, 'actions': args.actions,
+                       'repeat': args.repeat, 'resize_widths': widths, 'switch_rounds': args.switch_rounds,
+                       'prewarm': args.prewarm},
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonActionRegistry
+@Author     ROOT
+
+@brief ribbon中action位置的注册表
+记录每个QAction在ribbon中的所有位置(category, pannel, 按钮)，以及每个category、pannel、按钮对应的action，
+用于高亮、快捷提示、搜索跳转等需要从action找到按钮的场合，查询都是常数时间
+
+注册表由SARibbonBar.actionRegistry()第一次调用时创建，创建时扫描一次已有的内容，
+之后由pannel的actionEvent、category的pannel增删、ribbonbar的category增删增量更新，
+还没有构建的延迟构建category不会因注册表而构建，其中的action在构建完成后才会注册，
+没有创建注册表时这些地方没有任何额外开销
+@code
+registry = ribbon.actionRegistry()
+for placement in registry.placements(act):
+    ribbon.raiseCategory(placement.category)
+registry.placementAdded.connect(onPlacementAdded)
+@endcode
+"""
+from typing import Dict, List, Union
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QAction, QWidget
+
+from .SAWidgets.SARibbonToolButton import SARibbonToolButton
+from .SARibbonPannel import SARibbonPannel
+
+
+class SARibbonActionPlacement:
+    def __init__(self, action: QAction, category: QWidget, pannel: SARibbonPannel, widget: QWidget):
+        self.action = action
+        self.category = category
+        self.pannel = pannel
+        self.widget = widget    # action对应的窗口，一般为SARibbonToolButton，QWidgetAction为其自定义窗口
+        self.button: Union[SARibbonToolButton, None] = widget if isinstance(widget, SARibbonToolButton) else None
+
+
+class SARibbonActionRegistry(QObject):
+    def __init__(self, bar):
+        super().__init__(bar)
+        self.m_bar = bar
+        self.m_byAction: Dict[QAction, Dict[SARibbonPannel, SARibbonActionPlacement]] = dict()
+        self.m_byPannel: Dict[SARibbonPannel, Dict[QAction, SARibbonActionPlacement]] = dict()
+        self.m_byCategory: Dict[QWidget, Dict[SARibbonPannel, None]] = dict()
+        self.m_byWidget: Dict[QWidget, SARibbonActionPlacement] = dict()
+        self.m_pannelCategory: Dict[SARibbonPannel, QWidget] = dict()
+        for category in bar.categoryPages():
+            self.addCategory(category)
+
+    # 查询
+    def placements(self, action: QAction) -> List[SARibbonActionPlacement]:
+        """action在ribbon中的所有位置，按添加顺序"""
+        return list(self.m_byAction.get(action, dict()).values())
+
+    def isPlaced(self, action: QAction) -> bool:
+        return action in self.m_byAction
+
+    def buttons(self, action: QAction) -> List[SARibbonToolButton]:
+        """action对应的所有按钮"""
+        return [p.button for p in self.m_byAction.get(action, dict()).values() if p.button is not None]
+
+    def categories(self, action: QAction) -> List[QWidget]:
+        """action所在的所有category，不重复"""
+        return list(dict.fromkeys(p.category for p in self.m_byAction.get(action, dict()).values()))
+
+    def placement(self, action: QAction, pannel: SARibbonPannel) -> Union[SARibbonActionPlacement, None]:
+        """action在pannel中的位置"""
+        return self.m_byAction.get(action, dict()).get(pannel, None)
+
+    def placementOfWidget(self, widget: QWidget) -> Union[SARibbonActionPlacement, None]:
+        """按钮(或自定义窗口)对应的位置"""
+        return self.m_byWidget.get(widget, None)
+
+    def actionOfWidget(self, widget: QWidget) -> Union[QAction, None]:
+        p = self.m_byWidget.get(widget, None)
+        return p.action if p else None
+
+    def actionsOfPannel(self, pannel: SARibbonPannel) -> List[QAction]:
+        return list(self.m_byPannel.get(pannel, dict()).keys())
+
+    def actionsOfCategory(self, category: QWidget) -> List[QAction]:
+        actions = list()
+        for pannel in self.m_byCategory.get(category, dict()):
+            actions.extend(self.m_byPannel[pannel].keys())
+        return list(dict.fromkeys(actions))
+
+    def actions(self) -> List[QAction]:
+        """所有放置在ribbon中的action"""
+        return list(self.m_byAction.keys())
+
+    # 更新，由SARibbonBar、SARibbonCategory、SARibbonPannel调用
+    def addCategory(self, category: QWidget):
+        if category in self.m_byCategory:
+            return
+        self.m_byCategory[category] = dict()
+        if hasattr(category, 'isRealized') and not category.isRealized():
+            # 延迟构建的category不在这里构建，构建时通过insertPannel逐个注册pannel
+            return
+        for pannel in category.pannelList():
+            self.addPannel(category, pannel)
+
+    def removeCategory(self, category: QWidget):
+        pannels = self.m_byCategory.get(category, None)
+        if pannels is None:
+            return
+        for pannel in list(pannels):
+            self.removePannel(pannel)
+        del self.m_byCategory[category]
+
+    def addPannel(self, category: QWidget, pannel: SARibbonPannel):
+        if category not in self.m_byCategory or pannel in self.m_pannelCategory:
+            return
+        self.m_byCategory[category][pannel] = None
+        self.m_pannelCategory[pannel] = category
+        self.m_byPannel[pannel] = dict()
+        for item in pannel.ribbonPannelItem():
+            if item.action is not None:
+                self.addAction(pannel, item.action)
+
+    def removePannel(self, pannel: SARibbonPannel):
+        category = self.m_pannelCategory.pop(pannel, None)
+        if category is None:
+            return
+        for action in list(self.m_byPannel[pannel]):
+            self.removeAction(pannel, action)
+        del self.m_byPannel[pannel]
+        self.m_byCategory[category].pop(pannel, None)
+
+    def addAction(self, pannel: SARibbonPannel, action: QAction):
+        """pannel添加了action，pannel还没有注册时忽略，pannel注册时会统一添加"""
+        actions = self.m_byPannel.get(pannel, None)
+        if actions is None or action in actions:
+            return
+        index = pannel.actionIndex(action)
+        widget = pannel.ribbonPannelItem()[index].widget() if index >= 0 else None
+        placement = SARibbonActionPlacement(action, self.m_pannelCategory[pannel], pannel, widget)
+        actions[action] = placement
+        self.m_byAction.setdefault(action, dict())[pannel] = placement
+        if widget is not None:
+            self.m_byWidget[widget] = placement
+        self.placementAdded.emit(action, pannel)
+
+    def removeAction(self, pannel: SARibbonPannel, action: QAction):
+        actions = self.m_byPannel.get(pannel, None)
+        if actions is None:
+            return
+        placement = actions.pop(action, None)
+        if placement is None:
+            return
+        byPannel = self.m_byAction[action]
+        del byPannel[pannel]
+        if not byPannel:
+            del self.m_byAction[action]
+        if placement.widget is not None:
+            self.m_byWidget.pop(placement.widget, None)
+        self.placementRemoved.emit(action, pannel)
+
+    # 信号
+    placementAdded = pyqtSignal(QAction, QWidget)     # action被放置到pannel中
+    placementRemoved = pyqtSignal(QAction, QWidget)   # action从pannel中移除
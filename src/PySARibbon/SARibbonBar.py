@@ -48,9 +48,12 @@ de setupRibbonUi():
 @endcode
 """
 import PySARibbon.resource_rc
-from typing import List, Union
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Union
 from PyQt5.QtCore import Qt, QSize, pyqtSignal, QObject, QEvent, QRect, QPoint, QMargins
-from PyQt5.QtGui import QIcon, QPainter, QColor, QResizeEvent, QMouseEvent, QPen, QHoverEvent, QCursor
+from PyQt5.QtGui import QIcon, QPainter, QPixmap, QColor, QResizeEvent, QMouseEvent, QPen, QHoverEvent, QCursor, \
+    QRegion
 from PyQt5.QtWidgets import QMenuBar, QAbstractButton, QApplication, QAction, QFrame, QStyle
 
 from .SAWidgets.SARibbonStackedWidget import SARibbonStackedWidget
@@ -60,7 +63,12 @@ from .SARibbonButtonGroupWidget import SARibbonButtonGroupWidget
 from .SARibbonQuickAccessBar import SARibbonQuickAccessBar
 from .SARibbonPannel import SARibbonPannel
 from .SARibbonCategory import SARibbonCategory
+from .SARibbonLazyCategory import SARibbonLazyCategory
 from .SARibbonContextCategory import SARibbonContextCategory
+from .SARibbonPrewarmScheduler import SARibbonPrewarmScheduler
+from .SARibbonGeometryScheduler import SARibbonGeometryScheduler
+from .SARibbonActionRegistry import SARibbonActionRegistry
+from .SARibbonTabSwitchTracer import SARibbonTabSwitchTracer
 
 
 class _SAContextCategoryManagerData:
@@ -98,6 +106,23 @@ class SARibbonBarPrivate:
         self.mHidedCategoryList: List[_SARibbonTabData] = list()
         self.mContextCategoryList: List[SARibbonContextCategory] = list()   # 存放所有的上下文标签
         self.currentShowingContextCategory: List[_SAContextCategoryManagerData] = list()
+        # 批量更新
+        self.batchUpdateDepth = 0                               # batchUpdate的嵌套层数
+        self.geometryScheduler: SARibbonGeometryScheduler = None  # 合并resize和category布局的请求
+        self.prewarmScheduler: SARibbonPrewarmScheduler = None  # 空闲时预热非当前标签页
+        self.tabSwitchTracer: SARibbonTabSwitchTracer = None    # 标签页切换延迟的跟踪
+        self.actionRegistry: SARibbonActionRegistry = None      # action位置的注册表
+        # 查找索引，第一次查找时建立，之后随tab、stacked中category的增删、移动和改名只更新受影响的部分
+        self.tabIndexCache: Union[Dict[SARibbonCategory, int], None] = None  # category -> tab索引
+        self.titleIndexCache: Union[Dict[str, SARibbonCategory], None] = None  # 标题 -> category
+        self.objectNameIndexCache: Union[Dict[str, SARibbonCategory], None] = None  # objectName -> category
+        self.isEditingStacked = False               # 正在移除或移动stacked中的窗口，索引由调用者更新
+        # 绘制缓存
+        self.chromeCache: QPixmap = None            # 背景和上下文标签色带的预渲染结果
+        self.chromeCacheKey = None
+        self.contextTabRects: List[Union[QRect, None]] = list()   # 上下文标签色带的区域
+        self.contextTabRectsKey = None
+        self.lastTitleRegion = QRect()              # 上一次绘制标题的区域，标题改变时只刷新这个区域
         # contextCategory的色系
         self.mContextCategoryColorList: List[QColor] = [
             QColor(201, 89, 156),   # 玫红
@@ -124,10 +149,126 @@ class SARibbonBarPrivate:
         self.stackedContainerWidget.setObjectName("objSAStackedContainerWidget")
         self.stackedContainerWidget.hidWindow.connect(self.mainClass.onStackWidgetHided)
         self.stackedContainerWidget.installEventFilter(self.mainClass)
+        # category被删除时会从stacked中移除
+        self.stackedContainerWidget.widgetRemoved.connect(self.onStackedWidgetRemoved)
 
         self.quickAccessBar.setObjectName("objSARibbonQuickAccessBar")
         self.setNormalMode()
 
+    def invalidateIndexes(self):
+        """无法知道变化了哪些category时调用(外部直接修改了tabbar或删除了category)，下一次查找时重建"""
+        self.tabIndexCache = None
+        self.titleIndexCache = None
+        self.objectNameIndexCache = None
+
+    def onStackedWidgetRemoved(self, index: int):
+        if not self.isEditingStacked:
+            self.invalidateIndexes()
+
+    def tabCategory(self, index: int) -> Union[SARibbonCategory, None]:
+        var: _SARibbonTabData = self.ribbonTabBar.tabData(index)
+        return var.category if var else None
+
+    def reindexTabs(self, start: int, end: int = None):
+        """
+        [start, end)范围内的tab位置发生了变化，只更新这些tab的category索引，end为None时到末尾
+        重复的category取第一个，索引小于start的不受影响
+        """
+        index = self.tabIndexCache
+        if index is None:
+            return
+        end = self.ribbonTabBar.count() if end is None else end
+        for i in range(end - 1, start - 1, -1):
+            category = self.tabCategory(i)
+            if category is not None and index.get(category, start) >= start:
+                index[category] = i
+
+    def tabIndexOf(self, category: SARibbonCategory) -> int:
+        """category在tabbar中的索引，不在tabbar中返回-1"""
+        if self.tabIndexCache is None:
+            cache = dict()
+            for i in range(self.ribbonTabBar.count()):
+                var: _SARibbonTabData = self.ribbonTabBar.tabData(i)
+                if var and var.category is not None:
+                    cache.setdefault(var.category, i)
+            self.tabIndexCache = cache
+        return self.tabIndexCache.get(category, -1)
+
+    def buildNameIndex(self):
+        """按stacked中的顺序建立标题和objectName的索引，重名时取第一个，和逐个查找的结果一致"""
+        titles = dict()
+        names = dict()
+        for i in range(self.stackedContainerWidget.count()):
+            w = self.stackedContainerWidget.widget(i)
+            if w:
+                titles.setdefault(w.windowTitle(), w)
+                names.setdefault(w.objectName(), w)
+        self.titleIndexCache = titles
+        self.objectNameIndexCache = names
+
+    def updateNameIndex(self, titles: List[str], objectNames: List[str]):
+        """重新确定这些标题、objectName对应的category，其他名字的索引不受影响"""
+        if self.titleIndexCache is None:
+            return
+        titles = set(titles)
+        objectNames = set(objectNames)
+        for name in titles:
+            self.titleIndexCache.pop(name, None)
+        for name in objectNames:
+            self.objectNameIndexCache.pop(name, None)
+        for i in range(self.stackedContainerWidget.count()):
+            w = self.stackedContainerWidget.widget(i)
+            if not w:
+                continue
+            if w.windowTitle() in titles:
+                self.titleIndexCache.setdefault(w.windowTitle(), w)
+            if w.objectName() in objectNames:
+                self.objectNameIndexCache.setdefault(w.objectName(), w)
+
+    def onCategoryRenamed(self, category: SARibbonCategory):
+        """category的标题或objectName改变后调用，原来的名字从索引中查找"""
+        if self.titleIndexCache is None:
+            return
+        titles = [name for name, c in self.titleIndexCache.items() if c is category]
+        objectNames = [name for name, c in self.objectNameIndexCache.items() if c is category]
+        titles.append(category.windowTitle())
+        objectNames.append(category.objectName())
+        self.updateNameIndex(titles, objectNames)
+
+    def stackedInserted(self, category: SARibbonCategory):
+        """category加入stacked后调用"""
+        self.updateNameIndex([category.windowTitle()], [category.objectName()])
+
+    def removeStackedWidget(self, category: SARibbonCategory):
+        """从stacked中移除category并更新名字索引"""
+        self.isEditingStacked = True
+        try:
+            self.stackedContainerWidget.removeWidget(category)
+        finally:
+            self.isEditingStacked = False
+        self.updateNameIndex([category.windowTitle()], [category.objectName()])
+
+    def moveStackedWidget(self, fr: int, to: int):
+        """移动stacked中的窗口，只更新移动范围内category的名字索引"""
+        self.isEditingStacked = True
+        try:
+            self.stackedContainerWidget.moveWidget(fr, to)
+        finally:
+            self.isEditingStacked = False
+        ws = [self.stackedContainerWidget.widget(i) for i in range(min(fr, to), max(fr, to) + 1)]
+        ws = [w for w in ws if w]
+        self.updateNameIndex([w.windowTitle() for w in ws], [w.objectName() for w in ws])
+
+    def categoryOfTitle(self, title: str) -> Union[SARibbonCategory, None]:
+        if self.titleIndexCache is None:
+            self.buildNameIndex()
+        return self.titleIndexCache.get(title, None)
+
+    def categoryOfObjectName(self, objname: str) -> Union[SARibbonCategory, None]:
+        if self.objectNameIndexCache is None:
+            self.buildNameIndex()
+        return self.objectNameIndexCache.get(objname, None)
+
     def setApplicationButton(self, btn: QAbstractButton):
         if not btn:
             return
@@ -147,6 +288,80 @@ class SARibbonBarPrivate:
                 return True
         return False
 
+    def tabInserted(self, index: int):
+        """在index插入了一个tab并设置了tabData后调用，之后的上下文标签tab索引加1"""
+        self.reindexTabs(index)
+        for ccd in self.currentShowingContextCategory:
+            ccd.tabPageIndex = [i + 1 if i >= index else i for i in ccd.tabPageIndex]
+
+    def tabRemoved(self, index: int, category: SARibbonCategory):
+        """移除了index处category的tab，之后的上下文标签tab索引减1"""
+        if self.tabIndexCache is not None:
+            if self.tabIndexCache.get(category, -1) == index:
+                del self.tabIndexCache[category]
+            self.reindexTabs(index)
+        for ccd in self.currentShowingContextCategory:
+            ccd.tabPageIndex = [i - 1 if i > index else i for i in ccd.tabPageIndex if i != index]
+
+    def tabMoved(self, fr: int, to: int):
+        """tab从fr移动到to，上下文标签的tab索引随之调整"""
+        self.reindexTabs(min(fr, to), max(fr, to) + 1)
+        for ccd in self.currentShowingContextCategory:
+            indexs = list()
+            for i in ccd.tabPageIndex:
+                if i == fr:
+                    i = to
+                elif fr < i <= to:
+                    i -= 1
+                elif to <= i < fr:
+                    i += 1
+                indexs.append(i)
+            ccd.tabPageIndex = sorted(indexs)
+
+    def appendContextTabs(self, context: SARibbonContextCategory):
+        """在末尾添加上下文标签的tab"""
+        contextCategoryData = _SAContextCategoryManagerData()
+        contextCategoryData.contextCategory = context
+        start = self.ribbonTabBar.count()
+        mode = SARibbonPannel.TwoRowMode if self.mainClass.isTwoRowStyle() else SARibbonPannel.ThreeRowMode
+        for i in range(context.categoryCount()):
+            category = context.categoryPage(i)
+            category.setRibbonPannelLayoutMode(mode)
+            index = self.ribbonTabBar.addTab(category.windowTitle())
+            contextCategoryData.tabPageIndex.append(index)
+
+            tabdata = _SARibbonTabData()
+            tabdata.category = category
+            tabdata.index = index
+            self.ribbonTabBar.setTabData(index, tabdata)
+        self.currentShowingContextCategory.append(contextCategoryData)
+        self.reindexTabs(start)
+
+    def removeContextTabs(self, contexts: List[SARibbonContextCategory]):
+        """一次移除多个上下文标签的tab，剩下的上下文标签tab索引按移除的数量调整"""
+        removed = list()
+        keep = list()
+        for ccd in self.currentShowingContextCategory:
+            if any(ccd.compare(c) for c in contexts):
+                removed.extend(i for i in ccd.tabPageIndex if i >= 0)
+            else:
+                keep.append(ccd)
+        if len(keep) == len(self.currentShowingContextCategory):
+            return False
+        removed.sort()
+        cache = self.tabIndexCache
+        for index in reversed(removed):
+            category = self.tabCategory(index)
+            self.ribbonTabBar.removeTab(index)
+            if cache is not None and cache.get(category, -1) == index:
+                del cache[category]
+        for ccd in keep:
+            ccd.tabPageIndex = [i - bisect_left(removed, i) for i in ccd.tabPageIndex]
+        self.currentShowingContextCategory = keep
+        if removed:
+            self.reindexTabs(removed[0])
+        return True
+
     def setHideMode(self):
         self.currentRibbonMode = SARibbonBar.MinimumRibbonMode
         self.stackedContainerWidget.setPopupMode()
@@ -183,7 +398,7 @@ class SARibbonBar(QMenuBar):
             parent.windowTitleChanged.connect(self.onWindowTitleChanged)
             parent.windowIconChanged.connect(self.onWindowIconChanged)
         # 重绘，若不执行此，会出现刚开始applicationButton尺寸异常
-        QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
+        self.requestResize()
 
     @staticmethod
     def checkTwoRowStyle(style) -> bool:    # C++为isTwoRowStyle
@@ -210,7 +425,7 @@ class SARibbonBar(QMenuBar):
         """
         self.m_d.setApplicationButton(btn)
         # 无论设置什么都触发resize
-        QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
+        self.requestResize()
 
     def ribbonTabBar(self) -> SARibbonTabBar:
         """
@@ -244,8 +459,13 @@ class SARibbonBar(QMenuBar):
             tabdata.category = category
             tabdata.index = index
             self.m_d.ribbonTabBar.setTabData(index, tabdata)
+            self.m_d.reindexTabs(index)
             self.m_d.stackedContainerWidget.insertWidget(index, category)
+            self.m_d.stackedInserted(category)
+            if self.m_d.actionRegistry is not None:
+                self.m_d.actionRegistry.addCategory(category)
             category.windowTitleChanged.connect(self.onCategoryWindowTitleChanged)
+            category.objectNameChanged.connect(self.onCategoryObjectNameChanged)
 
     def insertCategoryPage(self, *__args):
         """在index添加一个category，如果当前category数量少于index，则插入到最后
@@ -266,6 +486,7 @@ class SARibbonBar(QMenuBar):
         else:
             category: SARibbonCategory = __args[0]
             index = __args[1]
+            category.setRibbonBar(self)
             i = self.m_d.ribbonTabBar.insertTab(index, category.windowTitle())
             mode = SARibbonPannel.TwoRowMode if self.isTwoRowStyle() else SARibbonPannel.ThreeRowMode
             category.setRibbonPannelLayoutMode(mode)
@@ -274,27 +495,124 @@ class SARibbonBar(QMenuBar):
             tabdata.category = category
             tabdata.index = i
             self.m_d.ribbonTabBar.setTabData(i, tabdata)
+            self.m_d.tabInserted(i)
             self.m_d.stackedContainerWidget.insertWidget(index, category)
+            self.m_d.stackedInserted(category)
+            if self.m_d.actionRegistry is not None:
+                self.m_d.actionRegistry.addCategory(category)
             category.windowTitleChanged.connect(self.onCategoryWindowTitleChanged)
-            QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
+            category.objectNameChanged.connect(self.onCategoryObjectNameChanged)
+            self.requestResize()
+
+    def addLazyCategoryPage(self, title: str, factory) -> SARibbonLazyCategory:
+        """
+        添加一个延迟构建的标签，factory为构建函数，参数为标签页本身
+        标签页的pannel在第一次切换到此标签或调用prewarmCategory时才会创建
+        """
+        category = SARibbonLazyCategory(title, factory, self)
+        self.addCategoryPage(category)
+        return category
+
+    def insertLazyCategoryPage(self, title: str, factory, index: int) -> SARibbonLazyCategory:
+        """在index插入一个延迟构建的标签，参考addLazyCategoryPage"""
+        category = SARibbonLazyCategory(title, factory, self)
+        self.insertCategoryPage(category, index)
+        return category
+
+    def prewarmCategory(self, category: SARibbonCategory) -> bool:
+        """提前构建延迟构建的标签，返回此次是否进行了构建"""
+        if isinstance(category, SARibbonLazyCategory):
+            return category.realize()
+        return False
+
+    def prewarmCategories(self):
+        """提前构建所有延迟构建的标签"""
+        for c in self.categoryPages():
+            self.prewarmCategory(c)
+
+    def prewarmScheduler(self) -> SARibbonPrewarmScheduler:
+        """空闲时预热非当前标签页的调度器，第一次调用时创建"""
+        if self.m_d.prewarmScheduler is None:
+            self.m_d.prewarmScheduler = SARibbonPrewarmScheduler(self)
+        return self.m_d.prewarmScheduler
+
+    def geometryScheduler(self) -> SARibbonGeometryScheduler:
+        """合并resize和category布局请求的调度器，第一次调用时创建"""
+        if self.m_d.geometryScheduler is None:
+            self.m_d.geometryScheduler = SARibbonGeometryScheduler(self)
+        return self.m_d.geometryScheduler
+
+    def actionRegistry(self) -> SARibbonActionRegistry:
+        """action位置的注册表，第一次调用时创建，之后随ribbon的内容增量更新"""
+        if self.m_d.actionRegistry is None:
+            self.m_d.actionRegistry = SARibbonActionRegistry(self)
+        return self.m_d.actionRegistry
+
+    def existingActionRegistry(self) -> Union[SARibbonActionRegistry, None]:
+        """已经创建的action注册表，还没有创建时返回None，不会创建注册表"""
+        return self.m_d.actionRegistry
+
+    def tabSwitchTracer(self) -> SARibbonTabSwitchTracer:
+        """标签页切换延迟的跟踪器，第一次调用时创建，默认不开启"""
+        if self.m_d.tabSwitchTracer is None:
+            self.m_d.tabSwitchTracer = SARibbonTabSwitchTracer(self)
+        return self.m_d.tabSwitchTracer
+
+    def beginBatchUpdate(self):
+        """
+        开始批量更新，期间添加category、pannel、action不会触发布局、resize和重绘，
+        直到对应的endBatchUpdate后统一处理一次，可嵌套调用
+        """
+        self.m_d.batchUpdateDepth += 1
+        if self.m_d.batchUpdateDepth == 1:
+            self.setUpdatesEnabled(False)
+
+    def endBatchUpdate(self):
+        """结束批量更新，最外层结束时统一进行布局和重绘"""
+        if self.m_d.batchUpdateDepth <= 0:
+            return
+        self.m_d.batchUpdateDepth -= 1
+        if self.m_d.batchUpdateDepth > 0:
+            return
+        self.geometryScheduler().batchFinished()
+        self.setUpdatesEnabled(True)
+
+    def isBatchUpdating(self) -> bool:
+        """是否处于批量更新过程中"""
+        return self.m_d.batchUpdateDepth > 0
+
+    @contextmanager
+    def batchUpdate(self):
+        """
+        批量更新的上下文管理器
+        @code
+        with ribbon.batchUpdate():
+            page = ribbon.addCategoryPage('Main')
+            pannel = page.addPannel('File')
+            pannel.addActions([actNew, actOpen, actSave])
+        @endcode
+        """
+        self.beginBatchUpdate()
+        try:
+            yield self
+        finally:
+            self.endBatchUpdate()
+
+    def requestCategoryLayout(self, category: SARibbonCategory):
+        """请求category重新布局，同一轮事件循环中的请求合并为一次，批量更新过程中会推迟到批量结束"""
+        self.geometryScheduler().requestCategoryLayout(category)
+
+    def requestResize(self):
+        """请求ribbonbar重新布局，同一轮事件循环中的请求合并为一次，批量更新过程中会推迟到批量结束"""
+        self.geometryScheduler().requestResize()
 
     def categoryByName(self, title: str) -> Union[SARibbonCategory, None]:
         """通过名字查找Category"""
-        c = self.m_d.stackedContainerWidget.count()
-        for i in range(c):
-            w = self.m_d.stackedContainerWidget.widget(i)
-            if w and w.windowTitle() == title:
-                return w
-        return None
+        return self.m_d.categoryOfTitle(title)
 
     def categoryByObjectName(self, objname: str) -> Union[SARibbonCategory, None]:
         """通过ObjectName查找Category"""
-        c = self.m_d.stackedContainerWidget.count()
-        for i in range(c):
-            w = self.m_d.stackedContainerWidget.widget(i)
-            if w and w.objectName() == objname:
-                return w
-        return None
+        return self.m_d.categoryOfObjectName(objname)
 
     def categoryByIndex(self, index: int) -> Union[SARibbonCategory, None]:
         """
@@ -307,12 +625,12 @@ class SARibbonBar(QMenuBar):
 
     def hideCategory(self, category: SARibbonCategory):
         """隐藏category,并不会删除或者取走，只是隐藏"""
-        c = self.m_d.ribbonTabBar.count()
-        for i in range(c):
+        i = self.m_d.tabIndexOf(category)
+        if i >= 0:
             var: _SARibbonTabData = self.m_d.ribbonTabBar.tabData(i)
-            if var.category == category:
-                self.m_d.mHidedCategoryList.append(var)
-                self.m_d.ribbonTabBar.removeTab(i)  # 仅仅把tab移除
+            self.m_d.mHidedCategoryList.append(var)
+            self.m_d.ribbonTabBar.removeTab(i)  # 仅仅把tab移除
+            self.m_d.tabRemoved(i, category)
 
     def showCategory(self, category: SARibbonCategory):
         """显示被隐藏的category"""
@@ -321,6 +639,7 @@ class SARibbonBar(QMenuBar):
                 index = self.m_d.ribbonTabBar.insertTab(c.index, c.category.windowTitle())
                 c.index = index
                 self.m_d.ribbonTabBar.setTabData(index, c)
+                self.m_d.tabInserted(index)
                 self.m_d.mHidedCategoryList.pop(i)
                 return
         self.raiseCategory(category)
@@ -335,12 +654,7 @@ class SARibbonBar(QMenuBar):
         """
         获取category的索引
         """
-        cnt = self.m_d.ribbonTabBar.count()
-        for i in range(cnt):
-            c: _SARibbonTabData = self.m_d.ribbonTabBar.tabData(i)
-            if category == c.category:
-                return i
-        return -1
+        return self.m_d.tabIndexOf(category)
 
     def moveCategory(self, fr: int, to: int):
         """移动一个Category从fr index到to index"""
@@ -371,14 +685,21 @@ class SARibbonBar(QMenuBar):
         index = self.tabIndex(category)
         if index >= 0:
             self.m_d.ribbonTabBar.removeTab(index)
-        self.m_d.stackedContainerWidget.removeWidget(category)
-        # 同时验证这个category是否是contexcategory里的
+            self.m_d.tabRemoved(index, category)
+        self.m_d.removeStackedWidget(category)
+        if self.m_d.actionRegistry is not None:
+            self.m_d.actionRegistry.removeCategory(category)
+        try:
+            category.windowTitleChanged.disconnect(self.onCategoryWindowTitleChanged)
+            category.objectNameChanged.disconnect(self.onCategoryObjectNameChanged)
+        except TypeError:
+            pass
+        # 同时验证这个category是否是contexcategory里的，显示中的上下文标签tab索引已在tabRemoved中调整
         for c in self.m_d.mContextCategoryList:
             c.takeCategory(category)
-            self.updateContextCategoryManagerData()
         # 移除完后需要重绘
         self.repaint()
-        QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
+        self.requestResize()
 
     def addContextCategory(self, *_args) -> Union[None, SARibbonContextCategory]:
         """添加一个上下文标签
@@ -411,39 +732,40 @@ class SARibbonBar(QMenuBar):
 
     def showContextCategory(self, context: SARibbonContextCategory):
         """显示上下文标签"""
-        if self.isContextCategoryVisible(context):
-            return
-
-        contextCategoryData = _SAContextCategoryManagerData()
-        contextCategoryData.contextCategory = context
-        for i in range(context.categoryCount()):
-            category = context.categoryPage(i)
-            mode = SARibbonPannel.TwoRowMode if self.isTwoRowStyle() else SARibbonPannel.ThreeRowMode
-            category.setRibbonPannelLayoutMode(mode)
-            index = self.m_d.ribbonTabBar.addTab(category.windowTitle())
-            contextCategoryData.tabPageIndex.append(index)
-
-            tabdata = _SARibbonTabData()
-            tabdata.category = category
-            tabdata.index = index
-            self.m_d.ribbonTabBar.setTabData(index, tabdata)
-        self.m_d.currentShowingContextCategory.append(contextCategoryData)
-        QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
-        self.repaint()
+        self.setContextCategoriesVisible({context: True})
 
     def hideContextCategory(self, context: SARibbonContextCategory):
         """隐藏上下文标签"""
-        ishide = False
-        for i, category in enumerate(self.m_d.currentShowingContextCategory):
-            if context.compare(category.contextCategory):
-                indexs = category.tabPageIndex
-                for index in reversed(indexs):
-                    self.m_d.ribbonTabBar.removeTab(index)
-                self.m_d.currentShowingContextCategory.pop(i)
-                ishide = True
-        if ishide:
-            QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
-            self.repaint()
+        self.setContextCategoriesVisible({context: False})
+
+    def setContextCategoriesVisible(self, changes):
+        """
+        一次设置多个上下文标签的显示状态，changes为{上下文标签: 是否显示}或[(上下文标签, 是否显示), ...]
+        先统一隐藏，再按顺序显示，所有改变完成后只进行一次resize和重绘
+        @code
+        ribbon.setContextCategoriesVisible({ctxTable: True, ctxImage: False, ctxChart: True})
+        @endcode
+        """
+        items = changes.items() if isinstance(changes, dict) else changes
+        hides = list()
+        shows = list()
+        for context, visible in items:
+            isVisible = self.isContextCategoryVisible(context)
+            if visible and not isVisible and context not in shows:
+                shows.append(context)
+            elif not visible and isVisible and context not in hides:
+                hides.append(context)
+        if not hides and not shows:
+            return
+        with self.batchUpdate():
+            if hides:
+                self.m_d.removeContextTabs(hides)
+            for context in shows:
+                self.m_d.appendContextTabs(context)
+            self.requestResize()
+        # resize在这里立即进行，之后的重绘只有一次
+        self.geometryScheduler().flush()
+        self.update()
 
     def isContextCategoryVisible(self, context: SARibbonContextCategory) -> bool:
         """
@@ -474,10 +796,13 @@ class SARibbonBar(QMenuBar):
         # self.m_d.mContextCategoryList = [c for c in self.m_d.mContextCategoryList if c != context]
         res = context.categoryList()
         for c in res:
+            if self.m_d.actionRegistry is not None:
+                self.m_d.actionRegistry.removeCategory(c)
             c.hide()
+            self.m_d.removeStackedWidget(c)
             c.deleteLater()
         context.deleteLater()
-        QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
+        self.requestResize()
 
     def setMinimumMode(self, isMinimum: bool):
         """设置为最小/正常模式
@@ -570,6 +895,10 @@ class SARibbonBar(QMenuBar):
         """返回当前的tab索引"""
         return self.m_d.ribbonTabBar.currentIndex()
 
+    def currentCategory(self) -> Union[SARibbonCategory, None]:
+        """返回当前tab对应的category"""
+        return self.categoryByIndex(self.currentIndex())
+
     def raiseCategory(self, category: SARibbonCategory):
         """确保标签显示出来，tab并切换到对应页"""
         index = self.m_d.stackedContainerWidget.indexOf(category)
@@ -594,7 +923,7 @@ class SARibbonBar(QMenuBar):
 
         if obj == self.cornerWidget(Qt.TopLeftCorner) or obj == self.cornerWidget(Qt.TopRightCorner):
             if e.type() in [QEvent.UpdateLater, QEvent.MouseButtonRelease, QEvent.WindowActivate]:
-                QApplication.postEvent(self, QResizeEvent(self.size(), self.size()))
+                self.requestResize()
         elif obj == self.m_d.stackedContainerWidget:
             '''
             在stack 是popup模式时，点击的是stackedContainerWidget区域外的时候，如果是在ribbonTabBar上点击
@@ -650,12 +979,7 @@ class SARibbonBar(QMenuBar):
         """
         根据SARibbonCategory查找tabbar的index
         """
-        size = self.m_d.ribbonTabBar.count()
-        for i in range(size):
-            var = self.m_d.ribbonTabBar.tabData(i)
-            if category == var.category:
-                return i
-        return -1
+        return self.m_d.tabIndexOf(category)
 
     def updateRibbonElementGeometry(self):
         """根据样式调整SARibbonCategory的布局形式"""
@@ -776,111 +1100,165 @@ class SARibbonBar(QMenuBar):
     def paintInNormalStyle(self):
         """绘制Office Style背景"""
         p = QPainter(self)
-        self.paintBackground(p)
-
-        p.save()
-        # 显示上下文标签
-        contextCategoryRegion = QPoint(self.width(), -1)
-        for ccd in self.m_d.currentShowingContextCategory:
-            indexs = ccd.tabPageIndex
-            clr = ccd.contextCategory.contextColor()
-            if indexs:
-                contextTitleRect = QRect(self.m_d.ribbonTabBar.tabRect(indexs[0]))
-                endRect = QRect(self.m_d.ribbonTabBar.tabRect(indexs[-1]))
-                contextTitleRect.setRight(endRect.right())
-                contextTitleRect.translate(self.m_d.ribbonTabBar.x(), self.m_d.ribbonTabBar.y())
-                contextTitleRect.setHeight(self.m_d.ribbonTabBar.height()-1)    # 减1像素，避免tabbar基线覆盖
-                contextTitleRect -= self.m_d.ribbonTabBar.tabMargin()
-                # 把区域顶部扩展到窗口顶部
-                contextTitleRect.setTop(RibbonSubElementStyleOpt.widgetBord.top())
-                # 绘制
-                self.paintContextCategoryTab(p, ccd.contextCategory.contextTitle(), contextTitleRect, clr)
-                # 更新上下文标签的范围，用于控制标题栏的显示
-                if contextTitleRect.left() < contextCategoryRegion.x():
-                    contextCategoryRegion.setX(contextTitleRect.left())
-                if contextTitleRect.right() > contextCategoryRegion.y():
-                    contextCategoryRegion.setY(contextTitleRect.right())
-
-            if self.m_d.ribbonTabBar.currentIndex() in indexs:
-                pen = QPen()
-                pen.setColor(clr)
-                pen.setWidth(1)
-                p.setPen(pen)
-                p.setBrush(Qt.NoBrush)
-                p.drawRect(self.m_d.stackedContainerWidget.geometry())
-
-        p.restore()
+        # 背景和上下文标签的色带从缓存中贴图
+        p.drawPixmap(0, 0, self.chromePixmap())
         # 显示标题等
         parWindow = self.parentWidget()
         if parWindow:
-            titleRegion = QRect()
-            if contextCategoryRegion.y() < 0:
-                titleRegion.setRect(
-                    self.m_d.quickAccessBar.geometry().right()+1,
-                    RibbonSubElementStyleOpt.widgetBord.top(),
-                    self.width()-self.m_d.iconRightBorderPosition-RibbonSubElementStyleOpt.widgetBord.right()
-                    - self.m_d.windowButtonSize.width()-self.m_d.quickAccessBar.geometry().right()-1,
-                    RibbonSubElementStyleOpt.titleBarHeight,
-                )
-            else:
-                leftwidth = contextCategoryRegion.x() - self.m_d.quickAccessBar.geometry().right() - self.m_d.iconRightBorderPosition
-                rightwidth = self.width() - contextCategoryRegion.y() - self.m_d.windowButtonSize.width()
-                if rightwidth > leftwidth:  # 说明右边的区域大一点，标题显示在右
-                    titleRegion.setRect(
-                        contextCategoryRegion.y(),
-                        RibbonSubElementStyleOpt.widgetBord.top(),
-                        rightwidth,
-                        RibbonSubElementStyleOpt.titleBarHeight,
-                    )
-                else:   # 说明左边的区域大一点，标题显示在右
-                    titleRegion.setRect(
-                        self.m_d.iconRightBorderPosition+self.m_d.quickAccessBar.geometry().right(),
-                        RibbonSubElementStyleOpt.widgetBord.top(),
-                        leftwidth,
-                        RibbonSubElementStyleOpt.titleBarHeight,
-                    )
+            titleRegion = self.windowTitleRegion()
+            self.m_d.lastTitleRegion = QRect(titleRegion)
             self.paintWindowTitle(p, parWindow.windowTitle(), titleRegion)
             self.paintWindowIcon(p, parWindow.windowIcon())
 
     def paintInWpsLiteStyle(self):
         """绘制WPS Style背景"""
         p = QPainter(self)
-        self.paintBackground(p)
+        p.drawPixmap(0, 0, self.chromePixmap())
 
-        p.save()
+        # 显示标题等
+        parWindow = self.parentWidget()
+        if parWindow:
+            titleRegion = self.windowTitleRegion()
+            self.m_d.lastTitleRegion = QRect(titleRegion)
+            if titleRegion.isValid():
+                self.paintWindowTitle(p, parWindow.windowTitle(), titleRegion)
+                self.paintWindowIcon(p, parWindow.windowIcon())
+
+    def contextCategoryTabRects(self) -> List[Union[QRect, None]]:
+        """
+        显示中的上下文标签对应的色带区域，和currentShowingContextCategory一一对应，没有标签页的为None
+        结果按标签的布局缓存，标签没有重新布局时不需要再通过tabRect计算
+        """
+        tabBar = self.m_d.ribbonTabBar
+        g = tabBar.geometry()
+        mg = tabBar.tabMargin()
+        key = (g.x(), g.y(), g.width(), g.height(), tabBar.layoutRevision(), tabBar.count(),
+               mg.left(), mg.top(), mg.right(), mg.bottom(),
+               tuple(tuple(ccd.tabPageIndex) for ccd in self.m_d.currentShowingContextCategory))
+        if self.m_d.contextTabRectsKey == key:
+            return self.m_d.contextTabRects
+        rects = list()
         for ccd in self.m_d.currentShowingContextCategory:
             indexs = ccd.tabPageIndex
+            if not indexs:
+                rects.append(None)
+                continue
+            contextTitleRect = QRect(tabBar.tabRect(indexs[0]))
+            endRect = QRect(tabBar.tabRect(indexs[-1]))
+            contextTitleRect.setRight(endRect.right())
+            contextTitleRect.translate(tabBar.x(), tabBar.y())
+            contextTitleRect.setHeight(tabBar.height()-1)    # 减1像素，避免tabbar基线覆盖
+            contextTitleRect -= mg
+            # 把区域顶部扩展到窗口顶部
+            contextTitleRect.setTop(RibbonSubElementStyleOpt.widgetBord.top())
+            rects.append(contextTitleRect)
+        # tabRect可能触发标签重新布局，版本号在计算后再记录
+        self.m_d.contextTabRectsKey = key[:4] + (tabBar.layoutRevision(),) + key[5:]
+        self.m_d.contextTabRects = rects
+        return rects
+
+    def windowTitleRegion(self) -> QRect:
+        """标题的绘制区域，WPS风格下空间不够时返回无效的区域"""
+        if not self.isOfficeStyle():
+            start = self.m_d.ribbonTabBar.x() + self.m_d.ribbonTabBar.width()
+            width = self.m_d.quickAccessBar.x() - start
+            if width > 20:
+                return QRect(start, RibbonSubElementStyleOpt.widgetBord.top(), width, RibbonSubElementStyleOpt.titleBarHeight)
+            return QRect()
+        # 上下文标签的范围，用于控制标题栏的显示
+        contextCategoryRegion = QPoint(self.width(), -1)
+        for contextTitleRect in self.contextCategoryTabRects():
+            if not contextTitleRect:
+                continue
+            if contextTitleRect.left() < contextCategoryRegion.x():
+                contextCategoryRegion.setX(contextTitleRect.left())
+            if contextTitleRect.right() > contextCategoryRegion.y():
+                contextCategoryRegion.setY(contextTitleRect.right())
+        titleRegion = QRect()
+        if contextCategoryRegion.y() < 0:
+            titleRegion.setRect(
+                self.m_d.quickAccessBar.geometry().right()+1,
+                RibbonSubElementStyleOpt.widgetBord.top(),
+                self.width()-self.m_d.iconRightBorderPosition-RibbonSubElementStyleOpt.widgetBord.right()
+                - self.m_d.windowButtonSize.width()-self.m_d.quickAccessBar.geometry().right()-1,
+                RibbonSubElementStyleOpt.titleBarHeight,
+            )
+        else:
+            leftwidth = contextCategoryRegion.x() - self.m_d.quickAccessBar.geometry().right() - self.m_d.iconRightBorderPosition
+            rightwidth = self.width() - contextCategoryRegion.y() - self.m_d.windowButtonSize.width()
+            if rightwidth > leftwidth:  # 说明右边的区域大一点，标题显示在右
+                titleRegion.setRect(
+                    contextCategoryRegion.y(),
+                    RibbonSubElementStyleOpt.widgetBord.top(),
+                    rightwidth,
+                    RibbonSubElementStyleOpt.titleBarHeight,
+                )
+            else:   # 说明左边的区域大一点，标题显示在右
+                titleRegion.setRect(
+                    self.m_d.iconRightBorderPosition+self.m_d.quickAccessBar.geometry().right(),
+                    RibbonSubElementStyleOpt.widgetBord.top(),
+                    leftwidth,
+                    RibbonSubElementStyleOpt.titleBarHeight,
+                )
+        return titleRegion
+
+    def windowIconRect(self) -> QRect:
+        """窗口图标的绘制区域"""
+        iconMinSize = RibbonSubElementStyleOpt.titleBarHeight - 6
+        return QRect(RibbonSubElementStyleOpt.widgetBord.left() + 3, RibbonSubElementStyleOpt.widgetBord.top() + 3,
+                     iconMinSize, iconMinSize)
+
+    def chromePixmap(self) -> QPixmap:
+        """
+        背景、上下文标签色带以及当前上下文标签页边框的预渲染结果
+        以尺寸、调色板、标签位置、上下文标签和当前索引等状态为key，状态不变时直接使用缓存，
+        只更新标题或图标时不需要重新绘制这部分
+        """
+        dpr = self.devicePixelRatioF()
+        tabBar = self.m_d.ribbonTabBar
+        tg = tabBar.geometry()
+        sg = self.m_d.stackedContainerWidget.geometry()
+        rects = self.contextCategoryTabRects()
+        bands = tuple((r.x(), r.y(), r.width(), r.height()) if r else None for r in rects)
+        contexts = tuple((ccd.contextCategory.contextColor().rgba(), ccd.contextCategory.contextTitle())
+                         for ccd in self.m_d.currentShowingContextCategory)
+        key = (self.width(), self.height(), dpr, self.palette().cacheKey(), self.font().key(), self.isOfficeStyle(),
+               tg.x(), tg.y(), tg.width(), tg.height(), sg.x(), sg.y(), sg.width(), sg.height(),
+               tabBar.currentIndex(), QColor(RibbonSubElementStyleOpt.tabBarBaseLineColor).rgba(), bands, contexts)
+        if self.m_d.chromeCacheKey == key and self.m_d.chromeCache is not None:
+            return self.m_d.chromeCache
+        pm = QPixmap(self.size() * dpr)
+        pm.setDevicePixelRatio(dpr)
+        pm.fill(Qt.transparent)
+        p = QPainter(pm)
+        p.setFont(self.font())
+        self.paintBackground(p)
+        p.save()
+        # 显示上下文标签
+        for ccd, contextTitleRect in zip(self.m_d.currentShowingContextCategory, rects):
             clr = ccd.contextCategory.contextColor()
-            if indexs:
-                contextTitleRect = QRect(self.m_d.ribbonTabBar.tabRect(indexs[0]))
-                endRect = QRect(self.m_d.ribbonTabBar.tabRect(indexs[-1]))
-                contextTitleRect.setRight(endRect.right())
-                contextTitleRect.translate(self.m_d.ribbonTabBar.x(), self.m_d.ribbonTabBar.y())
-                contextTitleRect.setHeight(self.m_d.ribbonTabBar.height()-1)    # 减1像素，避免tabbar基线覆盖
-                contextTitleRect -= self.m_d.ribbonTabBar.tabMargin()
-                # 把区域顶部扩展到窗口顶部
-                contextTitleRect.setTop(RibbonSubElementStyleOpt.widgetBord.top())
-                # 绘制
-                self.paintContextCategoryTab(p, '', contextTitleRect, clr)
-
-            if self.m_d.ribbonTabBar.currentIndex() in indexs:
+            if contextTitleRect:
+                title = ccd.contextCategory.contextTitle() if self.isOfficeStyle() else ''
+                self.paintContextCategoryTab(p, title, contextTitleRect, clr)
+            if tabBar.currentIndex() in ccd.tabPageIndex:
                 pen = QPen()
                 pen.setColor(clr)
                 pen.setWidth(1)
                 p.setPen(pen)
                 p.setBrush(Qt.NoBrush)
-                p.drawRect(self.m_d.stackedContainerWidget.geometry())
+                p.drawRect(sg)
         p.restore()
-
-        # 显示标题等
-        parWindow = self.parentWidget()
-        if parWindow:
-            start = self.m_d.ribbonTabBar.x() + self.m_d.ribbonTabBar.width()
-            width = self.m_d.quickAccessBar.x() - start
-            if width > 20:
-                titleRegion = QRect(start, RibbonSubElementStyleOpt.widgetBord.top(), width, RibbonSubElementStyleOpt.titleBarHeight)
-                self.paintWindowTitle(p, parWindow.windowTitle(), titleRegion)
-                self.paintWindowIcon(p, parWindow.windowIcon())
+        p.end()
+        self.m_d.chromeCache = pm
+        self.m_d.chromeCacheKey = key
+        return pm
+
+    def clearPaintCache(self):
+        """清除背景的绘制缓存，通过样式表等调色板以外的方式改变了背景时调用"""
+        self.m_d.chromeCache = None
+        self.m_d.chromeCacheKey = None
+        self.m_d.contextTabRectsKey = None
+        self.update()
 
     def resizeStackedContainerWidget(self):
         if self.m_d.stackedContainerWidget.isPopupMode():
@@ -901,18 +1279,18 @@ class SARibbonBar(QMenuBar):
             )
 
     def updateContextCategoryManagerData(self):
-        """刷新所有ContextCategoryManagerData，这个在单独一个Category删除时调用"""
+        """
+        重新计算所有ContextCategoryManagerData的tab索引
+        tab的增删移动已经增量维护，只有在外部直接修改了tabbar时才需要调用
+        """
+        self.m_d.invalidateIndexes()
         for cd in self.m_d.currentShowingContextCategory:
             cd.tabPageIndex.clear()
             for i in range(cd.contextCategory.categoryCount()):
                 category = cd.contextCategory.categoryPage(i)
-                for j in range(self.m_d.ribbonTabBar.count()):
-                    var: _SARibbonTabData = self.m_d.ribbonTabBar.tabData(j)
-                    if var:
-                        if var.category == category:
-                            cd.tabPageIndex.append(j)
-                    else:
-                        cd.tabPageIndex.append(-1)
+                index = self.m_d.tabIndexOf(category)
+                if index >= 0:
+                    cd.tabPageIndex.append(index)
 
     def paintBackground(self, painter: QPainter):
         painter.save()
@@ -936,6 +1314,7 @@ class SARibbonBar(QMenuBar):
         """绘制标题栏"""
         painter.save()
         painter.setPen(RibbonSubElementStyleOpt.titleTextColor)
+        # 标题的排版按(文字, 字体, 宽度)缓存
         painter.drawText(titleRegion, Qt.AlignCenter, title)
         painter.restore()
 
@@ -994,23 +1373,30 @@ class SARibbonBar(QMenuBar):
 
     # 槽函数
     def onWindowTitleChanged(self, title: str):
-        self.update()
+        # 只刷新标题区域
+        self.update(QRegion(self.m_d.lastTitleRegion) | QRegion(self.windowTitleRegion()))
 
     def onWindowIconChanged(self, icon: QIcon):
         if not icon.isNull():
             iconMinSize = RibbonSubElementStyleOpt.titleBarHeight - 6
             s = icon.actualSize(QSize(iconMinSize, iconMinSize))
             self.m_d.iconRightBorderPosition = RibbonSubElementStyleOpt.widgetBord.left() + s.width()
-        self.update()
+        # 图标的宽度会影响标题区域，刷新图标和新旧标题区域
+        self.update(QRegion(self.windowIconRect()) | QRegion(self.m_d.lastTitleRegion) | QRegion(self.windowTitleRegion()))
 
     def onCategoryWindowTitleChanged(self, title: str):
         w = self.sender()
         if not w:
             return
-        for i in range(self.m_d.ribbonTabBar.count()):
-            p = self.m_d.ribbonTabBar.tabData(i)
-            if w == p.category:
-                self.m_d.ribbonTabBar.setTabText(i, title)
+        self.m_d.onCategoryRenamed(w)
+        i = self.m_d.tabIndexOf(w)
+        if i >= 0:
+            self.m_d.ribbonTabBar.setTabText(i, title)
+
+    def onCategoryObjectNameChanged(self, name: str):
+        w = self.sender()
+        if w:
+            self.m_d.onCategoryRenamed(w)
 
     def onStackWidgetHided(self):
         pass
@@ -1020,8 +1406,15 @@ class SARibbonBar(QMenuBar):
         tabData: _SARibbonTabData = self.m_d.ribbonTabBar.tabData(index)
         if tabData and tabData.category:
             category = tabData.category
+            tracer = self.m_d.tabSwitchTracer
+            if tracer is not None:
+                tracer.markTabChanged(index, category)
+            # 延迟构建的标签在第一次切换时构建
+            self.prewarmCategory(category)
             if self.m_d.stackedContainerWidget.currentWidget() != category:
                 self.m_d.stackedContainerWidget.setCurrentWidget(category)
+            if tracer is not None:
+                tracer.markStackedChanged()
             if self.isMinimumMode():
                 self.m_d.ribbonTabBar.clearFocus()
                 if not self.m_d.stackedContainerWidget.isVisible() and self.m_d.stackedContainerWidget.isPopupMode():
@@ -1055,11 +1448,18 @@ class SARibbonBar(QMenuBar):
 
     def onContextsCategoryPageAdded(self, category: SARibbonCategory):
         # 这里stackedWidget用append，其他地方都应该使用insert
+        category.setRibbonBar(self)
         self.m_d.stackedContainerWidget.addWidget(category)
+        self.m_d.stackedInserted(category)
+        if self.m_d.actionRegistry is not None:
+            self.m_d.actionRegistry.addCategory(category)
+        category.windowTitleChanged.connect(self.onCategoryWindowTitleChanged)
+        category.objectNameChanged.connect(self.onCategoryObjectNameChanged)
 
     def onTabMoved(self, fr: int, to: int):
         # 调整stacked widget的顺序，调整顺序是为了调用categoryPages函数返回的QList<SARibbonCategory *>顺序和tabbar一致
-        self.m_d.stackedContainerWidget.moveWidget(fr, to)
+        self.m_d.moveStackedWidget(fr, to)
+        self.m_d.tabMoved(fr, to)
 
     # 信号
     applitionButtonClicked = pyqtSignal()       # 应用按钮点击响应 - 左上角的按钮，通过关联此信号触发应用按钮点击的效果
@@ -6,17 +6,26 @@
 @brief 一项ribbon tab页
 @note SARibbonCategory的windowTitle影响了其在SARibbonBar的标签显示，
 如果要改标签名字，直接调用SARibbonCategory的setWindowTitle函数
+
+通过setAdaptiveReduction开启自适应缩减后，宽度不足时pannel会按 大按钮->中等按钮->小按钮->折叠 逐级缩减，
+所有缩减状态及其所需宽度在内容变化时预先计算为一个按宽度排序的表，调整尺寸时只需二分查找
 """
-from typing import List, Union
-from PyQt5.QtCore import QSize, QRect, QMargins, Qt, QEvent
+from typing import Dict, List, Tuple, Union
+from PyQt5.QtCore import QSize, QRect, QMargins, Qt, QEvent, QPoint
 from PyQt5.QtGui import QBrush, QPalette
 from PyQt5.QtWidgets import QWidget, QMenuBar
 
 from .SAWidgets.SARibbonSeparatorWidget import SARibbonSeparatorWidget
 from .SAWidgets.SARibbonCategoryScrollButton import SARibbonCategoryScrollButton
+from .SAWidgets.SARibbonPannelPopup import SARibbonPannelPopup
+from .SAWidgets.SARibbonToolButton import SARibbonToolButton
 from .SATools.SARibbonElementManager import RibbonSubElementDelegate
+from .SATools.SARibbonLRUCache import SARibbonLRUCache
+from .SATools.SARibbonCategoryLayoutKernel import SARibbonCategoryLayoutKernel
 from .SARibbonPannel import SARibbonPannel
 
+GEOMETRY_CACHE_MAX_COUNT = 8    # 每个category缓存的布局结果数量
+
 
 class SARibbonCategoryItem:
     def __init__(self, pannel=None, sep=None):
@@ -24,6 +33,11 @@ class SARibbonCategoryItem:
         self.separatorWidget: SARibbonSeparatorWidget = sep
         self.mWillSetGeometry = QRect()             # pannel将要设置的Geometry
         self.mWillSetSeparatorGeometry = QRect()    # pannel将要设置的Separator的Geometry
+        self.collapseButton: SARibbonToolButton = None  # pannel折叠后显示的按钮
+        self.popup: SARibbonPannelPopup = None          # pannel折叠后所在的弹出窗口
+
+    def isCollapsed(self) -> bool:
+        return self.pannelWidget is not None and self.pannelWidget.reduceLevel() == SARibbonPannel.ReduceCollapsed
 
     def isEmpty(self) -> bool:
         if self.pannelWidget:
@@ -50,7 +64,20 @@ class SARibbonCategoryPrivate:
         self.mSizeHint = QSize(50, 50)
         self.mContentsMargins = QMargins(1, 1, 1, 1)
         self.mItemList: List[SARibbonCategoryItem] = list()
+        # 查找索引，第一次查找时建立，之后随pannel增删、移动、改名只更新受影响的部分
+        self.mPannelIndex: Union[Dict[SARibbonPannel, int], None] = None    # pannel -> 索引
+        self.mTitleIndex: Union[Dict[str, SARibbonPannel], None] = None     # 标题 -> pannel
+        self.mObjectNameIndex: Union[Dict[str, SARibbonPannel], None] = None    # objectName -> pannel
         self.mBar: QMenuBar = None
+        self.mContentRevision = 0           # 内容版本，pannel增删、显示隐藏、sizeHint变化时增加
+        self.mGeometryCache = SARibbonLRUCache(GEOMETRY_CACHE_MAX_COUNT)   # 布局计算结果的缓存
+        # 自适应缩减
+        self.mIsAdaptiveReduction = False
+        self.mIsApplyingReduction = False   # 正在测量或应用缩减状态，期间pannel尺寸变化不影响内容版本
+        self.mReduceTableKey = None         # 缩减表对应的(高度, 布局模式, 内容版本)
+        self.mReduceWidths: List[int] = list()      # 每个缩减状态所需的宽度，升序
+        self.mReduceStates: List[Tuple[int, ...]] = list()  # 和mReduceWidths对应的每个pannel的缩减级别
+        self.mReduceState: Tuple[int, ...] = tuple()        # 当前的缩减状态
         self.mLeftScrollBtn = SARibbonCategoryScrollButton(Qt.LeftArrow, self.mainClass)
         self.mRightScrollBtn = SARibbonCategoryScrollButton(Qt.RightArrow, self.mainClass)
 
@@ -98,27 +125,128 @@ class SARibbonCategoryPrivate:
             pannel: SARibbonPannel = _args[1]
             if pannel.parentWidget() != self.mainClass:
                 pannel.setParent(self.mainClass)
+            pannel.installEventFilter(self.mainClass)     # 重复安装不会重复过滤
             index = max(_args[0], 0)                    # 如果index<0，则插入开头
             index = min(len(self.mItemList), index)     # 如果index>当前长度，则插入末尾
             item = SARibbonCategoryItem(pannel, RibbonSubElementDelegate.createRibbonSeparatorWidget(self.mainClass))
             self.mItemList.insert(index, item)
+            self.reindexPannels(index)
+            self.updateNameIndex([pannel.windowTitle()], [pannel.objectName()])
+            pannel.objectNameChanged.connect(self.mainClass.onPannelObjectNameChanged)
+            registry = self.actionRegistry()
+            if registry is not None:
+                registry.addPannel(self.mainClass, pannel)
+            self.invalidateGeometryCache()
             self.updateItemGeometry()
 
     def takePannel(self, pannel: SARibbonPannel) -> bool:
         item = None
-        for i, it in enumerate(self.mItemList):
-            if pannel == it.pannelWidget:
-                item = it
-                self.mItemList.pop(i)
-                break
+        i = self.pannelIndex(pannel)
+        if i >= 0:
+            item = self.mItemList.pop(i)
+            if self.mPannelIndex is not None:
+                if self.mPannelIndex.get(pannel, -1) == i:
+                    del self.mPannelIndex[pannel]
+                self.reindexPannels(i)
+            if pannel:
+                self.updateNameIndex([pannel.windowTitle()], [pannel.objectName()])
+            registry = self.actionRegistry()
+            if registry is not None:
+                registry.removePannel(pannel)
+            self.invalidateGeometryCache()
+            if pannel:
+                pannel.removeEventFilter(self.mainClass)
+                try:
+                    pannel.objectNameChanged.disconnect(self.mainClass.onPannelObjectNameChanged)
+                except TypeError:
+                    pass
         if not item or item.isNull():
             return False
 
+        # 离开category的pannel恢复为不缩减
+        self.setItemReduceLevel(item, SARibbonPannel.ReduceNone)
+        if item.collapseButton:
+            item.collapseButton.deleteLater()
+        if item.popup:
+            item.popup.deleteLater()
         if item.separatorWidget:
             item.separatorWidget.hide()
             item.separatorWidget.deleteLater()  # 对应的分割线删除，但pannel不删除
         return True
 
+    def actionRegistry(self):
+        """所在ribbonbar的action注册表，没有ribbonbar或注册表还没有创建时返回None"""
+        return self.mBar.existingActionRegistry() if self.mBar else None
+
+    def reindexPannels(self, start: int, end: int = None):
+        """
+        [start, end)范围内的pannel位置发生了变化，只更新这些pannel的索引，end为None时到末尾
+        重复的pannel取第一个，索引小于start的不受影响
+        """
+        index = self.mPannelIndex
+        if index is None:
+            return
+        end = len(self.mItemList) if end is None else end
+        for i in range(end - 1, start - 1, -1):
+            pannel = self.mItemList[i].pannelWidget
+            if index.get(pannel, start) >= start:
+                index[pannel] = i
+
+    def updateNameIndex(self, titles: List[str], objectNames: List[str]):
+        """重新确定这些标题、objectName对应的pannel，其他名字的索引不受影响"""
+        if self.mTitleIndex is None:
+            return
+        titles = set(titles)
+        objectNames = set(objectNames)
+        for name in titles:
+            self.mTitleIndex.pop(name, None)
+        for name in objectNames:
+            self.mObjectNameIndex.pop(name, None)
+        for item in self.mItemList:
+            pannel = item.pannelWidget
+            if not pannel:
+                continue
+            if pannel.windowTitle() in titles:
+                self.mTitleIndex.setdefault(pannel.windowTitle(), pannel)
+            if pannel.objectName() in objectNames:
+                self.mObjectNameIndex.setdefault(pannel.objectName(), pannel)
+
+    def onPannelRenamed(self, pannel: SARibbonPannel):
+        """pannel的标题或objectName改变后调用，原来的名字从索引中查找"""
+        if self.mTitleIndex is None:
+            return
+        titles = [name for name, p in self.mTitleIndex.items() if p is pannel]
+        objectNames = [name for name, p in self.mObjectNameIndex.items() if p is pannel]
+        titles.append(pannel.windowTitle())
+        objectNames.append(pannel.objectName())
+        self.updateNameIndex(titles, objectNames)
+
+    def pannelIndex(self, pannel: SARibbonPannel) -> int:
+        if self.mPannelIndex is None:
+            self.mPannelIndex = {item.pannelWidget: i for i, item in reversed(list(enumerate(self.mItemList)))}
+        return self.mPannelIndex.get(pannel, -1)
+
+    def buildNameIndex(self):
+        """重名时取第一个，和逐个查找的结果一致"""
+        titles = dict()
+        names = dict()
+        for item in self.mItemList:
+            if item.pannelWidget:
+                titles.setdefault(item.pannelWidget.windowTitle(), item.pannelWidget)
+                names.setdefault(item.pannelWidget.objectName(), item.pannelWidget)
+        self.mTitleIndex = titles
+        self.mObjectNameIndex = names
+
+    def pannelByName(self, title: str) -> Union[SARibbonPannel, None]:
+        if self.mTitleIndex is None:
+            self.buildNameIndex()
+        return self.mTitleIndex.get(title, None)
+
+    def pannelByObjectName(self, objname: str) -> Union[SARibbonPannel, None]:
+        if self.mObjectNameIndex is None:
+            self.buildNameIndex()
+        return self.mObjectNameIndex.get(objname, None)
+
     def removePannel(self, pannel: SARibbonPannel) -> bool:
         if self.takePannel(pannel):
             pannel.hide()
@@ -148,20 +276,25 @@ class SARibbonCategoryPrivate:
         res = [i.pannelWidget for i in self.mItemList]
         return res
 
-    def totalSizeHintWidth(self) -> int:
-        """计算所有元素的SizeHint宽度总和"""
-        total = 0
+    def marginWidth(self) -> int:
         mag = self.mContentsMargins
-        if not mag.isNull():
-            total += mag.left() + mag.right()
+        return 0 if mag.isNull() else mag.left() + mag.right()
+
+    def kernelItems(self) -> list:
+        """收集每个item的(pannel宽度, 分割线宽度, 是否可扩展)，作为布局内核的输入，隐藏的item为None"""
+        items = list()
         for item in self.mItemList:
             if item.isEmpty():
-                continue    # 如果是hide就直接跳过
-            pannelSize = item.pannelWidget.sizeHint()
-            total += pannelSize.width()
-            separatorSize = item.separatorWidget.sizeHint() if item.separatorWidget else QSize(0, 0)
-            total += separatorSize.width()
-        return total
+                items.append(None)
+                continue
+            separatorWidth = item.separatorWidget.sizeHint().width() if item.separatorWidget else 0
+            isExpanding = not item.isCollapsed() and item.pannelWidget.isExpanding()
+            items.append((self.itemSizeHintWidth(item), separatorWidth, isExpanding))
+        return items
+
+    def totalSizeHintWidth(self) -> int:
+        """计算所有元素的SizeHint宽度总和"""
+        return SARibbonCategoryLayoutKernel.totalWidth(self.kernelItems(), self.marginWidth())
 
     def categoryContentSize(self) -> QSize:
         category = self.ribbonCategory()
@@ -172,69 +305,165 @@ class SARibbonCategoryPrivate:
             s.setWidth(s.width() - (mag.right() + mag.left()))
         return s
 
+    def invalidateGeometryCache(self):
+        """内容发生变化，之前缓存的布局结果都不再可用"""
+        if self.mIsApplyingReduction:
+            return
+        self.mContentRevision += 1
+
+    def itemSizeHintWidth(self, item: SARibbonCategoryItem) -> int:
+        """item的sizeHint宽度，折叠的pannel为折叠按钮的宽度"""
+        if item.isCollapsed():
+            return self.collapseButton(item).sizeHint().width()
+        return item.pannelWidget.sizeHint().width()
+
+    def collapseButton(self, item: SARibbonCategoryItem) -> SARibbonToolButton:
+        """pannel折叠后显示的按钮，第一次调用时创建"""
+        if item.collapseButton is None:
+            btn = RibbonSubElementDelegate.createRibbonToolButton(self.mainClass)
+            btn.setAutoRaise(True)
+            btn.setFocusPolicy(Qt.NoFocus)
+            btn.setButtonType(SARibbonToolButton.LargeButton)
+            btn.clicked.connect(self.ribbonCategory().onCollapseButtonClicked)
+            btn.hide()
+            item.collapseButton = btn
+        btn = item.collapseButton
+        pannel = item.pannelWidget
+        ltp = SARibbonToolButton.Lite if pannel.isTwoRow() else SARibbonToolButton.Normal
+        if btn.largeButtonType() != ltp:
+            btn.setLargeButtonType(ltp)
+        if btn.text() != pannel.windowTitle():
+            btn.setText(pannel.windowTitle())
+            btn.setIcon(pannel.windowIcon())
+        return btn
+
+    def setItemReduceLevel(self, item: SARibbonCategoryItem, level: int):
+        """设置pannel的缩减级别，折叠时把pannel放入弹出窗口，取消折叠时放回category"""
+        pannel = item.pannelWidget
+        if pannel.reduceLevel() == level:
+            return
+        isCollapsed = item.isCollapsed()
+        pannel.setReduceLevel(level)
+        if level == SARibbonPannel.ReduceCollapsed:
+            if item.popup is None:
+                item.popup = SARibbonPannelPopup(self.mainClass)
+            item.popup.setPannel(pannel)
+        elif isCollapsed:
+            item.popup.hide()
+            item.popup.takePannel()
+            pannel.setParent(self.mainClass)
+            pannel.show()
+            if item.collapseButton:
+                item.collapseButton.hide()
+
+    def updateReduceTable(self, contentSize: QSize):
+        """
+        计算所有缩减状态及其所需的宽度，内容不变时不会重新计算
+        从不缩减开始，按级别逐级缩减，同一级别内按优先级从低到高、从右到左的顺序逐个缩减pannel，
+        只有宽度减小的缩减才会成为一个新的状态，因此状态所需的宽度严格递减
+        """
+        key = (contentSize.height(), self.mDefaultPannelLayoutMode, self.mContentRevision)
+        if key == self.mReduceTableKey:
+            return
+        total = self.marginWidth()
+        levelWidths: Dict[int, List[int]] = dict()     # item索引 -> 各个级别的宽度
+        self.mIsApplyingReduction = True
+        try:
+            for i, item in enumerate(self.mItemList):
+                if item.isEmpty():
+                    continue
+                widths = item.pannelWidget.measureReduceWidths(contentSize.height())
+                widths.append(self.collapseButton(item).sizeHint().width())
+                levelWidths[i] = widths
+                total += widths[SARibbonPannel.ReduceNone]
+                total += item.separatorWidget.sizeHint().width() if item.separatorWidget else 0
+        finally:
+            self.mIsApplyingReduction = False
+        order = sorted(levelWidths.keys(), key=lambda i: (self.mItemList[i].pannelWidget.reducePriority(), -i))
+        self.mReduceWidths, self.mReduceStates = SARibbonCategoryLayoutKernel.buildReduceTable(
+            total, levelWidths, order, len(self.mItemList))
+        self.mReduceTableKey = key
+
+    def reduceStateForWidth(self, width: int) -> Tuple[int, ...]:
+        """二分查找能放下的缩减最少的状态，都放不下时返回缩减最多的状态"""
+        return self.mReduceStates[SARibbonCategoryLayoutKernel.reduceStateIndex(self.mReduceWidths, width)]
+
+    def applyReduceState(self, state: Tuple[int, ...]):
+        """应用缩减状态，并让pannel立即完成布局"""
+        if state == self.mReduceState:
+            return
+        self.mIsApplyingReduction = True
+        try:
+            for item, level in zip(self.mItemList, state):
+                if not item.isNull():
+                    self.setItemReduceLevel(item, level)
+            self.activatePannelLayouts()
+        finally:
+            self.mIsApplyingReduction = False
+        self.mReduceState = state
+
+    def setAdaptiveReduction(self, on: bool):
+        if self.mIsAdaptiveReduction == on:
+            return
+        self.mIsAdaptiveReduction = on
+        if not on:
+            self.applyReduceState(tuple([SARibbonPannel.ReduceNone] * len(self.mItemList)))
+            self.mReduceState = tuple()
+        self.mReduceTableKey = None
+        self.invalidateGeometryCache()
+        self.updateItemGeometry()
+
+    def calcItemGeometry(self, contentSize: QSize) -> tuple:
+        """
+        按照sizeHint计算每个item的宽度，不涉及滚动位置
+        返回(isFits, [(pannel宽度, 分割线宽度) or None, ...])，isFits表示所有pannel能否完全显示，
+        隐藏的item对应None
+        """
+        total, widths = SARibbonCategoryLayoutKernel.calcWidths(contentSize.width(), self.kernelItems(),
+                                                                self.marginWidth())
+        return total <= contentSize.width(), widths
+
     def updateItemGeometry(self):
-        """更新item的布局，此函数会调用doItemLayout"""
+        """
+        更新item的布局，此函数会调用doItemLayout
+        计算结果按(宽度, 高度, 布局模式, 内容版本, 缩减状态)缓存，拖动改变窗口尺寸时，回到之前的尺寸不需要重新计算
+        """
         category = self.ribbonCategory()
+        if self.mBar and self.mBar.isBatchUpdating():
+            # 批量更新过程中推迟布局，批量结束后统一进行
+            self.mBar.requestCategoryLayout(category)
+            return
         contentSize = self.categoryContentSize()
         y = 0 if self.mContentsMargins.isNull() else self.mContentsMargins.top()
-        total = self.totalSizeHintWidth()
-        canExpandingCount = 0   # 记录可以扩展的数量
-        expandWidth = 0         # 扩展的宽度
-        if total <= contentSize.width():
+        if self.mIsAdaptiveReduction:
+            # 宽度不足时自适应缩减pannel，缩减表只在内容变化时重新计算
+            self.updateReduceTable(contentSize)
+            self.applyReduceState(self.reduceStateForWidth(contentSize.width()))
+        key = (contentSize.width(), contentSize.height(), self.mDefaultPannelLayoutMode, self.mContentRevision,
+               self.mReduceState)
+        geom = self.mGeometryCache.object(key)
+        if geom is None:
+            geom = self.calcItemGeometry(contentSize)
+            self.mGeometryCache.insert(key, geom)
+        isFits, widths = geom
+        if isFits:
             self.mXBase = 0
-            for item in self.mItemList:
-                if not item.isEmpty() and item.pannelWidget.isExpanding():  # pannel可扩展
-                    canExpandingCount += 1
-            expandWidth = (contentSize.width()-total)/canExpandingCount if canExpandingCount > 0 else 0
-
-        total = 0   # total重新计算
-        x = self.mXBase
-        # 先按照sizeHint设置所有的尺寸
-        for item in self.mItemList:
-            if item.isEmpty():
+
+        rects, total = SARibbonCategoryLayoutKernel.placeItems(widths, self.mXBase, y, contentSize.height())
+        for item, r in zip(self.mItemList, rects):
+            if r is None:
                 if item.separatorWidget:
                     item.separatorWidget.hide()
                 item.mWillSetGeometry = QRect(0, 0, 0, 0)
                 item.mWillSetSeparatorGeometry = QRect(0, 0, 0, 0)
                 continue
-            p: SARibbonPannel = item.pannelWidget
-            if not p:
-                print('unknow widget in SARibbonCategoryLayout')
-                continue
-            pSize = p.sizeHint()
-            separatorSize = item.separatorWidget.sizeHint() if item.separatorWidget else QSize(0, 0)
-            if p.isExpanding():
-                # 可扩展，就把pannel扩展到最大
-                pSize.setWidth(pSize.width() + expandWidth)
-            w = pSize.width()
-            item.mWillSetGeometry = QRect(x, y, w, contentSize.height())
-            x += w
-            total += w
-            w = separatorSize.width()
-            item.mWillSetSeparatorGeometry = QRect(x, y, w, contentSize.height())
-            x += w
-            total += w
+            item.mWillSetGeometry = QRect(*r[0])
+            item.mWillSetSeparatorGeometry = QRect(*r[1])
         self.mTotalWidth = total
 
         # 判断滚动按钮是否显示
-        if total > contentSize.width():
-            # 超过总长度，需要显示滚动按钮
-            if self.mXBase == 0:
-                # 已经移动到最左，需要可以向右移动
-                self.mIsRightScrollBtnShow = True
-                self.mIsLeftScrollBtnShow = False
-            elif self.mXBase <= contentSize.width() - total:
-                # 已经移动到最右，需要可以向左移动
-                self.mIsRightScrollBtnShow = False
-                self.mIsLeftScrollBtnShow = True
-            else:
-                # 移动到中间两边都可以动
-                self.mIsRightScrollBtnShow = True
-                self.mIsLeftScrollBtnShow = True
-        else:
-            # total 小于 categoryWidth
-            self.mIsRightScrollBtnShow = False
-            self.mIsLeftScrollBtnShow = False
+        self.mIsLeftScrollBtnShow, self.mIsRightScrollBtnShow = SARibbonCategoryLayoutKernel.scrollButtonState(
+            total, contentSize.width(), self.mXBase)
 
         cp = category.parentWidget()
         parentHeight = cp.height() if cp else contentSize.height()
@@ -242,6 +471,12 @@ class SARibbonCategoryPrivate:
         self.mSizeHint = QSize(parentWidth, parentHeight)
         self.doItemLayout()
 
+    def activatePannelLayouts(self):
+        """让所有pannel立即完成布局，得到正确的sizeHint"""
+        for item in self.mItemList:
+            if item.pannelWidget and item.pannelWidget.layout():
+                item.pannelWidget.layout().activate()
+
     def doItemLayout(self):
         category: SARibbonCategory = self.ribbonCategory()
         # 两个滚动按钮的位置永远不变
@@ -256,9 +491,18 @@ class SARibbonCategoryPrivate:
                 hideWidgets.append(item.pannelWidget)
                 if item.separatorWidget:
                     hideWidgets.append(item.separatorWidget)
+                if item.collapseButton:
+                    hideWidgets.append(item.collapseButton)
             else:
-                item.pannelWidget.setGeometry(item.mWillSetGeometry)
-                showWidgets.append(item.pannelWidget)
+                if item.isCollapsed():
+                    # 折叠的pannel在弹出窗口中，显示折叠按钮
+                    item.collapseButton.setGeometry(item.mWillSetGeometry)
+                    showWidgets.append(item.collapseButton)
+                else:
+                    item.pannelWidget.setGeometry(item.mWillSetGeometry)
+                    showWidgets.append(item.pannelWidget)
+                    if item.collapseButton:
+                        hideWidgets.append(item.collapseButton)
                 if item.separatorWidget:
                     item.separatorWidget.setGeometry(item.mWillSetSeparatorGeometry)
                     showWidgets.append(item.separatorWidget)
@@ -308,17 +552,11 @@ class SARibbonCategory(QWidget):
 
     def pannelByName(self, title: str) -> Union[SARibbonPannel, None]:
         """通过名字查找pannel"""
-        for item in self.m_d.mItemList:
-            if item.pannelWidget and item.pannelWidget.windowTitle() == title:
-                return item.pannelWidget
-        return None
+        return self.m_d.pannelByName(title)
 
     def pannelByObjectName(self, objname: str) -> Union[SARibbonPannel, None]:
         """通过ObjectName查找pannel"""
-        for item in self.m_d.mItemList:
-            if item.pannelWidget and item.pannelWidget.objectName() == objname:
-                return item.pannelWidget
-        return None
+        return self.m_d.pannelByObjectName(objname)
 
     def pannelByIndex(self, index: int) -> Union[SARibbonPannel, None]:
         """通过索引找到pannel，如果超过索引范围，会返回None"""
@@ -328,10 +566,7 @@ class SARibbonCategory(QWidget):
 
     def pannelIndex(self, p: SARibbonPannel) -> int:
         """查找pannel对应的索引"""
-        for i, item in enumerate(self.m_d.mItemList):
-            if item.pannelWidget == p:
-                return i
-        return -1
+        return self.m_d.pannelIndex(p)
 
     def movePannel(self, fr: int, to: int):
         """移动一个Pannel从from index到to index"""
@@ -345,6 +580,11 @@ class SARibbonCategory(QWidget):
         item = self.m_d.mItemList[fr]
         self.m_d.mItemList.pop(fr)
         self.m_d.mItemList.insert(to, item)
+        lo, hi = min(fr, to), max(fr, to) + 1
+        self.m_d.reindexPannels(lo, hi)
+        pannels = [i.pannelWidget for i in self.m_d.mItemList[lo:hi] if i.pannelWidget]
+        self.m_d.updateNameIndex([p.windowTitle() for p in pannels], [p.objectName() for p in pannels])
+        self.m_d.invalidateGeometryCache()
         self.m_d.updateItemGeometry()
 
     def takePannel(self, p: SARibbonPannel) -> bool:
@@ -389,6 +629,31 @@ class SARibbonCategory(QWidget):
     def setCanCustomize(self, b: bool):
         self.m_d.isCanCustomize = b
 
+    def setAdaptiveReduction(self, on: bool):
+        """
+        设置是否自适应缩减，默认关闭
+        开启后宽度不足时，pannel按 大按钮->中等按钮->小按钮->折叠 逐级缩减，
+        缩减顺序参考SARibbonPannel.setReducePriority，所有级别都缩减后仍然放不下时显示滚动按钮
+        """
+        self.m_d.setAdaptiveReduction(on)
+
+    def isAdaptiveReduction(self) -> bool:
+        return self.m_d.mIsAdaptiveReduction
+
+    def reduceBreakpoints(self) -> List[int]:
+        """各个缩减状态所需的宽度(升序)，用于调试"""
+        return list(self.m_d.mReduceWidths)
+
+    def invalidateGeometryCache(self):
+        """让缓存的布局结果失效，pannel的sizeHint变化时会自动调用"""
+        self.m_d.invalidateGeometryCache()
+
+    def relayout(self):
+        """立即重新布局，会先让pannel完成布局，再布局category"""
+        self.m_d.activatePannelLayouts()
+        self.m_d.invalidateGeometryCache()
+        self.m_d.updateItemGeometry()
+
     def ribbonBar(self) -> QMenuBar:
         return self.m_d.mBar
 
@@ -436,9 +701,19 @@ class SARibbonCategory(QWidget):
     def eventFilter(self, watched, e) -> bool:
         # if watched is None:
         #     return False
+        if e.type() in (QEvent.ShowToParent, QEvent.HideToParent):
+            # pannel显示状态变化，缓存的布局结果失效
+            self.m_d.invalidateGeometryCache()
+        elif e.type() == QEvent.WindowTitleChange:
+            self.m_d.onPannelRenamed(watched)
         return False
 
     # 槽函数
+    def onPannelObjectNameChanged(self, name: str):
+        pannel = self.sender()
+        if isinstance(pannel, SARibbonPannel):
+            self.m_d.onPannelRenamed(pannel)
+
     def onLeftScrollButtonClicked(self):
         width = self.m_d.categoryContentSize().width()
         totalWidth = self.m_d.mTotalWidth   # 所有widget的总宽
@@ -449,6 +724,15 @@ class SARibbonCategory(QWidget):
             self.m_d.mXBase = 0
         self.m_d.updateItemGeometry()
 
+    def onCollapseButtonClicked(self):
+        """点击折叠按钮，弹出对应的pannel"""
+        btn = self.sender()
+        for item in self.m_d.mItemList:
+            if item.collapseButton is btn and item.popup:
+                height = self.m_d.categoryContentSize().height()
+                item.popup.popup(btn.mapToGlobal(QPoint(0, btn.height())), height)
+                return
+
     def onRightScrollButtonClicked(self):
         width = self.m_d.categoryContentSize().width()
         totalWidth = self.m_d.mTotalWidth   # 所有widget的总宽
@@ -2,6 +2,8 @@
 """
 @Module     SARibbonCategoryLayout
 @Author     ROOT
+
+@brief category的布局，排布算法在SARibbonCategoryLayoutKernel中实现
 """
 from typing import List
 from PyQt5.QtCore import QRect, QSize, QMargins, Qt
@@ -10,6 +12,7 @@ from PyQt5.QtWidgets import QLayout, QWidgetItem, QLayoutItem, QWidget
 from .SAWidgets.SARibbonCategoryScrollButton import SARibbonCategoryScrollButton
 from .SAWidgets.SARibbonSeparatorWidget import SARibbonSeparatorWidget
 from .SATools.SARibbonElementManager import RibbonSubElementDelegate
+from .SATools.SARibbonCategoryLayoutKernel import SARibbonCategoryLayoutKernel
 
 
 class SARibbonCategoryLayoutItem(QWidgetItem):
@@ -33,22 +36,25 @@ class SARibbonCategoryLayoutPrivate:
         self.mIsRightScrollBtnShow = False
         self.mItemList: List[SARibbonCategoryLayoutItem] = list()
 
-    def totalSizeHintWidth(self) -> int:
-        """计算所有元素的SizeHint宽度总和"""
+    def marginWidth(self) -> int:
         mag: QMargins = self.q_d.contentsMargins()
-        total = 0
-        if not mag.isNull():
-            total += mag.left() + mag.right()
+        return 0 if mag.isNull() else mag.left() + mag.right()
+
+    def kernelItems(self) -> list:
+        """收集每个item的(pannel宽度, 分割线宽度, 是否可扩展)，作为布局内核的输入，隐藏的item为None"""
+        items = list()
         for item in self.mItemList:
-            if item.isEmpty():
+            p: QWidget = item.widget()
+            if item.isEmpty() or not p:
+                items.append(None)
                 continue
-            pannelSize = item.widget().sizeHint()
-            separatorSize = QSize(0, 0)
-            if item.separatorWidget:
-                separatorSize = item.separatorWidget.sizeHint()
-            total += pannelSize.width()
-            total += separatorSize.width()
-        return total
+            separatorWidth = item.separatorWidget.sizeHint().width() if item.separatorWidget else 0
+            items.append((p.sizeHint().width(), separatorWidth, p.isExpanding()))
+        return items
+
+    def totalSizeHintWidth(self) -> int:
+        """计算所有元素的SizeHint宽度总和"""
+        return SARibbonCategoryLayoutKernel.totalWidth(self.kernelItems(), self.marginWidth())
 
 
 class SARibbonCategoryLayout(QLayout):
@@ -141,70 +147,38 @@ class SARibbonCategoryLayout(QLayout):
         if mag.isNull():
             y = mag.top()
             height -= mag.top() + mag.bottom()
-            categoryWidth -= mag.r + mag.left()
-        total = self.m_d.totalSizeHintWidth()
-        canExpandingCount = 0
-        expandWidth = 0
+            categoryWidth -= mag.right() + mag.left()
+        sizeHintWidth, widths = self.calcGeometryArr(categoryWidth)
         # 判断是否超过总长度
-        if total > categoryWidth:
-            # 超过总长度，需要显示滚动按钮
-            if self.m_d.mXBase == 0:
-                # 已经移动到最左，需要可以向右移动
-                self.m_d.mIsRightScrollBtnShow = True
-                self.m_d.mIsLeftScrollBtnShow = False
-            elif self.m_d.mXBase <= categoryWidth - total:
-                # 已经移动到最右，需要可以向左移动
-                self.m_d.mIsRightScrollBtnShow = False
-                self.m_d.mIsLeftScrollBtnShow = True
-            else:
-                # 移动到中间两边都可以动
-                self.m_d.mIsRightScrollBtnShow = True
-                self.m_d.mIsLeftScrollBtnShow = True
-        else:
-            # total 小于 categoryWidth
-            self.m_d.mIsRightScrollBtnShow = False
-            self.m_d.mIsLeftScrollBtnShow = False
+        self.m_d.mIsLeftScrollBtnShow, self.m_d.mIsRightScrollBtnShow = SARibbonCategoryLayoutKernel.scrollButtonState(
+            sizeHintWidth, categoryWidth, self.m_d.mXBase)
+        if sizeHintWidth <= categoryWidth:
             # 必须这里把mBaseX设置为0，防止滚动按钮调整尺寸导致category无法显示
             self.m_d.mXBase = 0
-            for item in self.m_d.mItemList:
-                p: QWidget = item.widget()
-                if p.isExpanding():     # pannel可扩展
-                    canExpandingCount += 1
-                expandWidth = (categoryWidth-total)/canExpandingCount if canExpandingCount > 0 else 0
-
-        total = 0   # total重新计算
-        x = self.m_d.mXBase
-        # 先按照sizeHint设置所有的尺寸
-        for item in self.m_d.mItemList:
-            if item.isEmpty():
+
+        rects, total = SARibbonCategoryLayoutKernel.placeItems(widths, self.m_d.mXBase, y, height)
+        for item, r in zip(self.m_d.mItemList, rects):
+            if r is None:
                 if item.separatorWidget:
                     item.separatorWidget.hide()
                 item.mWillSetGeometry = QRect(0, 0, 0, 0)
                 item.mWillSetSeparatorGeometry = QRect(0, 0, 0, 0)
                 continue
-            p: QWidget = item.widget()
-            if not p:
-                print('unknow widget in SARibbonCategoryLayout')
-                continue
-            pSize = p.sizeHint()
-            separatorSize = item.separatorWidget.sizeHint() if item.separatorWidget else QSize(0, 0)
-            if p.isExpanding():
-                # 可扩展，就把pannel扩展到最大
-                pSize.setWidth(pSize.width() + expandWidth)
-            w = pSize.width()
-            item.mWillSetGeometry = QRect(x, y, w, height)
-            x += w
-            total += w
-            w = separatorSize.width()
-            item.mWillSetSeparatorGeometry = QRect(x, y, w, height)
-            x += w
-            total += w
+            item.mWillSetGeometry = QRect(*r[0])
+            item.mWillSetSeparatorGeometry = QRect(*r[1])
         self.m_d.mTotalWidth = total
         cp = category.parentWidget()
         parentHeight = height if not cp else cp.height()
         parentWidth = total if not cp else cp.width()
         self.m_d.mSizeHint = QSize(parentWidth, parentHeight)
 
+    def calcGeometryArr(self, categoryWidth: int) -> tuple:
+        """
+        按照sizeHint计算每个pannel和分割线的宽度
+        返回(sizeHint总宽度, [(pannel宽度, 分割线宽度) or None, ...])，隐藏的pannel对应None
+        """
+        return SARibbonCategoryLayoutKernel.calcWidths(categoryWidth, self.m_d.kernelItems(), self.m_d.marginWidth())
+
     def doLayout(self):
         if self.m_d.mDirty:
             self.updateGeometryArr()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonGeometryScheduler
+@Author     ROOT
+
+@brief ribbon几何更新的合并调度
+添加删除category、显示隐藏上下文标签、角落窗口变化、pannel中action的增删改都会请求重新布局，
+以前每次请求都会投递一个QResizeEvent或LayoutRequest事件，一次操作中连续的请求会产生大量事件
+
+SARibbonGeometryScheduler把这些请求记录下来，通过0超时的QTimer在这一轮事件循环结束后统一执行一次：
+先执行ribbonbar的resize，再对请求过的category各布局一次，执行时通过sendEvent发送和原来相同的事件，
+执行过程中产生的新请求会在下一轮执行
+SARibbonBar.batchUpdate过程中不会执行，批量结束后category立即布局，resize在下一轮执行
+
+statistics统计请求次数和实际执行次数，两者的差为被合并掉的请求
+@code
+print(ribbon.geometryScheduler().statistics())
+@endcode
+"""
+from typing import Dict
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QTimer, QEvent
+from PyQt5.QtGui import QResizeEvent
+from PyQt5.QtWidgets import QApplication, QWidget
+
+
+class SARibbonGeometryScheduler(QObject):
+    def __init__(self, bar):
+        super().__init__(bar)
+        self.m_bar = bar
+        self.m_isResizePending = False
+        self.m_pendingCategorys: Dict[QWidget, None] = dict()   # 需要布局的category，使用dict保持请求顺序
+        self.m_resizeRequested = 0
+        self.m_resizeExecuted = 0
+        self.m_layoutRequested = 0
+        self.m_layoutExecuted = 0
+        self.m_flushCount = 0
+        self.m_timer = QTimer(self)
+        self.m_timer.setSingleShot(True)
+        self.m_timer.setInterval(0)
+        self.m_timer.timeout.connect(self.flush)
+
+    def requestResize(self):
+        """请求ribbonbar重新布局"""
+        self.m_resizeRequested += 1
+        self.m_isResizePending = True
+        self.schedule()
+
+    def requestCategoryLayout(self, category: QWidget):
+        """请求category重新布局"""
+        self.m_layoutRequested += 1
+        self.m_pendingCategorys[category] = None
+        self.schedule()
+
+    def schedule(self):
+        if not self.m_bar.isBatchUpdating() and not self.m_timer.isActive():
+            self.m_timer.start()
+
+    def hasPending(self) -> bool:
+        """是否有还未执行的请求"""
+        return self.m_isResizePending or bool(self.m_pendingCategorys)
+
+    def flush(self):
+        """立即执行所有的请求，批量更新过程中不执行"""
+        self.m_timer.stop()
+        if self.m_bar.isBatchUpdating() or not self.hasPending():
+            return
+        self.m_flushCount += 1
+        isResize = self.m_isResizePending
+        categorys = self.takePendingCategorys()
+        self.m_isResizePending = False
+        if isResize:
+            bar = self.m_bar
+            self.m_resizeExecuted += 1
+            QApplication.sendEvent(bar, QResizeEvent(bar.size(), bar.size()))
+        for c in categorys:
+            self.m_layoutExecuted += 1
+            QApplication.sendEvent(c, QEvent(QEvent.LayoutRequest))
+
+    def batchFinished(self):
+        """
+        SARibbonBar批量更新结束时调用，批量过程中请求布局的category立即重新布局，
+        有category布局或请求过resize时，resize在下一轮事件循环执行
+        """
+        categorys = self.takePendingCategorys()
+        for c in categorys:
+            self.m_layoutExecuted += 1
+            c.relayout()
+        if categorys:
+            self.requestResize()
+        else:
+            self.schedule()
+
+    def takePendingCategorys(self) -> list:
+        """取出需要布局的category，已经删除的category被丢弃"""
+        categorys = [c for c in self.m_pendingCategorys if not sip.isdeleted(c)]
+        self.m_pendingCategorys = dict()
+        return categorys
+
+    def statistics(self) -> dict:
+        """
+        请求和执行的次数
+        {'resize': {'requested', 'executed'}, 'layout': {'requested', 'executed'}, 'flushes', 'pending'}
+        """
+        return {
+            'resize': {'requested': self.m_resizeRequested, 'executed': self.m_resizeExecuted},
+            'layout': {'requested': self.m_layoutRequested, 'executed': self.m_layoutExecuted},
+            'flushes': self.m_flushCount,
+            'pending': self.hasPending(),
+        }
+
+    def resetStatistics(self):
+        self.m_resizeRequested = 0
+        self.m_resizeExecuted = 0
+        self.m_layoutRequested = 0
+        self.m_layoutExecuted = 0
+        self.m_flushCount = 0
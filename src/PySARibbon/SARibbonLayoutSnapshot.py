@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonLayoutSnapshot
+@Author     ROOT
+
+@brief ribbon布局的快照，用于加快程序启动
+启动时构建ribbon最大的开销是计算每个按钮的尺寸(文字测量)和pannel的多次布局，
+SARibbonLayoutSnapshot把构建完成的ribbon中每个pannel的结构、按钮尺寸和布局结果按ribbon风格(行数)、
+pannel高度和缩减级别记录下来，保存为压缩的文件，下次启动时直接使用，省去按钮尺寸的测量和pannel的布局计算
+
+快照以描述的hash(SARibbonSpecBuilder的描述)、Qt版本和字体度量等环境作为key，环境发生变化时快照不会被使用，
+程序按正常方式完整布局；单个pannel的结构和快照不一致、之后增删改了action、字体或样式发生变化时，
+这个pannel的快照失效，同样按正常方式布局
+
+capture只记录当前风格下已经布局过的pannel，styles参数可以依次切换风格记录，完成后恢复原来的风格
+@code
+spec = SARibbonSpecBuilder.loadJson('ribbon.json')
+snapshot = SARibbonLayoutSnapshot.load('ribbon.snapshot')
+report = SARibbonSpecBuilder(ribbon).build(spec, snapshot)
+if not report['snapshot']:
+    # 没有可用的快照，显示后重新生成
+    snapshot = SARibbonLayoutSnapshot(SARibbonLayoutSnapshot.specHash(spec))
+    snapshot.capture(ribbon)
+    snapshot.save('ribbon.snapshot')
+@endcode
+"""
+import json
+import zlib
+import hashlib
+from functools import partial
+from typing import Dict, List, Union
+from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtGui import QFontMetrics
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from .SARibbonCategory import SARibbonCategory
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b'SARibbonSnapshot'
+SNAPSHOT_SAMPLE_TEXT = 'SARibbon 0123456789 abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _toTuple(value):
+    """json中的数组转换为tuple，布局参数需要作为dict的key"""
+    if isinstance(value, list):
+        return tuple(_toTuple(v) for v in value)
+    return value
+
+
+class SARibbonLayoutSnapshot:
+    def __init__(self, specHash: str = '', environment: dict = None):
+        self.m_specHash = specHash
+        self.m_environment = environment
+        self.m_pannels: Dict[str, dict] = dict()    # 'category标题/pannel索引' -> {'signature', 'layouts'}
+
+    @staticmethod
+    def specHash(spec: Union[dict, str, bytes]) -> str:
+        """描述的hash，dict按key排序后计算"""
+        if isinstance(spec, dict):
+            spec = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+        if isinstance(spec, str):
+            spec = spec.encode('utf-8')
+        return hashlib.sha1(spec).hexdigest()
+
+    @staticmethod
+    def environmentKey(widget: QWidget = None) -> dict:
+        """影响按钮尺寸和布局的环境：Qt版本、样式、样式表、字体及其度量、屏幕缩放"""
+        app = QApplication.instance()
+        font = widget.font() if widget is not None else QApplication.font()
+        fm = QFontMetrics(font)
+        styleSheet = app.styleSheet()
+        if widget is not None:
+            styleSheet += widget.window().styleSheet() + widget.styleSheet()
+        screen = QApplication.primaryScreen()
+        return {
+            'qt': QT_VERSION_STR,
+            'pyqt': PYQT_VERSION_STR,
+            'style': QApplication.style().objectName(),
+            'styleSheet': hashlib.sha1(styleSheet.encode('utf-8')).hexdigest(),
+            'font': font.key(),
+            'fontMetrics': [fm.height(), fm.ascent(), fm.averageCharWidth(), fm.lineSpacing(),
+                            fm.horizontalAdvance(SNAPSHOT_SAMPLE_TEXT)],
+            'screen': [screen.devicePixelRatio(), screen.logicalDotsPerInch()] if screen else [],
+        }
+
+    def isCompatible(self, bar: QWidget, specHash: str = '') -> bool:
+        """快照是否可以用于bar，specHash不为空时还需要和快照的描述一致"""
+        if specHash and specHash != self.m_specHash:
+            return False
+        return self.m_environment == SARibbonLayoutSnapshot.environmentKey(bar)
+
+    def pannelCount(self) -> int:
+        return len(self.m_pannels)
+
+    @staticmethod
+    def pannelKey(category: QWidget, index: int) -> str:
+        return '%s/%d' % (category.windowTitle(), index)
+
+    @staticmethod
+    def isCategoryRealized(category: QWidget) -> bool:
+        """延迟构建的category在构建之前没有pannel"""
+        return not hasattr(category, 'isRealized') or category.isRealized()
+
+    # 记录
+    def capture(self, bar: QWidget, styles: List[int] = None) -> int:
+        """
+        记录bar中所有已经布局过的pannel，返回记录的pannel数量，同一个pannel多次记录时合并
+        styles为需要记录的ribbon风格，为None时只记录当前风格
+        """
+        self.m_environment = SARibbonLayoutSnapshot.environmentKey(bar)
+        if styles is None:
+            return self.captureCurrent(bar)
+        oldStyle = bar.currentRibbonStyle()
+        for style in styles:
+            bar.setRibbonStyle(style)
+            QApplication.sendPostedEvents()
+            bar.geometryScheduler().flush()
+            self.captureCurrent(bar)
+        bar.setRibbonStyle(oldStyle)
+        return len(self.m_pannels)
+
+    def captureCurrent(self, bar: QWidget) -> int:
+        for category in bar.categoryPages():
+            if not SARibbonLayoutSnapshot.isCategoryRealized(category):
+                continue
+            for i, pannel in enumerate(category.pannelList()):
+                self.capturePannel(SARibbonLayoutSnapshot.pannelKey(category, i), pannel)
+        return len(self.m_pannels)
+
+    def capturePannel(self, key: str, pannel: QWidget):
+        lay = pannel.layout()
+        layout = lay.snapshotLayout()
+        if layout is None:
+            return
+        signature = [pannel.windowTitle(), lay.snapshotSignature()]
+        data = self.m_pannels.get(key, None)
+        if data is None or data['signature'] != signature:
+            data = self.m_pannels[key] = {'signature': signature, 'layouts': list()}
+        layouts = [it for it in data['layouts'] if it['key'] != layout['key']]
+        layouts.append(layout)
+        data['layouts'] = layouts
+
+    # 应用
+    def apply(self, bar: QWidget, specHash: str = '') -> bool:
+        """
+        把快照应用到bar中的所有pannel，环境或描述不一致时不做任何处理，返回False
+        还没有构建的延迟构建category在构建完成后应用
+        """
+        if not self.isCompatible(bar, specHash):
+            return False
+        for category in bar.categoryPages():
+            if SARibbonLayoutSnapshot.isCategoryRealized(category):
+                self.applyCategory(category)
+            else:
+                category.realized.connect(partial(self.applyCategory, category))
+        return True
+
+    def applyCategory(self, category: SARibbonCategory) -> int:
+        """把快照应用到category的pannel，返回应用成功的pannel数量，结构和快照不一致的pannel不应用"""
+        count = 0
+        for i, pannel in enumerate(category.pannelList()):
+            data = self.m_pannels.get(SARibbonLayoutSnapshot.pannelKey(category, i), None)
+            if data is None:
+                continue
+            lay = pannel.layout()
+            if data['signature'] != [pannel.windowTitle(), lay.snapshotSignature()]:
+                continue
+            lay.setSnapshot(data['layouts'])
+            count += 1
+        return count
+
+    # 保存
+    def toDict(self) -> dict:
+        return {
+            'version': SNAPSHOT_VERSION,
+            'spec': self.m_specHash,
+            'environment': self.m_environment,
+            'pannels': self.m_pannels,
+        }
+
+    @staticmethod
+    def fromDict(data: dict) -> Union['SARibbonLayoutSnapshot', None]:
+        """版本不一致时返回None"""
+        if data.get('version', None) != SNAPSHOT_VERSION:
+            return None
+        snapshot = SARibbonLayoutSnapshot(data['spec'], data['environment'])
+        for key, pannel in data['pannels'].items():
+            for layout in pannel['layouts']:
+                layout['key'] = _toTuple(layout['key'])
+                layout['states'] = [_toTuple(s) for s in layout['states']]
+                layout['end'] = _toTuple(layout['end'])
+            snapshot.m_pannels[key] = pannel
+        return snapshot
+
+    def save(self, path: str):
+        """保存为zlib压缩的json"""
+        data = json.dumps(self.toDict(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC + zlib.compress(data, 9))
+
+    @staticmethod
+    def load(path: str) -> Union['SARibbonLayoutSnapshot', None]:
+        """读取快照，文件不存在、损坏或版本不一致时返回None"""
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            if not raw.startswith(SNAPSHOT_MAGIC):
+                return None
+            data = json.loads(zlib.decompress(raw[len(SNAPSHOT_MAGIC):]).decode('utf-8'))
+        except (OSError, ValueError, zlib.error):
+            return None
+        return SARibbonLayoutSnapshot.fromDict(data)
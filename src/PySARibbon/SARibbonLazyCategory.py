@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonLazyCategory
+@Author     ROOT
+
+@brief 延迟构建的ribbon tab页
+SARibbonLazyCategory只记录标题和构建函数，pannel等内容在第一次切换到此标签页，
+或调用SARibbonBar.prewarmCategory时才通过构建函数创建，以减少程序启动时创建的窗口数量
+
+构建函数的参数为category本身，和普通category一样添加pannel即可：
+@code
+def createCategoryOther(page: SARibbonCategory):
+    pannel = page.addPannel('pannel one')
+    pannel.addLargeAction(actOpen)
+
+ribbon.addLazyCategoryPage('Other', createCategoryOther)
+@endcode
+
+在构建前，标题、objectName相关的查找都可以正常使用，
+访问pannel相关的接口（如pannelList，pannelByObjectName）时会先自动完成构建，因此自定义也能正常使用
+"""
+from typing import Callable, List, Union
+from PyQt5.QtCore import pyqtSignal
+
+from .SARibbonCategory import SARibbonCategory
+from .SARibbonPannel import SARibbonPannel
+
+
+class SARibbonLazyCategory(SARibbonCategory):
+    def __init__(self, title: str = '', factory: Callable = None, parent=None):
+        super().__init__(parent)
+        self.m_factory = factory
+        self.m_isRealized = False
+        if title:
+            self.setObjectName(title)
+            self.setWindowTitle(title)
+
+    def factory(self) -> Callable:
+        return self.m_factory
+
+    def setFactory(self, factory: Callable):
+        """设置构建函数，仅在构建前设置有效"""
+        self.m_factory = factory
+
+    def isRealized(self) -> bool:
+        """判断是否已经完成构建"""
+        return self.m_isRealized
+
+    def realize(self) -> bool:
+        """
+        通过构建函数创建category的内容，已经构建过的不会重复构建
+        返回此次是否进行了构建
+        """
+        if self.m_isRealized:
+            return False
+        self.m_isRealized = True
+        if self.m_factory:
+            bar = self.ribbonBar()
+            if bar:
+                # 构建过程中的布局统一推迟到构建完成后进行
+                with bar.batchUpdate():
+                    self.m_factory(self)
+            else:
+                self.m_factory(self)
+        self.realized.emit()
+        return True
+
+    # 访问pannel的接口，需要先完成构建
+    def addPannel(self, *_args):
+        self.realize()
+        return super().addPannel(*_args)
+
+    def insertPannel(self, title: str, index: int) -> SARibbonPannel:
+        self.realize()
+        return super().insertPannel(title, index)
+
+    def pannelByName(self, title: str) -> Union[SARibbonPannel, None]:
+        self.realize()
+        return super().pannelByName(title)
+
+    def pannelByObjectName(self, objname: str) -> Union[SARibbonPannel, None]:
+        self.realize()
+        return super().pannelByObjectName(objname)
+
+    def pannelByIndex(self, index: int) -> Union[SARibbonPannel, None]:
+        self.realize()
+        return super().pannelByIndex(index)
+
+    def pannelIndex(self, p: SARibbonPannel) -> int:
+        self.realize()
+        return super().pannelIndex(p)
+
+    def movePannel(self, fr: int, to: int):
+        self.realize()
+        super().movePannel(fr, to)
+
+    def takePannel(self, p: SARibbonPannel) -> bool:
+        self.realize()
+        return super().takePannel(p)
+
+    def removePannel(self, *_args) -> bool:
+        self.realize()
+        return super().removePannel(*_args)
+
+    def pannelList(self) -> List[SARibbonPannel]:
+        self.realize()
+        return super().pannelList()
+
+    def pannelCount(self) -> int:
+        self.realize()
+        return super().pannelCount()
+
+    # 事件
+    def showEvent(self, e):
+        # 作为第一个标签页时，tab切换信号先于tabData的设置触发，因此在显示时兜底构建
+        self.realize()
+        super().showEvent(e)
+
+    # 信号
+    realized = pyqtSignal()     # 完成构建后触发
@@ -23,6 +23,7 @@ from PyQt5.QtWidgets import QMainWindow, QApplication, QWidget, QMenuBar
 from .SAFramelessHelper import SAFramelessHelper
 from .SAWindowButtonGroup import SAWindowButtonGroup
 from .SARibbonBar import SARibbonBar
+from .SATools.SARibbonButtonBackgroundCache import SARibbonButtonBackgroundCache
 
 
 class SARibbonMainWindow(QMainWindow):
@@ -33,6 +34,8 @@ class SARibbonMainWindow(QMainWindow):
         self.m_ribbonBar: SARibbonBar = None
         self.m_windowButtonGroup: SAWindowButtonGroup = None
         self.m_framelessHelper: SAFramelessHelper = None
+        self.m_isIdlePrewarmEnabled = True  # 第一次显示后是否利用空闲时间预热非当前标签页
+        self.m_isFirstShow = True
 
         if self.m_useRibbon:
             self.setRibbonTheme(self.ribbonTheme())
@@ -55,6 +58,18 @@ class SARibbonMainWindow(QMainWindow):
     def ribbonTheme(self) -> int:
         return self.m_currentRibbonTheme
 
+    def setIdlePrewarmEnabled(self, on: bool):
+        """
+        设置窗口第一次显示后是否利用空闲时间预热非当前的标签页，默认开启
+        预热的时间预算等通过ribbonBar().prewarmScheduler()设置
+        """
+        self.m_isIdlePrewarmEnabled = on
+        if not on and isinstance(self.m_ribbonBar, SARibbonBar):
+            self.m_ribbonBar.prewarmScheduler().cancel()
+
+    def isIdlePrewarmEnabled(self) -> bool:
+        return self.m_isIdlePrewarmEnabled
+
     def isUseRibbon(self) -> bool:
         """
         判断当前是否使用ribbon模式
@@ -78,11 +93,12 @@ class SARibbonMainWindow(QMainWindow):
         return self.windowFlags()
 
     def loadTheme(self, filepath: str):
-        """加载主题"""
+        """加载主题，按钮背景的缓存随之失效"""
         qFile = QFile(filepath)
         if not qFile.open(QIODevice.ReadOnly | QIODevice.Text):
             return
         style_str = str(qFile.readAll(), encoding='utf-8')
+        SARibbonButtonBackgroundCache.invalidate()
         self.setStyleSheet(style_str)
 
     def setMenuWidget(self, ribbonBar: QWidget):
@@ -157,6 +173,13 @@ class SARibbonMainWindow(QMainWindow):
                 self.m_windowButtonGroup.setWindowStates(self.windowState())
         return super().event(e)
 
+    def showEvent(self, e):
+        super().showEvent(e)
+        if self.m_isFirstShow and not e.spontaneous():
+            self.m_isFirstShow = False
+            if isinstance(self.m_ribbonBar, SARibbonBar) and self.m_isIdlePrewarmEnabled:
+                self.m_ribbonBar.prewarmScheduler().start()
+
     def resizeEvent(self, e):
         if self.m_ribbonBar:
             if self.m_ribbonBar.size().width() != self.size().width():
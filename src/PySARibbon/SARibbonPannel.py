@@ -10,12 +10,16 @@ SARibbon可通过SARibbonBar的 SARibbonBar.RibbonStyle 来指定模式(通过
 在pannel中，可以通过setExpanding 函数指定pannel水平扩展，如果pannel里面没有能水平扩展的控件，将会留白，
 因此，建议在pannel里面有水平扩展的控件如（SARibbonGallery）才指定这个函数
 
+category开启自适应缩减(SARibbonCategory.setAdaptiveReduction)后，宽度不足时pannel会按 ReduceLevel 逐级缩减，
+缩减顺序由 setReducePriority 指定，优先级越低越先缩减，相同优先级的靠右的先缩减
+
 pannel的布局通过 SARibbonPannelLayout 来实现，如果有其他布局，可以通过继承 SARibbonElementCreateDelegate.createRibbonPannel
 函数返回带有自己布局的pannel，但你必须继承对应的虚函数
 """
+from contextlib import contextmanager
 from typing import List, Union
 
-from PyQt5.QtCore import pyqtSignal, Qt, QEvent, QSize
+from PyQt5.QtCore import pyqtSignal, Qt, QEvent, QSize, QRect
 from PyQt5.QtGui import QPainter
 from PyQt5.QtWidgets import QApplication, QWidget, QAction, QToolButton, QMenu, QSizePolicy
 
@@ -23,6 +27,7 @@ from .SAWidgets.SARibbonPannelOptionButton import SARibbonPannelOptionButton
 from .SAWidgets.SARibbonSeparatorWidget import SARibbonSeparatorWidget
 from .SAWidgets.SARibbonToolButton import SARibbonToolButton
 from .SAWidgets.SARibbonPannelItem import SARibbonPannelItem
+from .SAWidgets.SARibbonPannelPopup import SARibbonPannelPopup
 from .SATools.SARibbonElementManager import RibbonSubElementDelegate
 from .SARibbonGallery import SARibbonGallery
 from .SARibbonPannelLayout import SARibbonPannelLayout
@@ -49,6 +54,11 @@ class SARibbonPannel(QWidget):
         self.m_optionActionButton: SARibbonPannelOptionButton = None
         self.m_layout: SARibbonPannelLayout = None
         self.m_isCanCustomize = True
+        self.m_batchDepth = 0                   # 批量添加的嵌套层数
+        self.m_isLayoutRequestPending = False   # 批量添加过程中是否有推迟的布局请求
+        self.m_lastSizeHintWidth = -1           # 上次通知category时的sizeHint宽度
+        self.m_reduceLevel = SARibbonPannel.ReduceNone  # 当前的缩减级别
+        self.m_reducePriority = 0               # 缩减优先级，越低越先缩减
 
         self.createLayout()
         self.setPannelLayoutMode(SARibbonPannel.ThreeRowMode)
@@ -83,10 +93,11 @@ class SARibbonPannel(QWidget):
 
     def setActionRowProportion(self, act: QAction, rp):
         lay = self.m_layout
-        it = lay.pannelItem(act)
-        if it:
-            it.rowProportion = rp
-            lay.invalidate()
+        index = lay.indexOf(act)
+        if index >= 0:
+            lay.itemAt(index).rowProportion = rp
+            lay.applyReduceLevel(lay.itemAt(index))
+            lay.invalidateFrom(index)
 
     def addAction(self, *_args) -> Union[SARibbonToolButton, QAction]:
         """
@@ -108,6 +119,41 @@ class SARibbonPannel(QWidget):
             super().addAction(_args[0])
             return self.lastAddActionButton()
 
+    def addActions(self, actions: List[QAction], rp=SARibbonPannelItem.RPNone) -> List[SARibbonToolButton]:
+        """
+        批量添加action，添加过程中不会通知category重新布局，全部添加完后只布局一次
+        返回每个action对应的SARibbonToolButton
+        """
+        btns = list()
+        with self.batchUpdate():
+            for act in actions:
+                btns.append(self.addAction(act, rp))
+        return btns
+
+    def beginBatchUpdate(self):
+        """开始批量添加，期间尺寸变化不会通知category重新布局，直到对应的endBatchUpdate，可嵌套调用"""
+        self.m_batchDepth += 1
+
+    def endBatchUpdate(self):
+        """结束批量添加，最外层结束时如果有推迟的布局请求，通知category重新布局一次"""
+        if self.m_batchDepth <= 0:
+            return
+        self.m_batchDepth -= 1
+        if self.m_batchDepth == 0 and self.m_isLayoutRequestPending:
+            self.requestCategoryLayout()
+
+    def isBatchUpdating(self) -> bool:
+        return self.m_batchDepth > 0
+
+    @contextmanager
+    def batchUpdate(self):
+        """批量添加的上下文管理器"""
+        self.beginBatchUpdate()
+        try:
+            yield self
+        finally:
+            self.endBatchUpdate()
+
     def addLargeAction(self, act: QAction) -> SARibbonToolButton:
         return self.addAction(act, SARibbonPannelItem.RPLarge)
 
@@ -167,17 +213,12 @@ class SARibbonPannel(QWidget):
         self.updateGeometry()
 
     def actionToRibbonToolButton(self, action: QAction) -> Union[SARibbonToolButton, None]:
-        """从pannel中把action对应的button提取出来"""
-        lay = self.layout()
-        if not lay:
-            return None
-
-        index = lay.indexOf(action)
-        if index == -1:
+        """获取action对应的button，button仍然在pannel中，action对应的是自定义窗口时返回None"""
+        item = self.m_layout.pannelItem(action)
+        if not item:
             return None
-        item = lay.takeAt(index)
-        btn = item.widget() if item else None
-        return btn
+        btn = item.widget()
+        return btn if isinstance(btn, SARibbonToolButton) else None
 
     def addOptionAction(self, action: QAction = None):
         """添加操作action，如果要去除，传入None即可"""
@@ -208,6 +249,91 @@ class SARibbonPannel(QWidget):
         objs = self.children()
         return [obj for obj in objs if isinstance(obj, SARibbonToolButton)]
 
+    def requestCategoryLayout(self):
+        """
+        pannel尺寸发生变化，通知category重新布局
+        在批量添加action或SARibbonBar.batchUpdate过程中，布局会推迟到批量结束后统一进行
+        """
+        if self.m_batchDepth > 0:
+            self.m_isLayoutRequestPending = True
+            return
+        self.m_isLayoutRequestPending = False
+        category = self.category()
+        if not category:
+            return
+        bar = category.ribbonBar() if hasattr(category, 'ribbonBar') else None
+        if bar:
+            bar.requestCategoryLayout(category)
+        else:
+            QApplication.postEvent(category, QEvent(QEvent.LayoutRequest))
+
+    def notifySizeHintChanged(self):
+        """
+        布局的sizeHint发生变化，pannel的宽度改变时，category缓存的布局结果需要失效
+        category只使用pannel的宽度，高度由category决定
+        """
+        width = self.sizeHint().width()
+        if width == self.m_lastSizeHintWidth:
+            return
+        self.m_lastSizeHintWidth = width
+        category = self.category()
+        if category and hasattr(category, 'invalidateGeometryCache'):
+            category.invalidateGeometryCache()
+
+    def category(self) -> Union[QWidget, None]:
+        """pannel所在的category，pannel折叠后位于弹出窗口中，此时返回弹出窗口所属的category"""
+        parent = self.parentWidget()
+        if isinstance(parent, SARibbonPannelPopup):
+            return parent.category()
+        return parent
+
+    def actionRegistry(self):
+        """pannel所在ribbonbar的action注册表，没有ribbonbar或注册表还没有创建时返回None"""
+        category = self.category()
+        bar = category.ribbonBar() if hasattr(category, 'ribbonBar') else None
+        return bar.existingActionRegistry() if bar else None
+
+    def setReduceLevel(self, level: int):
+        """
+        设置缩减级别，一般由category根据宽度自动设置
+        ReduceCollapsed由category处理，pannel本身按ReduceNone显示
+        """
+        if self.m_reduceLevel == level:
+            return
+        self.m_reduceLevel = level
+        self.m_layout.setReduceLevel(level)
+
+    def reduceLevel(self) -> int:
+        return self.m_reduceLevel
+
+    def setReducePriority(self, priority: int):
+        """设置缩减优先级，宽度不足时优先级低的pannel先缩减，默认为0"""
+        if self.m_reducePriority == priority:
+            return
+        self.m_reducePriority = priority
+        category = self.category()
+        if category and hasattr(category, 'invalidateGeometryCache'):
+            category.invalidateGeometryCache()
+
+    def reducePriority(self) -> int:
+        return self.m_reducePriority
+
+    def measureReduceWidths(self, height: int) -> List[int]:
+        """
+        计算高度为height时，ReduceNone、ReduceMedium、ReduceSmall三个级别的宽度
+        计算完成后恢复当前的缩减级别
+        """
+        lay = self.m_layout
+        widths = list()
+        for level in (SARibbonPannel.ReduceNone, SARibbonPannel.ReduceMedium, SARibbonPannel.ReduceSmall):
+            lay.setReduceLevel(level)
+            lay.updateGeomArray(QRect(0, 0, 0, height))
+            widths.append(self.sizeHint().width())
+        lay.setReduceLevel(self.m_reduceLevel)
+        lay.updateGeomArray(QRect(0, 0, 0, height))
+        lay.invalidate()
+        return widths
+
     def sizeHint(self):
         laySize = self.layout().sizeHint()
         maxWidth = laySize.width() + 2
@@ -228,6 +354,9 @@ class SARibbonPannel(QWidget):
         """把pannel设置为扩展模式，此时会撑大水平区域"""
         p = QSizePolicy.Expanding if isExpanding else QSizePolicy.Preferred
         self.setSizePolicy(p, QSizePolicy.Preferred)
+        category = self.category()
+        if category and hasattr(category, 'invalidateGeometryCache'):
+            category.invalidateGeometryCache()
 
     def isExpanding(self) -> bool:
         """判断此pannel是否为（水平）扩展模式"""
@@ -330,6 +459,12 @@ class SARibbonPannel(QWidget):
         # 由于分割线在布局中，只要分割线足够高就可以，不需要重新设置
         return super().resizeEvent(e)
 
+    def changeEvent(self, e):
+        if e.type() in (QEvent.FontChange, QEvent.StyleChange):
+            # 字体或样式变化后按钮的尺寸会改变，布局快照失效
+            self.m_layout.dropSnapshot()
+        super().changeEvent(e)
+
     def actionEvent(self, e):
         """
         处理action的事件
@@ -343,23 +478,30 @@ class SARibbonPannel(QWidget):
             #     index = lay.indexOf(action)
             self.m_layout.addAction(action, self.m_lastRp)
             self.m_lastRp = SARibbonPannelItem.RPNone   # 插入完后重置为None
+            registry = self.actionRegistry()
+            if registry is not None:
+                registry.addAction(self, action)
             # 由于pannel的尺寸发生变化，需要让category也调整
-            if self.parentWidget():
-                QApplication.postEvent(self.parentWidget(), QEvent(QEvent.LayoutRequest))
+            self.requestCategoryLayout()
         elif e.type() == QEvent.ActionChanged:
-            # 让布局重新绘制
-            self.layout().invalidate()
+            # 让布局重新绘制，只需要从变化的action开始重新计算
+            index = self.m_layout.indexOf(action)
+            if index >= 0:
+                self.m_layout.invalidateFrom(index)
+            else:
+                self.m_layout.invalidate()
             # 由于pannel的尺寸发生变化，需要让category也调整
-            if self.parentWidget():
-                QApplication.postEvent(self.parentWidget(), QEvent(QEvent.LayoutRequest))
+            self.requestCategoryLayout()
         elif e.type() == QEvent.ActionRemoved:
-            action.disconnect(self)
+            # pannel没有直接连接action的信号，按钮的连接随takeAt中按钮的删除而断开
+            registry = self.actionRegistry()
+            if registry is not None:
+                registry.removeAction(self, action)
             index = self.m_layout.indexOf(action)
             if index != -1:
                 self.m_layout.takeAt(index)
             # 由于pannel的尺寸发生变化，需要让category也调整
-            if self.parentWidget():
-                QApplication.postEvent(self.parentWidget(), QEvent(QEvent.LayoutRequest))
+            self.requestCategoryLayout()
 
     # 信号
     actionTriggered = pyqtSignal(QAction)
@@ -368,6 +510,12 @@ class SARibbonPannel(QWidget):
     ThreeRowMode = SARibbonPannelLayout.ThreeRowMode
     TwoRowMode = SARibbonPannelLayout.TwoRowMode
 
+    # ReduceLevel
+    ReduceNone = SARibbonPannelLayout.ReduceNone
+    ReduceMedium = SARibbonPannelLayout.ReduceMedium
+    ReduceSmall = SARibbonPannelLayout.ReduceSmall
+    ReduceCollapsed = SARibbonPannelLayout.ReduceCollapsed
+
 
 if __name__ == '__main__':
     from PyQt5.QtGui import QIcon
@@ -7,14 +7,18 @@
 
 SARibbonPannelLayout实际是一个列布局，每一列有2~3行，看窗口定占几行
 核心函数：SARibbonPannelLayout.createItem
+排布算法在SARibbonPannelLayoutKernel中实现，此类只负责收集窗口尺寸和设置窗口位置
+通过setSnapshot设置SARibbonLayoutSnapshot中保存的结果后，按钮的尺寸和相同参数下的布局结果直接使用快照，
+item发生变化(增删移动、action改变)时快照失效
 """
-from typing import List, Union
+from typing import Dict, List, Union
 from PyQt5.QtCore import QRect, QSize, Qt
 from PyQt5.QtWidgets import QLayout, QAction, QLayoutItem, QWidget, QWidgetAction, QSizePolicy
 
 from .SAWidgets.SARibbonPannelItem import SARibbonPannelItem
 from .SAWidgets.SARibbonSeparatorWidget import SARibbonSeparatorWidget
 from .SAWidgets.SARibbonToolButton import SARibbonToolButton
+from .SATools.SARibbonPannelLayoutKernel import SARibbonPannelLayoutKernel
 
 G_HIGHER_MODE_HEIGHT = 98
 G_LOWER_MODE_HEIGHT = 72
@@ -35,28 +39,69 @@ class SARibbonPannelLayout(QLayout):
         self.m_largeHeight = 0      # 记录大图标的高度
         self.m_hasOptionAction = False              # Panel是否存在OptionAction
         self.m_optionActionSize = QSize(12, 12)     # Panel中OptionAction的尺寸
+        # 增量布局
+        self.m_isIncremental = True     # 是否使用增量布局，设置为False每次都会全部重新计算
+        self.m_dirtyIndex = 0           # 第一个需要重新计算的item索引，None表示所有item都无需重新计算
+        self.m_geomCacheKey = None      # 上次布局使用的参数，参数变化后需要全部重新计算
+        self.m_endState = None          # 上次布局计算完所有item之后的状态
+        self.m_reduceLevel = SARibbonPannelLayout.ReduceNone     # 缩减级别
+        self.m_kernel = SARibbonPannelLayoutKernel()    # 布局算法，不依赖Qt
+        self.m_actionIndex: Union[Dict[QAction, int], None] = None   # action -> item索引，第一次查找时建立，之后随item增删移动更新
+        # 布局快照
+        self.m_snapshotLayouts: Union[Dict[tuple, dict], None] = None   # (高度, 布局参数, 缩减级别) -> 布局结果
+        self.m_snapshotHints: Union[Dict[tuple, list], None] = None     # (布局参数, 缩减级别) -> 每个item的结果
 
         self.setSpacing(1)
 
     def setRowCount(self, count: int):
         self.m_rowCount = count
 
+    def setIncrementalLayout(self, on: bool):
+        """设置是否使用增量布局，关闭后每次布局都会完整计算，可用于验证增量布局的结果"""
+        self.m_isIncremental = on
+        self.invalidate()
+
+    def isIncrementalLayout(self) -> bool:
+        return self.m_isIncremental
+
     def setOptionAction(self, on: bool, size: QSize):
         self.m_hasOptionAction = on
         self.m_optionActionSize = size
 
     def indexOf(self, action: QAction) -> int:
         """通过action查找索引，用于actionEvent添加action用"""
-        for i, item in enumerate(self.m_items):
-            if item.action == action:
-                return i
-        return -1
+        if self.m_actionIndex is None:
+            index = dict()
+            for i, item in enumerate(self.m_items):
+                if item.action is not None:
+                    index.setdefault(item.action, i)
+            self.m_actionIndex = index
+        return self.m_actionIndex.get(action, -1)
+
+    def reindexActions(self, start: int, end: int = None):
+        """
+        [start, end)范围内的item位置发生了变化，只更新这些item的action索引，end为None时到末尾
+        重复的action取第一个，索引小于start的不受影响
+        """
+        index = self.m_actionIndex
+        if index is None:
+            return
+        end = len(self.m_items) if end is None else end
+        for i in range(end - 1, start - 1, -1):
+            action = self.m_items[i].action
+            if action is not None and index.get(action, start) >= start:
+                index[action] = i
 
     def addItem(self, item: QLayoutItem):
         # print('addItem(): please use addAction() instead')
         # super().addItem(item)
         self.m_items.append(item)
-        self.invalidate()  # 标记需要重新计算尺寸
+        action = getattr(item, 'action', None)
+        if self.m_actionIndex is not None and action is not None:
+            # 添加到末尾不影响其他item的索引
+            self.m_actionIndex.setdefault(action, len(self.m_items) - 1)
+        self.applyReduceLevel(item)
+        self.invalidateFrom(len(self.m_items) - 1)  # 标记需要重新计算尺寸
         return
 
     def addWidget(self, widget: QWidget, rp=SARibbonPannelItem.RPLarge) -> SARibbonPannelItem:
@@ -101,9 +146,14 @@ class SARibbonPannelLayout(QLayout):
             return None
         item = self.m_items[index]
         self.m_items.pop(index)
+        if self.m_actionIndex is not None:
+            if item.action is not None and self.m_actionIndex.get(item.action, -1) == index:
+                del self.m_actionIndex[item.action]
+            self.reindexActions(index)
         item.widget().hide()
         item.widget().deleteLater()
-        self.invalidate()
+        self.discardLayoutStateFrom(index)
+        self.invalidateFrom(index)
         return item
 
     def count(self) -> int:
@@ -113,9 +163,72 @@ class SARibbonPannelLayout(QLayout):
         return bool(self.m_items)
 
     def invalidate(self):
+        """
+        标记需要重新布局
+        若已经通过invalidateFrom标记了起始位置则保留，否则需要全部重新计算
+        """
         self.m_dirty = True
+        if self.m_dirtyIndex is None or not self.m_isIncremental:
+            self.m_dirtyIndex = 0
         super().invalidate()
 
+    def invalidateFrom(self, index: int):
+        """标记从index开始的item需要重新布局，index所在列之前的布局结果会被复用"""
+        index = max(0, index)
+        self.dropSnapshot()
+        if self.m_dirtyIndex is None or index < self.m_dirtyIndex:
+            self.m_dirtyIndex = index
+        self.m_dirty = True
+        super().invalidate()
+
+    def setReduceLevel(self, level: int):
+        """
+        设置缩减级别，只对action生成的SARibbonToolButton有效，自定义窗口保持不变
+        ReduceMedium: 大按钮变为小按钮，按Medium排列
+        ReduceSmall: 所有按钮变为仅显示图标的小按钮，按Small排列
+        """
+        if level == SARibbonPannelLayout.ReduceCollapsed:
+            level = SARibbonPannelLayout.ReduceNone     # 折叠由category处理，pannel本身按正常显示
+        if level == self.m_reduceLevel:
+            return
+        self.m_reduceLevel = level
+        for item in self.m_items:
+            self.applyReduceLevel(item)
+        self.invalidate()
+
+    def reduceLevel(self) -> int:
+        return self.m_reduceLevel
+
+    def applyReduceLevel(self, item: SARibbonPannelItem):
+        """按当前的缩减级别设置item的行占比和按钮样式"""
+        btn = item.widget()
+        if item.customWidget or not isinstance(btn, SARibbonToolButton):
+            return
+        level = self.m_reduceLevel
+        if item.restoreButtonState is None:
+            if level == SARibbonPannelLayout.ReduceNone:
+                return
+            item.restoreButtonState = (btn.buttonType(), btn.toolButtonStyle())
+        buttonType, style = item.restoreButtonState
+        rp = item.rowProportion
+        if SARibbonPannelItem.RPNone == rp:
+            rp = SARibbonPannelItem.RPLarge if buttonType == SARibbonToolButton.LargeButton else SARibbonPannelItem.RPSmall
+        if level >= SARibbonPannelLayout.ReduceMedium and SARibbonPannelItem.RPLarge == rp:
+            rp = SARibbonPannelItem.RPMedium
+            buttonType, style = SARibbonToolButton.SmallButton, Qt.ToolButtonTextBesideIcon
+        if level >= SARibbonPannelLayout.ReduceSmall:
+            rp = SARibbonPannelItem.RPSmall
+            buttonType, style = SARibbonToolButton.SmallButton, Qt.ToolButtonIconOnly
+        if btn.buttonType() != buttonType:
+            btn.setButtonType(buttonType)
+        if btn.toolButtonStyle() != style:
+            btn.setToolButtonStyle(style)
+        if level == SARibbonPannelLayout.ReduceNone:
+            item.restoreButtonState = None
+            item.reducedRowProportion = None
+        else:
+            item.reducedRowProportion = rp
+
     def expandingDirections(self) -> int:
         return Qt.Horizontal
 
@@ -179,7 +292,9 @@ class SARibbonPannelLayout(QLayout):
             self.m_items.append(item)
         else:
             self.m_items.insert(to, item)
-        self.invalidate()
+        self.reindexActions(min(fr, to), max(fr, to) + 1)
+        self.discardLayoutStateFrom(min(fr, to))
+        self.invalidateFrom(min(fr, to))
 
     def isDirty(self) -> bool:
         """判断是否需要重新布局"""
@@ -239,7 +354,144 @@ class SARibbonPannelLayout(QLayout):
         result.action = action
         return result
 
+    def discardLayoutStateFrom(self, index: int):
+        """
+        item删除或移动后，index之后的item位置发生了变化，记录的布局状态不再对应其位置，
+        增量布局需要从index之前状态有效的列开始计算
+        """
+        for item in self.m_items[index:]:
+            item.layoutState = None
+        self.m_endState = None
+
+    def columnStartIndex(self, index: int) -> int:
+        """获取index所在列的第一个item索引，增量布局从此处开始计算，布局状态失效的item不能作为起点"""
+        if index >= len(self.m_items):
+            if self.m_endState is not None:
+                return len(self.m_items)
+            index = len(self.m_items) - 1
+        while index > 0:
+            state = self.m_items[index].layoutState
+            if state is not None and state[0] == 0:
+                break
+            index -= 1
+        return max(0, index)
+
+    def incrementalStartIndex(self, cacheKey) -> int:
+        """获取增量布局的起始索引，返回0说明需要全部重新计算"""
+        if not self.m_isIncremental or cacheKey != self.m_geomCacheKey:
+            return 0
+        start = len(self.m_items) if self.m_dirtyIndex is None else min(self.m_dirtyIndex, len(self.m_items))
+        # 自定义窗口的尺寸变化不会通知到布局，因此对复用部分的自定义窗口检查其sizeHint
+        for i in range(start):
+            item = self.m_items[i]
+            if item.customWidget and not item.isEmpty() and item.sizeHint() != item.layoutHint:
+                start = i
+                break
+        return self.columnStartIndex(start)
+
+    def snapshotSignature(self) -> list:
+        """item的结构，快照只能用于结构相同的pannel"""
+        signature = list()
+        for item in self.m_items:
+            w = item.widget()
+            text = w.text() if isinstance(w, SARibbonToolButton) else ''
+            signature.append([type(w).__name__, text, item.rowProportion, item.customWidget])
+        return signature
+
+    def snapshotLayout(self) -> Union[dict, None]:
+        """
+        当前的布局结果，用于保存快照，还没有布局或需要重新布局时返回None
+        {'key': (高度, 布局参数, 缩减级别), 'items': [[hintW, hintH, x, y, w, h, 行, 列, 文字换行, 按钮状态] or None],
+         'states', 'end', 'expand'}，按钮状态为SARibbonToolButton.sizeHintCacheKey，自定义窗口为None
+        """
+        if self.m_geomCacheKey is None or self.m_dirtyIndex is not None:
+            return None
+        height, params = self.m_geomCacheKey
+        items = list()
+        for item in self.m_items:
+            if item.columnIndex < 0 or item.isEmpty():
+                items.append(None)
+                continue
+            r = item.baseGeometry
+            w = item.widget()
+            isButton = isinstance(w, SARibbonToolButton)
+            items.append([item.layoutHint.width(), item.layoutHint.height(),
+                          r.x(), r.y(), r.width(), r.height(), item.rowIndex, item.columnIndex,
+                          w.isWordWrap() if isButton else False, list(w.sizeHintCacheKey()) if isButton else None])
+        return {
+            'key': (height, params, self.m_reduceLevel),
+            'items': items,
+            'states': [item.layoutState for item in self.m_items],
+            'end': self.m_endState,
+            'expand': self.m_expandFlag,
+        }
+
+    def setSnapshot(self, layouts: List[dict]):
+        """设置快照中的布局结果，由SARibbonLayoutSnapshot调用"""
+        self.m_snapshotLayouts = dict()
+        self.m_snapshotHints = dict()
+        for layout in layouts:
+            height, params, reduceLevel = layout['key']
+            self.m_snapshotLayouts[(height, params, reduceLevel)] = layout
+            self.m_snapshotHints[(params, reduceLevel)] = layout['items']
+
+    def dropSnapshot(self):
+        """快照失效，之后按正常方式布局"""
+        self.m_snapshotLayouts = None
+        self.m_snapshotHints = None
+
+    def hasSnapshot(self) -> bool:
+        return self.m_snapshotLayouts is not None
+
+    def snapshotHints(self) -> Union[list, None]:
+        """快照中当前布局参数和缩减级别下每个item的结果，按钮尺寸和高度无关，没有时返回None"""
+        if self.m_snapshotHints is None:
+            return None
+        hints = self.m_snapshotHints.get((self.m_kernel.parameters(), self.m_reduceLevel), None)
+        if hints is None or len(hints) != len(self.m_items):
+            return None
+        return hints
+
+    def restoreSnapshotLayout(self, cacheKey) -> Union[tuple, None]:
+        """
+        从快照中取出cacheKey对应的布局结果，返回(placements, states, endState)
+        按钮的状态或自定义窗口的sizeHint和快照不一致时返回None
+        """
+        if self.m_snapshotLayouts is None:
+            return None
+        layout = self.m_snapshotLayouts.get(cacheKey + (self.m_reduceLevel,), None)
+        if layout is None or len(layout['items']) != len(self.m_items):
+            return None
+        for item, it in zip(self.m_items, layout['items']):
+            if (it is None) != item.isEmpty():
+                return None
+            if it is None:
+                continue
+            if item.customWidget:
+                item.layoutHint = item.sizeHint()
+                if item.layoutHint != QSize(it[0], it[1]):
+                    return None
+            elif self.presetSizeHint(item, it) is None:
+                return None
+        placements = [None if it is None else tuple(it[2:8]) for it in layout['items']]
+        self.m_expandFlag = self.m_expandFlag or layout['expand']
+        return placements, layout['states'], layout['end']
+
+    @staticmethod
+    def presetSizeHint(item: SARibbonPannelItem, it: list) -> Union[QSize, None]:
+        """
+        按钮的状态和快照一致时使用快照中的尺寸，按钮也直接使用，之后设置geometry时不需要再计算
+        不一致时返回None，需要重新计算
+        """
+        hint = QSize(it[0], it[1])
+        btn = item.widget()
+        if not isinstance(btn, SARibbonToolButton) or not btn.presetSizeHint(hint, it[8], it[9]):
+            return None
+        item.layoutHint = hint
+        return hint
+
     def updateGeomArray(self, setRect: QRect):
+        """收集item的尺寸交给布局内核计算，再把结果转换为item的geometry"""
         if not self.parentWidget():
             return
 
@@ -247,178 +499,100 @@ class SARibbonPannelLayout(QLayout):
         pannel = self.parentWidget()
         titleH = pannel.titleHeight() if hasattr(pannel, 'titleHeight') else 0
         magin = self.contentsMargins()
-        spacing = self.spacing()
-        rowCount = self.m_rowCount  # rowcount 是ribbon的行，有2行和3行两种
-
-        largeH = height - (magin.top() + magin.bottom()) - titleH
-        smallH = (largeH - (rowCount - 1) * spacing) / rowCount
-        self.m_largeHeight = largeH
-        # row用于记录下个item应该属于第几行，item->rowIndex用于记录当前处于第几行
-        row, column = 0, 0
-        columMaxWidth = 0   # 记录每列最大的宽度
-        totalWidth = 0      # 记录总宽度
-        x = magin.left()    # x坐标
-        lastRow0RP = SARibbonPannelItem.RPNone
-        # Medium行的y坐标
-        medy0 = magin.top() if rowCount == 2 else magin.top() + (largeH - 2 * smallH) / 3
-        medy1 = magin.top() + smallH + spacing if rowCount == 2 else magin.top() + (
-                (largeH - 2 * smallH) / 3) * 2 + smallH
-        # Small行的y坐标
-        smly0 = magin.top()
-        smly1 = magin.top() + smallH + spacing
-        smly2 = magin.top() + 2 * (smallH + spacing)
-        for i, item in enumerate(self.m_items):
-            if item.isEmpty():
+        optionW = self.m_optionActionSize.width() if self.m_hasOptionAction else 0
+        kernel = self.m_kernel
+        kernel.setParameters(self.m_rowCount, self.spacing(),
+                             (magin.left(), magin.top(), magin.right(), magin.bottom()), titleH, optionW)
+        self.m_largeHeight = height - (magin.top() + magin.bottom()) - titleH
+        # 增量布局，参数没有变化时，dirty之前的列直接复用上次的计算结果
+        cacheKey = (height, kernel.parameters())
+        startIndex = self.incrementalStartIndex(cacheKey)
+        for i in range(startIndex):
+            item = self.m_items[i]
+            item.itemWillSetGeometry = QRect(item.baseGeometry)
+        # 需要全部计算时，快照中有相同参数的结果则直接使用
+        result = self.restoreSnapshotLayout(cacheKey) if startIndex == 0 else None
+        if result is not None:
+            placements, states, endState = result
+        else:
+            if startIndex == 0:
+                state = None
+            elif startIndex < len(self.m_items):
+                state = self.m_items[startIndex].layoutState
+            else:
+                state = self.m_endState
+            # 快照中的按钮尺寸和pannel高度无关，高度不同时也可以省去按钮尺寸的计算
+            snapshotHints = self.snapshotHints()
+            kernelItems = list()
+            for i in range(startIndex, len(self.m_items)):
+                item = self.m_items[i]
+                if item.isEmpty():
+                    kernelItems.append(None)
+                    continue
+                if item.widget() and (item.widget().sizePolicy().horizontalPolicy() & QSizePolicy.ExpandFlag):
+                    self.m_expandFlag = True
+                rp = item.rowProportion if item.reducedRowProportion is None else item.reducedRowProportion
+                if SARibbonPannelItem.RPNone == rp:
+                    rp = SARibbonPannelItem.RPLarge if (item.expandingDirections() & Qt.Vertical) else SARibbonPannelItem.RPSmall
+                hint = None
+                if snapshotHints is not None and snapshotHints[i] is not None and not item.customWidget:
+                    hint = self.presetSizeHint(item, snapshotHints[i])
+                if hint is None:
+                    hint = item.sizeHint()
+                    item.layoutHint = hint
+                kernelItems.append((hint.width(), rp))
+            placements, states, endState = kernel.layout(height, kernelItems, state)
+        for i, placement, itemState in zip(range(startIndex, len(self.m_items)), placements, states):
+            item = self.m_items[i]
+            item.layoutState = itemState
+            if placement is None:
                 item.rowIndex = -1
                 item.columnIndex = -1
                 continue
-
-            if item.widget() and (item.widget().sizePolicy().horizontalPolicy() & QSizePolicy.ExpandFlag):
-                self.m_expandFlag = True
-            exp = item.expandingDirections()
-            rp = item.rowProportion
-            if SARibbonPannelItem.RPNone == rp:
-                rp = SARibbonPannelItem.RPLarge if (exp & Qt.Vertical) else SARibbonPannelItem.RPSmall
-            hint = item.sizeHint()
-            if SARibbonPannelItem.RPLarge == rp:
-                # 在Large模式，如果不是处于新列的第一行，就需要进行换列处理
-                if row != 0:
-                    x += columMaxWidth + spacing
-                    column += 1
-                item.rowIndex = 0
-                item.columnIndex = column
-                item.itemWillSetGeometry = QRect(x, magin.top(), hint.width(), largeH)
-                # 换列，x自动递增到下个坐标，列数增加，行数归零，最大列宽归零
-                x += hint.width() + spacing
-                row = 0
-                column += 1
-                columMaxWidth = 0
-            elif SARibbonPannelItem.RPMedium == rp:
-                if row > 1:  # row == 2表示前面一个item是small模式
-                    x += columMaxWidth + spacing
-                    row = 0
-                    column += 1
-
-                item.rowIndex = row
-                item.columnIndex = column
-                if row == 0:
-                    item.itemWillSetGeometry = QRect(x, medy0, hint.width(), smallH)
-                    row = 1
-                    columMaxWidth = hint.width()
-                    lastRow0RP = SARibbonPannelItem.RPMedium
-                else:
-                    item.itemWillSetGeometry = QRect(x, medy1, hint.width(), smallH)
-                    # 换列
-                    x += max(columMaxWidth, hint.width()) + spacing
-                    row = 0
-                    column += 1
-                    columMaxWidth = 0
-            else:   # SARibbonPannelItem.RPSmall
-                item.rowIndex = row
-                item.columnIndex = column
-                if row == 0:
-                    item.itemWillSetGeometry = QRect(x, smly0, hint.width(), smallH)
-                    columMaxWidth = hint.width()
-                    row = 1
-                    lastRow0RP = SARibbonPannelItem.RPSmall
-                elif row == 1:
-                    # 若第一行是Medium，按Medium排列
-                    y1 = medy1 if lastRow0RP == SARibbonPannelItem.RPMedium else smly1
-                    item.itemWillSetGeometry = QRect(x, y1, hint.width(), smallH)
-                    if 2 == rowCount or lastRow0RP == SARibbonPannelItem.RPMedium:
-                        x += max(columMaxWidth, hint.width()) + spacing
-                        row = 0
-                        column += 1
-                        columMaxWidth = 0
-                    else:
-                        row = 2
-                        columMaxWidth = max(columMaxWidth, hint.width())
-                else:
-                    item.itemWillSetGeometry = QRect(x, smly2, hint.width(), smallH)
-                    # 换列
-                    x += max(columMaxWidth, hint.width()) + spacing
-                    row = 0
-                    column += 1
-                    columMaxWidth = 0
-
-            # 最后1个元素，更新totalWidth
-            if i == len(self.m_items) - 1:
-                # 触发了换列，直接等于column索引
-                # 没有触发换列，真实列数等于column+1
-                if item.columnIndex != column:
-                    self.m_columnCount = column
-                    totalWidth = x + magin.right()
-                else:
-                    self.m_columnCount = column + 1
-                    totalWidth = x + magin.right() + columMaxWidth + spacing
-
-        # 在有optionButton的2行模式的情况下，需要调整totalWidth
-        if rowCount == 2 and self.m_hasOptionAction:
-            totalWidth += self.m_optionActionSize.width()
-
+            x, y, w, h, item.rowIndex, item.columnIndex = placement
+            item.itemWillSetGeometry = QRect(x, y, w, h)
+            item.baseGeometry = QRect(item.itemWillSetGeometry)
+        self.m_endState = endState
+        self.m_geomCacheKey = cacheKey
+        self.m_dirtyIndex = None
+
+        self.m_columnCount, totalWidth = kernel.measure(endState)
         # 在设置完所有窗口后，再设置扩展属性的窗口
         if totalWidth < setRect.width():
-            self.recalcExpandGeomArray(setRect)
-        self.m_sizeHint = QSize(totalWidth, height)
-
-    def recalcExpandGeomArray(self, setrect: QRect):
+            self.recalcExpandGeomArray(setRect, totalWidth)
+        sizeHint = QSize(totalWidth, height)
+        if sizeHint != self.m_sizeHint:
+            self.m_sizeHint = sizeHint
+            if self.parentWidget():
+                self.parentWidget().notifySizeHintChanged()
+
+    def recalcExpandGeomArray(self, setrect: QRect, totalWidth: int):
         """重新计算扩展item，此函数必须在updateGeomArray()函数之后调用"""
-        expandwidth = setrect.width() - self.m_sizeHint.width()     # 能扩展的尺寸
-        if expandwidth <= 0:
-            return
-
-        columnExpandInfo = dict()   # columnExpandInfo用于记录可以水平扩展的列和控件
+        columnItems = list()
         for item in self.m_items:
-            if not item.isEmpty() and (item.expandingDirections() & Qt.Horizontal):
-                value = columnExpandInfo.get(item.columnIndex, None)
-                if not value:
-                    columnExpandInfo[item.columnIndex] = {
-                        'oldColumnWidth': 0,
-                        'columnMaximumWidth': -1,
-                        'columnExpandedWidth': 0,
-                        'expandItems': list()
-                    }.copy()
-                    value = columnExpandInfo[item.columnIndex]
-                value['expandItems'].append(item)
-        # 没有需要扩展的就退出
-        if not columnExpandInfo:
+            if item.isEmpty() or item.columnIndex < 0:
+                columnItems.append(None)
+                continue
+            columnItems.append((item.columnIndex, item.itemWillSetGeometry.width(),
+                                bool(item.expandingDirections() & Qt.Horizontal), item.widget().maximumWidth()))
+        result = self.m_kernel.expandColumns(columnItems, self.m_columnCount, setrect.width() - totalWidth)
+        if result is None:
             return
-
-        oneColCanexpandWidth = expandwidth / len(columnExpandInfo)
-        for key, value in columnExpandInfo.items():
-            oldColumnWidth, columnMaximumWidth = self.columnWidthInfo(key, value['oldColumnWidth'], value['columnMaximumWidth'])
-            value['oldColumnWidth'] = oldColumnWidth
-            value['columnMaximumWidth'] = columnMaximumWidth
-            if oldColumnWidth < 0 or oldColumnWidth > columnMaximumWidth:
-                columnExpandInfo.pop(key)
+        for item, r in zip(self.m_items, result):
+            if r is None:
                 continue
-            # 开始调整
-            colwidth = oneColCanexpandWidth + oldColumnWidth
-            value['columnExpandedWidth'] = columnMaximumWidth if colwidth > columnMaximumWidth else colwidth
-        # 重新调整尺寸，由于会涉及其他列的变更，因此需要所有都遍历一遍
-        for key, value in columnExpandInfo.items():
-            moveXLen = value['columnExpandedWidth'] - value['oldColumnWidth']
-            for item in self.m_items:
-                if item.isEmpty() or item.columnIndex < key:
-                    continue
-                if item.columnIndex == key:     # 此列的扩展
-                    if item in value['expandItems']:
-                        item.itemWillSetGeometry.setWidth(value['columnExpandedWidth'])
-                    else:
-                        continue
-                else:
-                    # 后面item的往左移动
-                    item.itemWillSetGeometry.moveLeft(item.itemWillSetGeometry.x()+moveXLen)
-
-    def columnWidthInfo(self, colindex: int, width: int, maximum: int) -> (int, int):
-        rwidth = width
-        rmaximum = maximum
-        for item in self.m_items:
-            if not item.isEmpty() and item.columnIndex == colindex:
-                rwidth = max(rwidth, item.itemWillSetGeometry.width())
-                rmaximum = max(rmaximum, item.widget().maximumWidth())
-        return rwidth, rmaximum
+            offset, width = r
+            if offset:
+                item.itemWillSetGeometry.moveLeft(item.itemWillSetGeometry.x() + offset)
+            if width >= 0:
+                item.itemWillSetGeometry.setWidth(width)
 
     # PannelLayoutMode
     ThreeRowMode = 0
     TwoRowMode = 1
+
+    # ReduceLevel 宽度不足时pannel的缩减级别，级别越高占用的宽度越小
+    ReduceNone = 0          # 不缩减
+    ReduceMedium = 1        # 大按钮变为中等按钮
+    ReduceSmall = 2         # 所有按钮变为仅显示图标的小按钮
+    ReduceCollapsed = 3     # 整个pannel折叠为一个按钮，点击后弹出
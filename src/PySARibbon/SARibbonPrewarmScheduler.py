@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonPrewarmScheduler
+@Author     ROOT
+
+@brief 利用空闲时间预热ribbon
+主窗口第一次显示后，非当前的标签页还没有进行过布局，按钮图标也还没有生成对应尺寸的pixmap，
+第一次切换到这些标签页时会集中完成这些工作，造成明显的卡顿
+
+SARibbonPrewarmScheduler把这些工作拆分为很小的任务（一个category的布局，一个按钮图标的pixmap），
+通过0超时的QTimer在事件循环空闲时分片执行，每一片的执行时间不超过sliceBudget毫秒，
+因此不会阻塞用户的操作，任何时候都可以通过cancel取消
+
+默认情况下延迟构建的标签页(SARibbonLazyCategory)不会被预热，
+可通过setPrewarmLazyCategory(True)让其在空闲时完成构建
+@code
+scheduler = ribbon.prewarmScheduler()
+scheduler.setSliceBudget(4)
+scheduler.start()
+@endcode
+"""
+import time
+from functools import partial
+from typing import Callable, Iterator, Union
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .SAWidgets.SARibbonToolButton import SARibbonToolButton
+from .SARibbonCategory import SARibbonCategory
+from .SARibbonLazyCategory import SARibbonLazyCategory
+
+
+class SARibbonPrewarmScheduler(QObject):
+    def __init__(self, bar):
+        super().__init__(bar)
+        self.m_bar = bar
+        self.m_sliceBudget = 8                  # 每一片的时间预算，单位ms
+        self.m_isPrewarmLazyCategory = False    # 是否构建延迟构建的标签页
+        self.m_tasks: Union[Iterator[Callable], None] = None
+        self.m_finishedTaskCount = 0
+        self.m_sliceCount = 0
+        self.m_timer = QTimer(self)
+        self.m_timer.setSingleShot(True)
+        self.m_timer.setInterval(0)
+        self.m_timer.timeout.connect(self.onTimeout)
+
+    def setSliceBudget(self, ms: float):
+        """设置每一片的时间预算，单位ms，每一片至少会执行一个任务"""
+        self.m_sliceBudget = max(0, ms)
+
+    def sliceBudget(self) -> float:
+        return self.m_sliceBudget
+
+    def setPrewarmLazyCategory(self, on: bool):
+        """设置是否在空闲时构建延迟构建的标签页，默认不构建"""
+        self.m_isPrewarmLazyCategory = on
+
+    def isPrewarmLazyCategory(self) -> bool:
+        return self.m_isPrewarmLazyCategory
+
+    def start(self):
+        """开始预热，如果正在预热，会从头开始"""
+        self.m_tasks = self.taskGenerator()
+        self.m_finishedTaskCount = 0
+        self.m_sliceCount = 0
+        self.m_timer.start()
+
+    def cancel(self):
+        """取消预热，未执行的任务将被丢弃"""
+        if self.m_tasks is None:
+            return
+        self.m_timer.stop()
+        self.m_tasks = None
+        self.canceled.emit()
+
+    def isRunning(self) -> bool:
+        return self.m_tasks is not None
+
+    def finishedTaskCount(self) -> int:
+        """已执行的任务数"""
+        return self.m_finishedTaskCount
+
+    def sliceCount(self) -> int:
+        """已执行的分片数"""
+        return self.m_sliceCount
+
+    def taskGenerator(self) -> Iterator[Callable]:
+        """
+        生成预热任务，每个category先布局，再生成其按钮的图标pixmap
+        任务在执行时才生成，因此期间的添加删除都能反映出来
+        """
+        bar = self.m_bar
+        for category in bar.categoryPages():
+            if category is bar.currentCategory():
+                # 当前标签页已经在显示，不需要预热
+                continue
+            if isinstance(category, SARibbonLazyCategory) and not category.isRealized():
+                if not self.m_isPrewarmLazyCategory:
+                    continue
+                yield category.realize
+            yield partial(SARibbonPrewarmScheduler.relayoutCategory, category)
+            for btn in category.findChildren(SARibbonToolButton):
+                yield btn.prewarmIconPixmap
+
+    @staticmethod
+    def relayoutCategory(category: SARibbonCategory):
+        """
+        按标签页容器当前的尺寸布局category
+        隐藏的标签页不会随容器调整尺寸（如容器调整尺寸之后才添加的标签页），先调整为容器的尺寸，避免按过期的尺寸布局
+        """
+        container = category.parentWidget()
+        if container is not None:
+            size = container.contentsRect().size()
+            if category.size() != size:
+                category.resize(size)
+        category.relayout()
+
+    def onTimeout(self):
+        if self.m_tasks is None:
+            return
+        deadline = time.perf_counter() + self.m_sliceBudget / 1000
+        self.m_sliceCount += 1
+        while True:
+            try:
+                task = next(self.m_tasks)
+            except StopIteration:
+                self.m_tasks = None
+                self.finished.emit()
+                return
+            except RuntimeError:
+                # 生成任务时窗口已经被删除，生成器随之结束，下一次next会得到StopIteration
+                continue
+            try:
+                task()
+            except RuntimeError:
+                # 执行任务前窗口已经被删除
+                pass
+            self.m_finishedTaskCount += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.m_timer.start()
+
+    # 信号
+    finished = pyqtSignal()     # 所有任务执行完成
+    canceled = pyqtSignal()     # 预热被取消
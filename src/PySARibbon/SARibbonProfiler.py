@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonProfiler
+@Author     ROOT
+
+@brief ribbon窗口的绘制和布局耗时统计
+开启后对SARibbonBar、SARibbonCategory、SARibbonPannel、SARibbonToolButton、SARibbonGallery的
+paintEvent、resizeEvent、setGeometry、sizeHint进行包装，按类和objectName统计调用次数和耗时分布
+
+包装是开启时才通过SARibbonMethodHooks替换到类上的，关闭后恢复原来的函数，因此不开启时没有任何额外开销
+Qt的虚函数只有在python中重写过才会被C++调用到包装函数，类中没有重写的虚函数(如SARibbonCategory.paintEvent)，
+只有在开启之后创建的窗口才能统计到；setGeometry不是虚函数，只能统计到python代码中的调用
+
+@code
+SARibbonProfiler.setEnabled(True)
+......
+print(SARibbonProfiler.dump())
+stat = SARibbonProfiler.statistics()
+SARibbonProfiler.reset()
+@endcode
+"""
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from PyQt5.QtWidgets import QWidget
+
+from .SATools.SARibbonMethodHooks import SARibbonMethodHooks
+from .SAWidgets.SARibbonToolButton import SARibbonToolButton
+from .SARibbonBar import SARibbonBar
+from .SARibbonCategory import SARibbonCategory
+from .SARibbonPannel import SARibbonPannel
+from .SARibbonGallery import SARibbonGallery
+
+PROFILE_METHODS = ('paintEvent', 'resizeEvent', 'setGeometry', 'sizeHint')
+PROFILE_HISTOGRAM_BOUNDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)    # 耗时分布的区间上限，单位ms
+
+
+class _SARibbonProfileRecord:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self.histogram: List[int] = [0] * (len(PROFILE_HISTOGRAM_BOUNDS) + 1)  # 最后一个区间为超过100ms
+
+    def add(self, ms: float):
+        if self.count == 0 or ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+        self.count += 1
+        self.total += ms
+        self.histogram[bisect_left(PROFILE_HISTOGRAM_BOUNDS, ms)] += 1
+
+    def toDict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'min_ms': self.min,
+            'max_ms': self.max,
+            'histogram': list(self.histogram),
+        }
+
+
+class SARibbonProfiler:
+    s_classes = [SARibbonBar, SARibbonCategory, SARibbonPannel, SARibbonToolButton, SARibbonGallery]
+    s_isEnabled = False
+    s_classRecords: Dict[Tuple[str, str], _SARibbonProfileRecord] = dict()          # (类名, 函数名) -> 统计
+    s_objectRecords: Dict[Tuple[str, str, str], _SARibbonProfileRecord] = dict()    # (类名, objectName, 函数名) -> 统计
+
+    @staticmethod
+    def setEnabled(on: bool):
+        """开启或关闭统计，关闭时恢复原来的函数，已有的统计结果保留"""
+        if on == SARibbonProfiler.s_isEnabled:
+            return
+        SARibbonProfiler.s_isEnabled = on
+        if on:
+            for cls in SARibbonProfiler.s_classes:
+                for name in PROFILE_METHODS:
+                    SARibbonProfiler.install(cls, name)
+        else:
+            SARibbonMethodHooks.uninstallAll(SARibbonProfiler)
+
+    @staticmethod
+    def isEnabled() -> bool:
+        return SARibbonProfiler.s_isEnabled
+
+    @staticmethod
+    def install(cls: type, name: str):
+        """包装cls的name函数，继承而来的函数也会在cls上包装，统计结果记在cls的类名下"""
+        record = SARibbonProfiler.record
+        className = cls.__name__
+
+        def callback(obj, t0: float, t1: float, args: tuple):
+            record(className, obj.objectName(), name, (t1 - t0) * 1000)
+
+        SARibbonMethodHooks.install(cls, name, SARibbonProfiler, callback)
+
+    @staticmethod
+    def record(className: str, objectName: str, method: str, ms: float):
+        """记录一次调用的耗时，也可用于统计其他窗口的函数"""
+        records = SARibbonProfiler.s_classRecords
+        key = (className, method)
+        r = records.get(key, None)
+        if r is None:
+            r = records[key] = _SARibbonProfileRecord()
+        r.add(ms)
+        records = SARibbonProfiler.s_objectRecords
+        key = (className, objectName, method)
+        r = records.get(key, None)
+        if r is None:
+            r = records[key] = _SARibbonProfileRecord()
+        r.add(ms)
+
+    @staticmethod
+    def reset():
+        """清空统计结果"""
+        SARibbonProfiler.s_classRecords.clear()
+        SARibbonProfiler.s_objectRecords.clear()
+
+    @staticmethod
+    def statistics() -> dict:
+        """
+        统计结果
+        {
+            'histogram_bounds_ms': [...],
+            'classes': {类名: {函数名: 统计}},
+            'objects': {类名: {objectName: {函数名: 统计}}},
+        }
+        统计为{'count', 'total_ms', 'mean_ms', 'min_ms', 'max_ms', 'histogram'}，
+        histogram比histogram_bounds_ms多一个区间，为超过最后一个上限的次数
+        """
+        classes = dict()
+        for (className, method), r in SARibbonProfiler.s_classRecords.items():
+            classes.setdefault(className, dict())[method] = r.toDict()
+        objects = dict()
+        for (className, objectName, method), r in SARibbonProfiler.s_objectRecords.items():
+            objects.setdefault(className, dict()).setdefault(objectName, dict())[method] = r.toDict()
+        return {
+            'histogram_bounds_ms': list(PROFILE_HISTOGRAM_BOUNDS),
+            'classes': classes,
+            'objects': objects,
+        }
+
+    @staticmethod
+    def dump(byObject: bool = False, limit: int = 0) -> str:
+        """按总耗时从大到小输出统计表，byObject为True时按objectName分别输出，limit大于0时只输出前limit行"""
+        if byObject:
+            items = [('%s[%s].%s' % (c, o or '-', m), r) for (c, o, m), r in SARibbonProfiler.s_objectRecords.items()]
+        else:
+            items = [('%s.%s' % (c, m), r) for (c, m), r in SARibbonProfiler.s_classRecords.items()]
+        items.sort(key=lambda it: it[1].total, reverse=True)
+        if limit > 0:
+            items = items[:limit]
+        width = max([len(name) for name, _ in items] + [8])
+        lines = ['%-*s %8s %10s %9s %9s  %s' % (width, 'function', 'count', 'total(ms)', 'mean(ms)', 'max(ms)',
+                                               '<=' + '/'.join('%g' % b for b in PROFILE_HISTOGRAM_BOUNDS) + '/>')]
+        for name, r in items:
+            lines.append('%-*s %8d %10.2f %9.3f %9.3f  %s' % (width, name, r.count, r.total, r.total / r.count,
+                                                            r.max, '/'.join(str(n) for n in r.histogram)))
+        return '\n'.join(lines)
+
+    @staticmethod
+    def addProfiledClass(cls: type):
+        """增加需要统计的窗口类，需要在setEnabled(True)之前调用"""
+        if issubclass(cls, QWidget) and cls not in SARibbonProfiler.s_classes:
+            SARibbonProfiler.s_classes.append(cls)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonSpecBuilder
+@Author     ROOT
+
+@brief 通过声明式的描述(dict或json)构建ribbon
+描述的格式如下，除了title以外的字段都可以省略：
+{
+    'actions': [                            # 需要创建的action，也可以通过构造函数传入已有的action
+        {'id': 'new', 'text': '新建', 'icon': 'resource/icon/new.png', 'shortcut': 'Ctrl+N', 'toolTip': '',
+         'checkable': False, 'objectName': 'actNew'},
+    ],
+    'categories': [
+        {
+            'title': 'Main', 'objectName': 'main', 'lazy': False,
+            'pannels': [
+                {
+                    'title': 'File', 'objectName': 'file', 'expanding': False, 'reducePriority': 0,
+                    'optionAction': 'id',
+                    'items': [
+                        'new',                                  # action的id，和rp为large相同
+                        {'action': 'open', 'rp': 'large'},      # rp: large/medium/small/none，默认为large
+                        {'action': 'save', 'rp': 'small', 'menu': ['id', '|', {'title': '子菜单', 'items': [...]}],
+                         'popupMode': 'menuButton'},            # popupMode: instant/delayed/menuButton
+                        '|',                                    # 分割线，也可写为{'separator': True}
+                        {'widget': 'fontCombo', 'rp': 'small'}, # 通过构造函数传入的窗口或窗口的创建函数
+                        {'gallery': [{'title': '分组', 'items': ['id', {'text': '1', 'icon': 'a.png'}]}]},
+                    ]
+                },
+            ]
+        },
+    ],
+    'contextCategories': [
+        {'title': '表格', 'color': '#c9599c', 'id': 1, 'visible': False, 'categories': [...同上...]},
+    ],
+    'quickAccess': ['new', '|', 'save', {'menu': [...], 'title': '更多'}],
+}
+
+构建过程在SARibbonBar.batchUpdate中进行，期间category、pannel的布局和ribbonbar的resize都被推迟，
+构建完成后统一进行一次布局，report中记录每个category的构建耗时和最后布局的耗时，
+category的构建耗时以其在描述中的序号为key(先categories，再依次为contextCategories中的category)，标题可以重复
+@code
+builder = SARibbonSpecBuilder(ribbon, widgets={'fontCombo': QFontComboBox})
+report = builder.build(SARibbonSpecBuilder.loadJson('ribbon.json'))
+builder.action('new').triggered.connect(onNew)
+@endcode
+"""
+import json
+import time
+from typing import Callable, Dict, List, Union
+from PyQt5.QtGui import QColor, QIcon, QKeySequence
+from PyQt5.QtWidgets import QAction, QMenu, QToolButton, QWidget
+
+from .SAWidgets.SARibbonPannelItem import SARibbonPannelItem
+from .SARibbonCategory import SARibbonCategory
+from .SARibbonPannel import SARibbonPannel
+from .SARibbonGallery import SARibbonGallery
+
+SPEC_ROW_PROPORTIONS = {
+    'none': SARibbonPannelItem.RPNone,
+    'large': SARibbonPannelItem.RPLarge,
+    'medium': SARibbonPannelItem.RPMedium,
+    'small': SARibbonPannelItem.RPSmall,
+}
+SPEC_POPUP_MODES = {
+    'instant': QToolButton.InstantPopup,
+    'delayed': QToolButton.DelayedPopup,
+    'menuButton': QToolButton.MenuButtonPopup,
+}
+SPEC_SEPARATOR = '|'
+
+
+class SARibbonSpecBuilder:
+    def __init__(self, bar, actions: Dict[str, QAction] = None,
+                 widgets: Dict[str, Union[QWidget, Callable[[QWidget], QWidget]]] = None):
+        """
+        actions为已有的action，key为描述中引用的id
+        widgets为描述中引用的自定义窗口，值为窗口或以pannel为参数的创建函数
+        """
+        self.m_bar = bar
+        self.m_actions: Dict[str, QAction] = dict(actions or dict())
+        self.m_widgets = dict(widgets or dict())
+        self.m_buildTimes: Dict[int, float] = dict()    # category在描述中的序号 -> 构建耗时，单位ms
+        self.m_categoryCount = 0    # 已经处理的category数，用于确定序号
+        self.m_snapshot = None      # 构建过程中使用的布局快照
+
+    @staticmethod
+    def loadJson(path: str) -> dict:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def action(self, aid: str) -> QAction:
+        """通过id获取action，不存在时抛出异常"""
+        act = self.m_actions.get(aid, None)
+        if act is None:
+            raise Exception('unknown action id: %s' % aid)
+        return act
+
+    def actions(self) -> Dict[str, QAction]:
+        return dict(self.m_actions)
+
+    def buildTimes(self) -> Dict[str, float]:
+        """每个category的构建耗时，key为category在描述中的序号，单位ms，延迟构建的category在构建完成后才会记录"""
+        return dict(self.m_buildTimes)
+
+    def build(self, spec: dict, snapshot=None) -> dict:
+        """
+        按描述构建ribbon，返回构建报告
+        {'categories': {序号: 耗时}, 'layout_ms': 最后布局的耗时, 'total_ms': 总耗时, 'snapshot': 是否使用了快照}，
+        耗时单位ms
+        snapshot为SARibbonLayoutSnapshot，和描述及当前环境一致时，每个category构建完成后立即应用，
+        布局时不再计算按钮尺寸
+        """
+        bar = self.m_bar
+        start = time.perf_counter()
+        if snapshot is not None and not snapshot.isCompatible(bar, snapshot.specHash(spec)):
+            snapshot = None
+        self.m_snapshot = snapshot
+        visibleContexts = list()
+        with bar.batchUpdate():
+            for aspec in spec.get('actions', ()):
+                self.createAction(aspec)
+            for cspec in spec.get('categories', ()):
+                self.buildCategory(cspec)
+            for xspec in spec.get('contextCategories', ()):
+                context = self.buildContextCategory(xspec)
+                if xspec.get('visible', False):
+                    visibleContexts.append(context)
+            quickAccess = spec.get('quickAccess', None)
+            if quickAccess:
+                self.buildQuickAccess(quickAccess)
+        # 批量结束时推迟的category布局已经完成，这里立即进行resize，作为最后一次完整布局
+        layoutStart = time.perf_counter()
+        bar.geometryScheduler().flush()
+        if visibleContexts:
+            bar.setContextCategoriesVisible({c: True for c in visibleContexts})
+        end = time.perf_counter()
+        return {
+            'categories': self.buildTimes(),
+            'layout_ms': (end - layoutStart) * 1000,
+            'total_ms': (end - start) * 1000,
+            'snapshot': snapshot is not None,
+        }
+
+    def createAction(self, aspec: dict) -> QAction:
+        aid = aspec['id']
+        act = QAction(aspec.get('text', aid), self.m_bar.parentWidget() or self.m_bar)
+        if 'icon' in aspec:
+            act.setIcon(QIcon(aspec['icon']))
+        act.setObjectName(aspec.get('objectName', aid))
+        if 'shortcut' in aspec:
+            act.setShortcut(QKeySequence(aspec['shortcut']))
+        if 'toolTip' in aspec:
+            act.setToolTip(aspec['toolTip'])
+        if aspec.get('checkable', False):
+            act.setCheckable(True)
+            act.setChecked(aspec.get('checked', False))
+        self.m_actions[aid] = act
+        return act
+
+    def nextCategoryIndex(self) -> int:
+        index = self.m_categoryCount
+        self.m_categoryCount += 1
+        return index
+
+    def buildCategory(self, cspec: dict) -> SARibbonCategory:
+        title = cspec['title']
+        index = self.nextCategoryIndex()
+        start = time.perf_counter()
+        if cspec.get('lazy', False):
+            category = self.m_bar.addLazyCategoryPage(title, lambda c: self.fillCategory(c, cspec, index))
+        else:
+            category = self.m_bar.addCategoryPage(title)
+            self.fillCategory(category, cspec)
+            self.m_buildTimes[index] = (time.perf_counter() - start) * 1000
+        if 'objectName' in cspec:
+            category.setObjectName(cspec['objectName'])
+        return category
+
+    def buildContextCategory(self, xspec: dict):
+        title = xspec['title']
+        color = QColor(xspec['color']) if 'color' in xspec else None
+        context = self.m_bar.addContextCategory(title, color, xspec.get('id', None))
+        for cspec in xspec.get('categories', ()):
+            index = self.nextCategoryIndex()
+            start = time.perf_counter()
+            category = context.addCategoryPage(cspec['title'])
+            if 'objectName' in cspec:
+                category.setObjectName(cspec['objectName'])
+            self.fillCategory(category, cspec)
+            self.m_buildTimes[index] = (time.perf_counter() - start) * 1000
+        return context
+
+    def fillCategory(self, category: SARibbonCategory, cspec: dict, index: int = None):
+        """创建category中的pannel，延迟构建的category在第一次显示时调用，index为其序号"""
+        start = time.perf_counter()
+        for pspec in cspec.get('pannels', ()):
+            self.buildPannel(category, pspec)
+        if self.m_snapshot is not None:
+            self.m_snapshot.applyCategory(category)
+        if index is not None:
+            self.m_buildTimes[index] = (time.perf_counter() - start) * 1000
+
+    def buildPannel(self, category: SARibbonCategory, pspec: dict) -> SARibbonPannel:
+        pannel = category.addPannel(pspec['title'])
+        if 'objectName' in pspec:
+            pannel.setObjectName(pspec['objectName'])
+        if 'reducePriority' in pspec:
+            pannel.setReducePriority(pspec['reducePriority'])
+        # 批量添加，pannel的尺寸变化只通知category一次
+        with pannel.batchUpdate():
+            for item in pspec.get('items', ()):
+                self.buildPannelItem(pannel, item)
+        if 'optionAction' in pspec:
+            pannel.addOptionAction(self.action(pspec['optionAction']))
+        if pspec.get('expanding', False):
+            pannel.setExpanding()
+        return pannel
+
+    def buildPannelItem(self, pannel: SARibbonPannel, item):
+        if item == SPEC_SEPARATOR or (isinstance(item, dict) and item.get('separator', False)):
+            pannel.addSeparator()
+            return
+        if isinstance(item, str):
+            item = {'action': item}
+        rp = SPEC_ROW_PROPORTIONS[item.get('rp', 'large')]
+        if 'action' in item:
+            act = self.action(item['action'])
+            btn = pannel.addAction(act, rp)
+            if btn and 'menu' in item:
+                # 和SARibbonPannel.addActionMenu一样，菜单设置在按钮上，默认为MenuButtonPopup
+                btn.setMenu(self.buildMenu(pannel, act.text(), item['menu']))
+                btn.setPopupMode(QToolButton.MenuButtonPopup)
+            if btn and 'popupMode' in item:
+                btn.setPopupMode(SPEC_POPUP_MODES[item['popupMode']])
+        elif 'widget' in item:
+            w = self.m_widgets.get(item['widget'], None)
+            if w is None:
+                raise Exception('unknown widget: %s' % item['widget'])
+            if not isinstance(w, QWidget):
+                w = w(pannel)
+            pannel.addWidget(w, rp)
+        elif 'gallery' in item:
+            pannel.addGallery(self.buildGallery(pannel, item['gallery']))
+        else:
+            raise Exception('unknown pannel item: %s' % item)
+
+    def buildGallery(self, pannel: SARibbonPannel, groups: List[dict]) -> SARibbonGallery:
+        gallery = SARibbonGallery(pannel)
+        for gspec in groups:
+            items = gspec.get('items', ())
+            if all(isinstance(it, str) for it in items):
+                gallery.addCategoryActions(gspec.get('title', ''), [self.action(aid) for aid in items])
+                continue
+            group = gallery.addGalleryGroup()
+            if gspec.get('title', ''):
+                group.setGroupTitle(gspec['title'])
+            for it in items:
+                if isinstance(it, str):
+                    group.addActionItem(self.action(it))
+                else:
+                    group.addItem(it.get('text', ''), QIcon(it.get('icon', '')))
+        return gallery
+
+    def buildMenu(self, parent: QWidget, title: str, items: list) -> QMenu:
+        menu = QMenu(title, parent)
+        for it in items:
+            if it == SPEC_SEPARATOR:
+                menu.addSeparator()
+            elif isinstance(it, str):
+                menu.addAction(self.action(it))
+            else:
+                menu.addMenu(self.buildMenu(menu, it.get('title', ''), it.get('items', ())))
+        return menu
+
+    def buildQuickAccess(self, items: list):
+        quickAccessBar = self.m_bar.quickAccessBar()
+        for it in items:
+            if it == SPEC_SEPARATOR:
+                quickAccessBar.addSeparator()
+            elif isinstance(it, str):
+                quickAccessBar.addAction(self.action(it))
+            else:
+                menu = self.buildMenu(quickAccessBar, it.get('title', ''), it.get('menu', ()))
+                quickAccessBar.addMenu(menu, SPEC_POPUP_MODES[it.get('popupMode', 'instant')])
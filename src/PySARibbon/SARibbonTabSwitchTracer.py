@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonTabSwitchTracer
+@Author     ROOT
+
+@brief 标签页切换延迟的跟踪
+记录一次标签页切换过程中各个时间点：
+    点击标签(或按键) -> SARibbonBar.onCurrentRibbonTabChanged -> stacked窗口切换 -> category的第一次绘制 -> 所有绘制完成
+并据此分为以下几个阶段：
+    input   点击到标签切换，tabbar处理鼠标事件的耗时
+    build   标签切换到stacked窗口切换完成，包括延迟构建的标签页的构建，以及窗口显示时同步进行的布局
+    layout  stacked窗口切换完成到第一次绘制之间，category布局(SARibbonCategoryPrivate.updateItemGeometry)的耗时
+    wait    stacked窗口切换完成到第一次绘制之间，除layout以外的时间，主要是事件循环的等待
+    paint   第一次绘制到绘制完成，绘制完成以最后一次绘制之后事件循环回到空闲为准
+category布局的耗时通过SARibbonMethodHooks挂接计时，只在跟踪开启时挂接，
+整个切换过程中的布局总耗时和次数记录在layout_ms和layout_calls中，第一次和最后一次布局的时间点为layout_start和layout_end
+
+每个标签页保留最近historySize次的结果用于统计，所有结果可以通过exportTrace导出为json，
+总耗时高且build或layout占比大的标签页适合改为延迟构建
+@code
+tracer = ribbon.tabSwitchTracer()
+tracer.setEnabled(True)
+......
+print(tracer.statistics())
+tracer.exportTrace('tab_switch.json')
+@endcode
+"""
+import json
+import time
+import statistics
+from collections import deque
+from typing import Deque, Dict, List, Union
+from PyQt5.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from .SATools.SARibbonMethodHooks import SARibbonMethodHooks
+from .SARibbonCategory import SARibbonCategoryPrivate
+
+TAB_SWITCH_PHASES = ('input', 'build', 'layout', 'wait', 'paint')
+
+
+class SARibbonTabSwitchTracer(QObject):
+    def __init__(self, bar):
+        super().__init__(bar)
+        self.m_bar = bar
+        self.m_isEnabled = False
+        self.m_historySize = 50                     # 每个标签页保留的结果数量
+        self.m_timeout = 3000                       # 超过这个时间还没有绘制完成的切换被丢弃，单位ms
+        self.m_history: Dict[str, Deque[dict]] = dict()    # 标签页标题 -> 最近的结果
+        self.m_traces: Deque[dict] = deque(maxlen=1000)    # 所有的结果，用于导出
+        self.m_discardedCount = 0
+        self.m_current: Union[dict, None] = None   # 正在跟踪的切换
+        self.m_category: Union[QWidget, None] = None
+        self.m_pendingInput: Union[tuple, None] = None     # 还没有引起切换的(输入方式, 时间)
+        self.m_finishTimer = QTimer(self)
+        self.m_finishTimer.setSingleShot(True)
+        self.m_finishTimer.setInterval(0)
+        self.m_finishTimer.timeout.connect(self.onPaintFinished)
+        self.m_timeoutTimer = QTimer(self)
+        self.m_timeoutTimer.setSingleShot(True)
+        self.m_timeoutTimer.timeout.connect(self.onTimeout)
+
+    def setEnabled(self, on: bool):
+        """开启或关闭跟踪，默认关闭"""
+        if on == self.m_isEnabled:
+            return
+        self.m_isEnabled = on
+        tabBar = self.m_bar.ribbonTabBar()
+        if on:
+            tabBar.installEventFilter(self)
+            SARibbonMethodHooks.install(SARibbonCategoryPrivate, 'updateItemGeometry', self, self.onCategoryLayout)
+        else:
+            tabBar.removeEventFilter(self)
+            SARibbonMethodHooks.uninstall(SARibbonCategoryPrivate, 'updateItemGeometry', self)
+            self.discard()
+            self.m_pendingInput = None
+
+    def isEnabled(self) -> bool:
+        return self.m_isEnabled
+
+    def setHistorySize(self, size: int):
+        """设置每个标签页保留的结果数量"""
+        self.m_historySize = max(1, size)
+        for title, records in self.m_history.items():
+            self.m_history[title] = deque(records, maxlen=self.m_historySize)
+
+    def historySize(self) -> int:
+        return self.m_historySize
+
+    def setTimeout(self, ms: int):
+        """设置切换的超时时间，单位ms，超时仍没有绘制完成的切换被丢弃"""
+        self.m_timeout = ms
+
+    def timeout(self) -> int:
+        return self.m_timeout
+
+    def reset(self):
+        """清空所有结果"""
+        self.m_history.clear()
+        self.m_traces.clear()
+        self.m_discardedCount = 0
+
+    def discardedCount(self) -> int:
+        """被丢弃的切换次数，被下一次切换打断或超时"""
+        return self.m_discardedCount
+
+    def markTabChanged(self, index: int, category: QWidget):
+        """SARibbonBar.onCurrentRibbonTabChanged开始时调用"""
+        if not self.m_isEnabled:
+            return
+        now = time.perf_counter()
+        if self.m_current is not None:
+            self.discard()
+        trigger, start = 'api', now
+        if self.m_pendingInput is not None:
+            trigger, start = self.m_pendingInput
+            self.m_pendingInput = None
+        self.m_current = {
+            'tab': category.windowTitle(),
+            'objectName': category.objectName(),
+            'index': index,
+            'trigger': trigger,
+            'timestamps': {'input': start, 'tab_changed': now},
+            'layout_events': 0,
+            'layout_calls': 0,
+            'layout_ms': 0.0,
+            'layout_before_paint_ms': 0.0,
+            'paint_events': 0,
+        }
+        self.m_category = category
+        QApplication.instance().installEventFilter(self)
+        self.m_timeoutTimer.start(self.m_timeout)
+
+    def markStackedChanged(self):
+        """SARibbonBar切换stacked窗口后调用"""
+        if self.m_current is not None:
+            self.m_current['timestamps'].setdefault('stacked_changed', time.perf_counter())
+
+    def eventFilter(self, obj: QObject, e: QEvent) -> bool:
+        t = e.type()
+        if obj is self.m_bar.ribbonTabBar() and t in (QEvent.MouseButtonPress, QEvent.KeyPress, QEvent.Wheel):
+            # 此时还不知道是否会引起切换，先记录下来
+            self.m_pendingInput = ('click' if t == QEvent.MouseButtonPress else 'key' if t == QEvent.KeyPress else 'wheel',
+                                   time.perf_counter())
+            QTimer.singleShot(0, self.clearPendingInput)
+        elif self.m_current is not None and t in (QEvent.Paint, QEvent.LayoutRequest, QEvent.Resize) and \
+                isinstance(obj, QWidget) and (obj is self.m_category or self.m_category.isAncestorOf(obj)):
+            now = time.perf_counter()
+            stamps = self.m_current['timestamps']
+            if t == QEvent.Paint:
+                stamps.setdefault('first_paint', now)
+                stamps['last_paint'] = now
+                self.m_current['paint_events'] += 1
+                # 事件循环回到空闲时，这一轮绘制已经完成
+                self.m_finishTimer.start()
+            else:
+                self.m_current['layout_events'] += 1
+        return False
+
+    def onCategoryLayout(self, d: SARibbonCategoryPrivate, t0: float, t1: float, args: tuple):
+        """正在跟踪的category每次布局后调用"""
+        trace = self.m_current
+        if trace is None or d.ribbonCategory() is not self.m_category:
+            return
+        stamps = trace['timestamps']
+        stamps.setdefault('layout_start', t0)
+        stamps['layout_end'] = t1
+        ms = (t1 - t0) * 1000
+        trace['layout_calls'] += 1
+        trace['layout_ms'] += ms
+        if 'stacked_changed' in stamps and 'first_paint' not in stamps:
+            trace['layout_before_paint_ms'] += ms
+
+    def clearPendingInput(self):
+        self.m_pendingInput = None
+
+    def onPaintFinished(self):
+        trace = self.m_current
+        if trace is None:
+            return
+        self.stopTracking()
+        stamps = trace['timestamps']
+        stamps['complete'] = time.perf_counter()
+        stamps.setdefault('stacked_changed', stamps['tab_changed'])
+        toMs = lambda a, b: (stamps[b] - stamps[a]) * 1000
+        beforePaint = toMs('stacked_changed', 'first_paint')
+        layout = min(trace['layout_before_paint_ms'], beforePaint)
+        trace['phases_ms'] = {
+            'input': toMs('input', 'tab_changed'),
+            'build': toMs('tab_changed', 'stacked_changed'),
+            'layout': layout,
+            'wait': beforePaint - layout,
+            'paint': toMs('first_paint', 'complete'),
+        }
+        trace['total_ms'] = (stamps['complete'] - stamps['input']) * 1000
+        records = self.m_history.get(trace['tab'], None)
+        if records is None:
+            records = self.m_history[trace['tab']] = deque(maxlen=self.m_historySize)
+        records.append(trace)
+        self.m_traces.append(trace)
+        self.traceFinished.emit(trace)
+
+    def onTimeout(self):
+        self.discard()
+
+    def discard(self):
+        """丢弃正在跟踪的切换"""
+        if self.m_current is None:
+            return
+        self.stopTracking()
+        self.m_discardedCount += 1
+
+    def stopTracking(self):
+        self.m_finishTimer.stop()
+        self.m_timeoutTimer.stop()
+        QApplication.instance().removeEventFilter(self)
+        self.m_current = None
+        self.m_category = None
+
+    def history(self, title: str) -> List[dict]:
+        """标签页最近的结果"""
+        return list(self.m_history.get(title, ()))
+
+    def statistics(self) -> Dict[str, dict]:
+        """
+        每个标签页的统计，按平均总耗时从大到小排列
+        {标签页标题: {'count', 'total_mean_ms', 'total_median_ms', 'total_p95_ms', 'total_max_ms', 'phases_mean_ms'}}
+        """
+        res = dict()
+        for title, records in self.m_history.items():
+            if not records:
+                continue
+            totals = sorted(r['total_ms'] for r in records)
+            res[title] = {
+                'count': len(totals),
+                'total_mean_ms': statistics.mean(totals),
+                'total_median_ms': statistics.median(totals),
+                'total_p95_ms': totals[min(len(totals) - 1, int(len(totals) * 0.95))],
+                'total_max_ms': totals[-1],
+                'phases_mean_ms': {name: statistics.mean(r['phases_ms'][name] for r in records)
+                                   for name in TAB_SWITCH_PHASES},
+            }
+        return dict(sorted(res.items(), key=lambda it: it[1]['total_mean_ms'], reverse=True))
+
+    def exportTrace(self, path: str = '') -> dict:
+        """导出所有结果和统计，时间点为time.perf_counter()的秒数，path不为空时保存为json文件"""
+        report = {
+            'phases': list(TAB_SWITCH_PHASES),
+            'discarded': self.m_discardedCount,
+            'traces': list(self.m_traces),
+            'statistics': self.statistics(),
+        }
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        return report
+
+    # 信号
+    traceFinished = pyqtSignal(dict)    # 一次切换跟踪完成
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonTraceRecorder
+@Author     ROOT
+
+@brief ribbon内部各阶段的耗时记录，导出为Chrome trace event格式
+开启后记录以下函数的每一次调用，导出的json可以直接在chrome://tracing或Perfetto(ui.perfetto.dev)中打开：
+    build       category的创建、添加、延迟构建，pannel的添加
+    layout      SARibbonPannelLayout.updateGeomArray、SARibbonCategoryLayout.doLayout、category的布局、
+                SARibbonBar.resizeInOfficeStyle/resizeInWpsLiteStyle
+    paint       ribbon窗口的paintEvent
+    customize   自定义数据的应用
+
+每次调用记录为一个完整事件('ph': 'X')，args中带有类名、objectName和标题，
+同一线程中嵌套调用的事件在查看器中显示为嵌套的层级
+程序自己的处理可以通过span记录到同一个时间线上，这样可以看到ribbon的布局和绘制穿插在程序的哪些处理中
+
+函数的包装通过SARibbonMethodHooks进行，可以和SARibbonProfiler同时开启，不开启时没有任何额外开销，
+和SARibbonProfiler一样，python中没有重写的虚函数只有在开启之后创建的窗口才能记录到
+@code
+SARibbonTraceRecorder.setEnabled(True)
+with SARibbonTraceRecorder.span('load project', file=path):
+    ......
+SARibbonTraceRecorder.exportChromeTrace('ribbon_trace.json')
+@endcode
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QWidget, QLayout
+
+from .SATools.SARibbonMethodHooks import SARibbonMethodHooks
+from .SAWidgets.SARibbonToolButton import SARibbonToolButton
+from .SARibbonBar import SARibbonBar
+from .SARibbonCategory import SARibbonCategory, SARibbonCategoryPrivate
+from .SARibbonCategoryLayout import SARibbonCategoryLayout
+from .SARibbonLazyCategory import SARibbonLazyCategory
+from .SARibbonPannel import SARibbonPannel
+from .SARibbonPannelLayout import SARibbonPannelLayout
+from .SARibbonGallery import SARibbonGallery
+
+TRACE_MAX_EVENTS = 200000   # 默认最多保留的事件数量，超过后新的事件被丢弃
+
+
+class SARibbonTraceRecorder:
+    s_isEnabled = False
+    s_origin = 0.0              # 时间原点，time.perf_counter()的秒数
+    s_events: List[dict] = list()
+    s_maxEvents = TRACE_MAX_EVENTS
+    s_droppedCount = 0
+    s_threadNames = dict()      # 线程id -> 线程名
+    # (类, 函数名, 事件分类, 事件名)
+    s_hooks: List[Tuple[type, str, str, str]] = [
+        (SARibbonCategory, '__init__', 'build', 'SARibbonCategory.construct'),
+        (SARibbonBar, 'addCategoryPage', 'build', 'SARibbonBar.addCategoryPage'),
+        (SARibbonBar, 'insertCategoryPage', 'build', 'SARibbonBar.insertCategoryPage'),
+        (SARibbonLazyCategory, 'realize', 'build', 'SARibbonLazyCategory.realize'),
+        (SARibbonCategory, 'addPannel', 'build', 'SARibbonCategory.addPannel'),
+        (SARibbonCategory, 'insertPannel', 'build', 'SARibbonCategory.insertPannel'),
+        (SARibbonPannelLayout, 'updateGeomArray', 'layout', 'SARibbonPannelLayout.updateGeomArray'),
+        (SARibbonCategoryLayout, 'doLayout', 'layout', 'SARibbonCategoryLayout.doLayout'),
+        (SARibbonCategoryPrivate, 'updateItemGeometry', 'layout', 'SARibbonCategory.updateItemGeometry'),
+        (SARibbonBar, 'resizeInOfficeStyle', 'layout', 'SARibbonBar.resizeInOfficeStyle'),
+        (SARibbonBar, 'resizeInWpsLiteStyle', 'layout', 'SARibbonBar.resizeInWpsLiteStyle'),
+        (SARibbonBar, 'paintEvent', 'paint', 'SARibbonBar.paintEvent'),
+        (SARibbonCategory, 'paintEvent', 'paint', 'SARibbonCategory.paintEvent'),
+        (SARibbonPannel, 'paintEvent', 'paint', 'SARibbonPannel.paintEvent'),
+        (SARibbonToolButton, 'paintEvent', 'paint', 'SARibbonToolButton.paintEvent'),
+        (SARibbonGallery, 'paintEvent', 'paint', 'SARibbonGallery.paintEvent'),
+    ]
+
+    @staticmethod
+    def setEnabled(on: bool):
+        """开启或关闭记录，开启时清空之前的记录并以当前时间作为时间原点，关闭后记录保留，可以继续导出"""
+        if on == SARibbonTraceRecorder.s_isEnabled:
+            return
+        SARibbonTraceRecorder.s_isEnabled = on
+        if on:
+            SARibbonTraceRecorder.clear()
+            # 自定义模块依赖较多，用到时才导入
+            from .SACustomize.SARibbonCustomizeData import SARibbonCustomizeData
+            from .SACustomize.SARibbonCustomizeWidget import SARibbonCustomizeWidget
+            hooks = SARibbonTraceRecorder.s_hooks + [
+                (SARibbonCustomizeData, 'apply', 'customize', 'SARibbonCustomizeData.apply'),
+                (SARibbonCustomizeWidget, 'applys', 'customize', 'SARibbonCustomizeWidget.applys'),
+            ]
+            for cls, name, cat, label in hooks:
+                SARibbonTraceRecorder.install(cls, name, cat, label)
+        else:
+            SARibbonMethodHooks.uninstallAll(SARibbonTraceRecorder)
+
+    @staticmethod
+    def isEnabled() -> bool:
+        return SARibbonTraceRecorder.s_isEnabled
+
+    @staticmethod
+    def install(cls: type, name: str, cat: str, label: str = ''):
+        """记录cls的name函数的调用，也可用于记录其他类的函数，需要在setEnabled(True)之后调用"""
+        record = SARibbonTraceRecorder.record
+        label = label or '%s.%s' % (cls.__name__, name)
+        objectArgs = SARibbonTraceRecorder.objectArgs
+
+        def callback(obj, t0: float, t1: float, args: tuple):
+            record(label, cat, t0, t1, objectArgs(obj, args))
+
+        SARibbonMethodHooks.install(cls, name, SARibbonTraceRecorder, callback)
+
+    @staticmethod
+    def objectArgs(obj, callArgs: tuple = ()) -> dict:
+        """
+        事件的args，布局记录其所在的窗口，category的私有数据记录其category，
+        调用参数中的第一个参数是字符串或窗口时（如addCategoryPage的标题或category）也记录下来
+        """
+        if isinstance(obj, SARibbonCategoryPrivate):
+            obj = obj.ribbonCategory()
+        args = {'class': type(obj).__name__}
+        try:
+            if isinstance(obj, QLayout):
+                widget = obj.parentWidget()
+                if widget is not None:
+                    args['widget'] = widget.objectName()
+            if isinstance(obj, QObject):
+                args['objectName'] = obj.objectName()
+            if isinstance(obj, QWidget) and obj.windowTitle():
+                args['title'] = obj.windowTitle()
+        except RuntimeError:
+            # 在__init__中途抛出异常，C++对象可能还没有创建
+            pass
+        if hasattr(obj, 'keyValue') and hasattr(obj, 'actionType'):
+            # 自定义数据
+            args['actionType'] = obj.actionType()
+            args['key'] = str(obj.keyValue)
+            args['categoryObjName'] = obj.categoryObjNameValue
+        if callArgs:
+            target = callArgs[0]
+            if isinstance(target, str):
+                args['arg'] = target
+            elif isinstance(target, QWidget):
+                try:
+                    args['arg'] = target.windowTitle() or target.objectName()
+                except RuntimeError:
+                    pass
+        return args
+
+    @staticmethod
+    def record(name: str, cat: str, t0: float, t1: float, args: dict = None):
+        """记录一个完整事件，t0和t1为time.perf_counter()的秒数，未开启时不记录"""
+        if not SARibbonTraceRecorder.s_isEnabled:
+            return
+        SARibbonTraceRecorder.append({
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': (t0 - SARibbonTraceRecorder.s_origin) * 1e6,
+            'dur': (t1 - t0) * 1e6,
+            'args': args or dict(),
+        })
+
+    @staticmethod
+    def instant(name: str, cat: str = 'app', **args):
+        """记录一个瞬时事件，例如用户操作"""
+        if not SARibbonTraceRecorder.s_isEnabled:
+            return
+        SARibbonTraceRecorder.append({
+            'name': name,
+            'cat': cat,
+            'ph': 'i',
+            's': 't',
+            'ts': (time.perf_counter() - SARibbonTraceRecorder.s_origin) * 1e6,
+            'args': args,
+        })
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, cat: str = 'app', **args):
+        """
+        记录程序自己的一段处理，其中发生的ribbon事件显示为它的子事件
+        @code
+        with SARibbonTraceRecorder.span('open document', path=path):
+            ......
+        @endcode
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            SARibbonTraceRecorder.record(name, cat, t0, time.perf_counter(), args)
+
+    @staticmethod
+    def traced(name: str = '', cat: str = 'app') -> Callable:
+        """函数装饰器，记录函数的每一次调用"""
+        def decorator(func):
+            label = name or func.__qualname__
+
+            def wrapper(*args, **kwargs):
+                if not SARibbonTraceRecorder.s_isEnabled:
+                    return func(*args, **kwargs)
+                with SARibbonTraceRecorder.span(label, cat):
+                    return func(*args, **kwargs)
+
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            wrapper.__wrapped__ = func
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def append(event: dict):
+        if len(SARibbonTraceRecorder.s_events) >= SARibbonTraceRecorder.s_maxEvents:
+            SARibbonTraceRecorder.s_droppedCount += 1
+            return
+        thread = threading.current_thread()
+        event['pid'] = os.getpid()
+        event['tid'] = thread.ident
+        SARibbonTraceRecorder.s_threadNames.setdefault(thread.ident, thread.name)
+        SARibbonTraceRecorder.s_events.append(event)
+
+    @staticmethod
+    def clear():
+        """清空记录，并以当前时间作为时间原点"""
+        SARibbonTraceRecorder.s_events.clear()
+        SARibbonTraceRecorder.s_threadNames.clear()
+        SARibbonTraceRecorder.s_droppedCount = 0
+        SARibbonTraceRecorder.s_origin = time.perf_counter()
+
+    @staticmethod
+    def setMaxEvents(count: int):
+        """设置最多保留的事件数量"""
+        SARibbonTraceRecorder.s_maxEvents = max(0, count)
+
+    @staticmethod
+    def maxEvents() -> int:
+        return SARibbonTraceRecorder.s_maxEvents
+
+    @staticmethod
+    def droppedCount() -> int:
+        """超过数量上限被丢弃的事件数量"""
+        return SARibbonTraceRecorder.s_droppedCount
+
+    @staticmethod
+    def events() -> List[dict]:
+        """记录的事件，按开始时间排列，同一时间开始的事件外层在前"""
+        return sorted(SARibbonTraceRecorder.s_events, key=lambda e: (e['ts'], -e.get('dur', 0)))
+
+    @staticmethod
+    def exportChromeTrace(path: str = '') -> dict:
+        """导出为Chrome trace event格式，path不为空时保存为json文件"""
+        pid = os.getpid()
+        meta = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'SARibbon'}}]
+        for tid, name in SARibbonTraceRecorder.s_threadNames.items():
+            meta.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        report = {
+            'traceEvents': meta + SARibbonTraceRecorder.events(),
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped': SARibbonTraceRecorder.s_droppedCount},
+        }
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False)
+        return report
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonButtonBackgroundCache
+@Author     ROOT
+
+@brief 按钮背景的预渲染缓存
+按钮背景通过style().drawPrimitive绘制，使用qss主题时每次都要经过样式表引擎的匹配和绘制，
+分割按钮(MenuButtonPopup)一次绘制还要调用两次
+
+背景的绘制过程记录为一组(图元, 区域, 状态)，相同的绘制过程只渲染一次到透明的pixmap中，之后直接贴图，
+key中还包含style、调色板、设备像素比、主题版本，以及样式表的上下文：
+样式表的选择器除了按钮本身，还可以通过后代选择器匹配其祖先窗口，或者匹配动态属性，
+因此按钮及其所有祖先窗口的类名、objectName、动态属性和样式表都作为key的一部分，
+位于不同pannel(objectName不同)中的按钮不会共用缓存的背景
+样式上下文的计算需要遍历所有祖先窗口，由调用者(SARibbonToolButton)缓存，在样式、动态属性、父窗口变化时重新计算
+SARibbonMainWindow.loadTheme会增加主题版本，之前缓存的背景全部失效
+
+缓存默认关闭：offscreen下默认主题的测试中，每次绘制查找缓存的开销和直接绘制相当，
+使用复杂的qss主题时可以通过setCacheEnabled(True)开启，开启前应确认绘制耗时确实减少
+
+伪状态选择器只支持按钮本身的状态(由ops中的状态区分)，如果样式表使用了祖先窗口的伪状态（如QWidget:hover QToolButton），
+需要通过setCacheEnabled(False)关闭缓存
+"""
+from typing import List, Tuple
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPixmap, QPainter, QPalette
+from PyQt5.QtWidgets import QApplication, QWidget, QStyle, QStyleOption
+
+from .SARibbonLRUCache import SARibbonLRUCache
+
+BUTTON_BACKGROUND_CACHE_LIMIT = 8192    # 默认上限，单位KB
+
+BackgroundOp = Tuple[int, QRect, int]   # (QStyle.PrimitiveElement, 区域, QStyle.State)
+
+
+class SARibbonButtonBackgroundCache:
+    s_cache = SARibbonLRUCache(BUTTON_BACKGROUND_CACHE_LIMIT)
+    s_themeRevision = 0
+    s_isEnabled = False
+
+    @staticmethod
+    def drawBackground(widget: QWidget, painter: QPainter, palette: QPalette, ops: List[BackgroundOp],
+                       context: tuple = None):
+        """
+        按顺序绘制ops中的图元，相同的绘制过程直接使用缓存的pixmap
+        context为widget的样式上下文(styleContext的结果)，为None时在这里计算
+        """
+        if not ops:
+            return
+        style = widget.style()
+        if not SARibbonButtonBackgroundCache.s_isEnabled:
+            SARibbonButtonBackgroundCache.render(style, widget, painter, palette, ops)
+            return
+        size = widget.size()
+        dpr = widget.devicePixelRatioF()
+        if context is None:
+            context = SARibbonButtonBackgroundCache.styleContext(widget)
+        key = (context, palette.cacheKey(),
+               size.width(), size.height(), dpr, SARibbonButtonBackgroundCache.s_themeRevision,
+               tuple((int(pe), r.x(), r.y(), r.width(), r.height(), int(state)) for pe, r, state in ops))
+        cache = SARibbonButtonBackgroundCache.s_cache
+        pm = cache.object(key)
+        if pm is None:
+            pm = QPixmap(size * dpr)
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.transparent)
+            pp = QPainter(pm)
+            SARibbonButtonBackgroundCache.render(style, widget, pp, palette, ops)
+            pp.end()
+            cache.insert(key, pm, max(1, pm.width() * pm.height() * pm.depth() // 8192))
+        painter.drawPixmap(0, 0, pm)
+
+    @staticmethod
+    def styleContext(widget: QWidget) -> tuple:
+        """影响背景绘制的样式上下文：style对象和样式表上下文"""
+        # style()每次返回的python对象不同，使用其C++对象的地址区分
+        return sip.unwrapinstance(widget.style()), SARibbonButtonBackgroundCache.styleSheetContext(widget)
+
+    @staticmethod
+    def styleSheetContext(widget: QWidget) -> tuple:
+        """样式表选择器可能匹配到的内容：程序的样式表，窗口及其祖先窗口的类名、objectName、样式表和动态属性"""
+        context = [QApplication.instance().styleSheet()]
+        w = widget
+        while w is not None:
+            props = tuple((bytes(name), str(w.property(bytes(name).decode())))
+                          for name in w.dynamicPropertyNames() if not name.startsWith(b'_q_'))
+            context.append((w.metaObject().className(), w.objectName(), w.styleSheet(), props))
+            if w.isWindow():
+                break
+            w = w.parentWidget()
+        return tuple(context)
+
+    @staticmethod
+    def render(style: QStyle, widget: QWidget, painter: QPainter, palette: QPalette, ops: List[BackgroundOp]):
+        opt = QStyleOption(0)
+        opt.palette = palette
+        for pe, rect, state in ops:
+            opt.rect = rect
+            opt.state = state
+            style.drawPrimitive(pe, opt, painter, widget)
+
+    @staticmethod
+    def invalidate():
+        """主题改变，之前缓存的背景全部失效"""
+        SARibbonButtonBackgroundCache.s_themeRevision += 1
+        SARibbonButtonBackgroundCache.s_cache.clear()
+
+    @staticmethod
+    def themeRevision() -> int:
+        return SARibbonButtonBackgroundCache.s_themeRevision
+
+    @staticmethod
+    def setCacheEnabled(on: bool):
+        SARibbonButtonBackgroundCache.s_isEnabled = on
+        if not on:
+            SARibbonButtonBackgroundCache.s_cache.clear()
+
+    @staticmethod
+    def isCacheEnabled() -> bool:
+        return SARibbonButtonBackgroundCache.s_isEnabled
+
+    @staticmethod
+    def setMaxCost(kb: int):
+        """设置缓存上限，单位KB"""
+        SARibbonButtonBackgroundCache.s_cache.setMaxCost(kb)
+
+    @staticmethod
+    def maxCost() -> int:
+        return SARibbonButtonBackgroundCache.s_cache.maxCost()
+
+    @staticmethod
+    def statistics() -> dict:
+        """命中统计，totalCost单位为KB"""
+        return SARibbonButtonBackgroundCache.s_cache.statistics()
+
+    @staticmethod
+    def resetStatistics():
+        SARibbonButtonBackgroundCache.s_cache.resetStatistics()
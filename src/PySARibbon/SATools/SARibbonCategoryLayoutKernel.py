@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonCategoryLayoutKernel
+@Author     ROOT
+
+@brief category布局算法的纯python实现，不依赖Qt
+输入为每个pannel和分割线的宽度，输出为每个pannel和分割线的矩形(x, y, w, h)、滚动按钮的显示状态和自适应缩减的断点表，
+SARibbonCategory只负责从窗口收集尺寸并把结果设置回窗口
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+CategoryKernelItem = Optional[Tuple[int, int, bool]]    # (pannel宽度, 分割线宽度, 是否可扩展)，None表示隐藏
+CategoryKernelWidth = Optional[Tuple[int, int]]         # (pannel宽度, 分割线宽度)，None表示隐藏
+Rect = Tuple[int, int, int, int]
+
+
+class SARibbonCategoryLayoutKernel:
+    @staticmethod
+    def totalWidth(items: List[CategoryKernelItem], marginWidth: int = 0) -> int:
+        """所有显示的pannel和分割线的宽度总和，marginWidth为左右边距之和"""
+        total = marginWidth
+        for item in items:
+            if item is not None:
+                total += item[0] + item[1]
+        return total
+
+    @staticmethod
+    def calcWidths(contentWidth: int, items: List[CategoryKernelItem],
+                   marginWidth: int = 0) -> Tuple[int, List[CategoryKernelWidth]]:
+        """
+        计算每个pannel和分割线的宽度，宽度足够时多出的宽度平均分给可扩展的pannel
+        返回(sizeHint总宽度, [(pannel宽度, 分割线宽度) or None, ...])
+        """
+        total = SARibbonCategoryLayoutKernel.totalWidth(items, marginWidth)
+        expandWidth = 0
+        if total <= contentWidth:
+            canExpandingCount = sum(1 for item in items if item is not None and item[2])
+            expandWidth = (contentWidth - total) / canExpandingCount if canExpandingCount > 0 else 0
+        widths = list()
+        for item in items:
+            if item is None:
+                widths.append(None)
+                continue
+            pannelWidth, separatorWidth, isExpanding = item
+            if isExpanding:
+                # 可扩展，就把pannel扩展到最大
+                pannelWidth = int(pannelWidth + expandWidth)
+            widths.append((pannelWidth, separatorWidth))
+        return total, widths
+
+    @staticmethod
+    def placeItems(widths: List[CategoryKernelWidth], x: int, y: int,
+                   height: int) -> Tuple[List[Optional[Tuple[Rect, Rect]]], int]:
+        """
+        从x开始依次排列pannel和分割线
+        返回([(pannel矩形, 分割线矩形) or None, ...], 总宽度)
+        """
+        rects = list()
+        total = 0
+        for w in widths:
+            if w is None:
+                rects.append(None)
+                continue
+            pannelWidth, separatorWidth = w
+            pannelRect = (x, y, pannelWidth, height)
+            x += pannelWidth
+            rects.append((pannelRect, (x, y, separatorWidth, height)))
+            x += separatorWidth
+            total += pannelWidth + separatorWidth
+        return rects, total
+
+    @staticmethod
+    def scrollButtonState(total: int, contentWidth: int, xBase: int) -> Tuple[bool, bool]:
+        """根据总宽度和滚动位置判断(左滚动按钮, 右滚动按钮)是否显示"""
+        if total <= contentWidth:
+            return False, False
+        # 超过总长度，需要显示滚动按钮
+        if xBase == 0:
+            # 已经移动到最左，需要可以向右移动
+            return False, True
+        elif xBase <= contentWidth - total:
+            # 已经移动到最右，需要可以向左移动
+            return True, False
+        # 移动到中间两边都可以动
+        return True, True
+
+    @staticmethod
+    def buildReduceTable(baseWidth: int, levelWidths: Dict[int, List[int]], order: List[int],
+                         itemCount: int) -> Tuple[List[int], List[Tuple[int, ...]]]:
+        """
+        计算所有缩减状态及其所需的宽度
+        baseWidth为不缩减时的总宽度，levelWidths为item索引到其各个缩减级别宽度的映射，order为同一级别内缩减的顺序
+        从不缩减开始，按级别逐级缩减，同一级别内按order逐个缩减，只有宽度减小的缩减才会成为一个新的状态，
+        返回按宽度从小到大排列的(宽度列表, 状态列表)，状态为每个item的缩减级别
+        """
+        total = baseWidth
+        levels = [0] * itemCount
+        states = [(total, tuple(levels))]
+        levelCount = max((len(w) for w in levelWidths.values()), default=1)
+        for level in range(1, levelCount):
+            for i in order:
+                widths = levelWidths[i]
+                if widths[level] < widths[levels[i]]:
+                    total -= widths[levels[i]] - widths[level]
+                    levels[i] = level
+                    states.append((total, tuple(levels)))
+        states.reverse()
+        return [w for w, _ in states], [st for _, st in states]
+
+    @staticmethod
+    def reduceStateIndex(reduceWidths: List[int], width: int) -> int:
+        """二分查找能放下的缩减最少的状态，都放不下时返回缩减最多的状态"""
+        return max(bisect_right(reduceWidths, width) - 1, 0)
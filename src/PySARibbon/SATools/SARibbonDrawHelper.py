@@ -7,6 +7,8 @@ from PyQt5.QtCore import Qt, QSize, QRect
 from PyQt5.QtGui import QPixmap, QIcon, QPainter
 from PyQt5.QtWidgets import QWidget, QStyleOption, QStyle
 
+from .SARibbonIconPixmapCache import SARibbonIconPixmapCache
+
 
 class SARibbonDrawHelper:
     """
@@ -24,7 +26,7 @@ class SARibbonDrawHelper:
         if (opt.state & QStyle.State_Selected) or (opt.state & QStyle.State_On):
             state = QIcon.On
 
-        return icon.pixmap(widget.window().windowHandle(), icoSize, mode, state)
+        return SARibbonIconPixmapCache.pixmap(icon, widget, icoSize, mode, state)
 
     @staticmethod
     def drawIcon(icon: QIcon, painter: QPainter, opt: QStyleOption, *_args):
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonIconPixmapCache
+@Author     ROOT
+
+@brief 全局共享的图标pixmap缓存
+QIcon.pixmap每次调用都要查找或重新生成对应尺寸、模式的pixmap，svg图标还需要重新渲染，
+鼠标划过一排按钮时这部分开销占了绘制的大部分时间
+
+缓存以(图标cacheKey, 尺寸, 模式, 状态, 设备像素比)为key，按pixmap占用的内存计算开销，
+超过上限时淘汰最久未使用的pixmap，上限默认为10MB，和QPixmapCache一致
+图标内容改变后其cacheKey也会改变，因此不需要手动清理缓存
+"""
+from PyQt5.QtCore import Qt, QSize, QRect
+from PyQt5.QtGui import QIcon, QPixmap, QPainter
+from PyQt5.QtWidgets import QWidget, QStyle, QApplication
+
+from .SARibbonLRUCache import SARibbonLRUCache
+
+ICON_PIXMAP_CACHE_LIMIT = 10240     # 默认上限，单位KB
+
+
+class SARibbonIconPixmapCache:
+    s_cache = SARibbonLRUCache(ICON_PIXMAP_CACHE_LIMIT)
+
+    @staticmethod
+    def pixmap(icon: QIcon, widget: QWidget, size: QSize, mode=QIcon.Normal, state=QIcon.Off) -> QPixmap:
+        """
+        获取图标在widget上显示用的pixmap，等价于icon.pixmap(widget.window().windowHandle(), size, mode, state)
+        命中缓存时不需要查找windowHandle，也不需要重新生成pixmap
+        """
+        if icon.isNull() or size.isEmpty():
+            return QPixmap()
+        dpr = widget.devicePixelRatioF() if widget else QApplication.instance().devicePixelRatio()
+        key = (icon.cacheKey(), size.width(), size.height(), int(mode), int(state), dpr)
+        cache = SARibbonIconPixmapCache.s_cache
+        pm = cache.object(key)
+        if pm is None:
+            window = widget.window().windowHandle() if widget else None
+            pm = icon.pixmap(window, size, mode, state)
+            if not pm.isNull():
+                cache.insert(key, pm, max(1, pm.width() * pm.height() * pm.depth() // 8192))
+        return pm
+
+    @staticmethod
+    def paintIcon(icon: QIcon, painter: QPainter, widget: QWidget, rect: QRect, alignment=Qt.AlignCenter,
+                  mode=QIcon.Normal, state=QIcon.Off):
+        """使用缓存的pixmap绘制图标，效果等同于QIcon.paint"""
+        pm = SARibbonIconPixmapCache.pixmap(icon, widget, rect.size(), mode, state)
+        if pm.isNull():
+            return
+        s = QSize(int(pm.width() / pm.devicePixelRatio()), int(pm.height() / pm.devicePixelRatio()))
+        direction = widget.layoutDirection() if widget else QApplication.layoutDirection()
+        painter.drawPixmap(QStyle.alignedRect(direction, alignment, s, rect), pm)
+
+    @staticmethod
+    def setMaxCost(kb: int):
+        """设置缓存上限，单位KB"""
+        SARibbonIconPixmapCache.s_cache.setMaxCost(kb)
+
+    @staticmethod
+    def maxCost() -> int:
+        return SARibbonIconPixmapCache.s_cache.maxCost()
+
+    @staticmethod
+    def clear():
+        SARibbonIconPixmapCache.s_cache.clear()
+
+    @staticmethod
+    def statistics() -> dict:
+        """命中统计，totalCost单位为KB"""
+        return SARibbonIconPixmapCache.s_cache.statistics()
+
+    @staticmethod
+    def resetStatistics():
+        SARibbonIconPixmapCache.s_cache.resetStatistics()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonLRUCache
+@Author     ROOT
+
+@brief 最近最少使用缓存，接口参考QCache
+每个对象插入时可指定开销cost，总开销超过maxCost时淘汰最久未使用的对象
+"""
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class SARibbonLRUCache:
+    def __init__(self, maxCost: int = 100):
+        self.m_maxCost = maxCost
+        self.m_totalCost = 0
+        self.m_items = OrderedDict()    # key -> (object, cost)
+        self.m_hits = 0
+        self.m_misses = 0
+
+    def object(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存的对象，并标记为最近使用，不存在返回default"""
+        item = self.m_items.get(key, None)
+        if item is None:
+            self.m_misses += 1
+            return default
+        self.m_hits += 1
+        self.m_items.move_to_end(key)
+        return item[0]
+
+    def insert(self, key: Hashable, obj: Any, cost: int = 1) -> bool:
+        """插入对象，cost超过maxCost时不会插入，返回是否插入成功"""
+        self.remove(key)
+        if cost > self.m_maxCost:
+            return False
+        self.m_items[key] = (obj, cost)
+        self.m_totalCost += cost
+        self.trim(self.m_maxCost)
+        return True
+
+    def contains(self, key: Hashable) -> bool:
+        return key in self.m_items
+
+    def remove(self, key: Hashable) -> bool:
+        item = self.m_items.pop(key, None)
+        if item is None:
+            return False
+        self.m_totalCost -= item[1]
+        return True
+
+    def clear(self):
+        self.m_items.clear()
+        self.m_totalCost = 0
+
+    def trim(self, cost: int):
+        """淘汰最久未使用的对象，直到总开销不超过cost"""
+        while self.m_items and self.m_totalCost > cost:
+            _, item = self.m_items.popitem(last=False)
+            self.m_totalCost -= item[1]
+
+    def setMaxCost(self, cost: int):
+        self.m_maxCost = cost
+        self.trim(cost)
+
+    def maxCost(self) -> int:
+        return self.m_maxCost
+
+    def totalCost(self) -> int:
+        return self.m_totalCost
+
+    def count(self) -> int:
+        return len(self.m_items)
+
+    def statistics(self) -> dict:
+        """命中统计"""
+        total = self.m_hits + self.m_misses
+        return {'hits': self.m_hits, 'misses': self.m_misses,
+                'hitRatio': self.m_hits / total if total else 0.0,
+                'count': len(self.m_items), 'totalCost': self.m_totalCost}
+
+    def resetStatistics(self):
+        self.m_hits = 0
+        self.m_misses = 0
+
+    def __len__(self):
+        return len(self.m_items)
+
+    def __contains__(self, key: Hashable):
+        return key in self.m_items
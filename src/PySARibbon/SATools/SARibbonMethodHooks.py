@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonMethodHooks
+@Author     ROOT
+
+@brief 在类的函数上挂接计时回调
+同一个函数只包装一次，可以有多个使用者(如SARibbonProfiler和SARibbonTraceRecorder)同时挂接回调，
+回调的参数为(对象, 开始时间, 结束时间, 调用参数)，时间为time.perf_counter()的秒数，
+所有使用者都取消挂接后恢复原来的函数，因此没有挂接时没有任何额外开销
+"""
+import time
+from typing import Callable, Dict, Tuple
+
+HookCallback = Callable[[object, float, float, tuple], None]
+
+
+class SARibbonMethodHooks:
+    s_hooks: Dict[Tuple[type, str], Tuple[object, Dict[object, HookCallback]]] = dict()   # (类, 函数名) -> (类中原来的函数, {使用者: 回调})
+
+    @staticmethod
+    def install(cls: type, name: str, owner: object, callback: HookCallback) -> bool:
+        """
+        在cls的name函数上挂接回调，继承而来的函数也会在cls上包装
+        如果函数是从已经包装过的父类继承来的，不进行包装，返回False，避免同一次调用被统计两次
+        """
+        key = (cls, name)
+        hook = SARibbonMethodHooks.s_hooks.get(key, None)
+        if hook is None:
+            own = cls.__dict__.get(name, None)
+            func = getattr(cls, name)
+            if own is None and getattr(func, 'isMethodHook', False):
+                return False
+            listeners: Dict[object, HookCallback] = dict()
+
+            def wrapper(self, *args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return func(self, *args, **kwargs)
+                finally:
+                    t1 = time.perf_counter()
+                    for cb in tuple(listeners.values()):
+                        cb(self, t0, t1, args)
+
+            wrapper.__name__ = name
+            wrapper.__doc__ = getattr(func, '__doc__', None)
+            wrapper.__wrapped__ = func
+            wrapper.isMethodHook = True
+            setattr(cls, name, wrapper)
+            hook = SARibbonMethodHooks.s_hooks[key] = (own, listeners)
+        hook[1][owner] = callback
+        return True
+
+    @staticmethod
+    def uninstall(cls: type, name: str, owner: object):
+        """取消owner在cls的name函数上的回调，没有回调时恢复原来的函数"""
+        key = (cls, name)
+        hook = SARibbonMethodHooks.s_hooks.get(key, None)
+        if hook is None:
+            return
+        own, listeners = hook
+        listeners.pop(owner, None)
+        if listeners:
+            return
+        del SARibbonMethodHooks.s_hooks[key]
+        if own is None:
+            delattr(cls, name)
+        else:
+            setattr(cls, name, own)
+
+    @staticmethod
+    def uninstallAll(owner: object):
+        """取消owner挂接的所有回调"""
+        for cls, name in [k for k, (_, listeners) in SARibbonMethodHooks.s_hooks.items() if owner in listeners]:
+            SARibbonMethodHooks.uninstall(cls, name, owner)
+
+    @staticmethod
+    def isInstalled(cls: type, name: str, owner: object = None) -> bool:
+        """cls的name函数是否被包装，owner不为None时判断owner是否挂接了回调"""
+        hook = SARibbonMethodHooks.s_hooks.get((cls, name), None)
+        if hook is None:
+            return False
+        return owner is None or owner in hook[1]
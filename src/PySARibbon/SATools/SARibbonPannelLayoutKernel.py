@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonPannelLayoutKernel
+@Author     ROOT
+
+@brief pannel布局算法的纯python实现，不依赖Qt
+输入为每个item的宽度和行占比，输出为每个item的矩形(x, y, w, h)及其所在的行列，
+SARibbonPannelLayout只负责从窗口收集尺寸并把结果设置回窗口，
+因此布局算法可以脱离界面单独进行性能分析，或用大量生成的数据进行验证
+
+@code
+kernel = SARibbonPannelLayoutKernel(rowCount=3, spacing=1, margins=(3, 3, 3, 3), titleHeight=21)
+placements, states, endState = kernel.layout(98, [(80, kernel.RPLarge), None, (60, kernel.RPSmall)])
+columnCount, totalWidth = kernel.measure(endState)
+@endcode
+"""
+from typing import List, Optional, Tuple
+
+PannelKernelItem = Optional[Tuple[int, int]]                    # (宽度, 行占比)，None表示隐藏
+PannelKernelPlacement = Optional[Tuple[int, int, int, int, int, int]]   # (x, y, w, h, 行, 列)，None表示隐藏
+PannelKernelState = Tuple[int, int, int, int, int]              # (row, column, columMaxWidth, x, lastRow0RP)
+PannelKernelColumnItem = Optional[Tuple[int, int, bool, int]]   # (列, 宽度, 是否水平扩展, 最大宽度)
+
+
+class SARibbonPannelLayoutKernel:
+    def __init__(self, rowCount: int = 3, spacing: int = 1, margins: Tuple[int, int, int, int] = (0, 0, 0, 0),
+                 titleHeight: int = 0, optionActionWidth: int = 0):
+        self.m_rowCount = rowCount      # 行数，2行或3行
+        self.m_spacing = spacing
+        self.m_margins = tuple(margins)     # (left, top, right, bottom)
+        self.m_titleHeight = titleHeight
+        self.m_optionActionWidth = optionActionWidth    # 2行模式下OptionAction占用的宽度，没有时为0
+
+    def setParameters(self, rowCount: int, spacing: int, margins: Tuple[int, int, int, int],
+                      titleHeight: int, optionActionWidth: int):
+        self.m_rowCount = rowCount
+        self.m_spacing = spacing
+        self.m_margins = tuple(margins)
+        self.m_titleHeight = titleHeight
+        self.m_optionActionWidth = optionActionWidth
+
+    def parameters(self) -> tuple:
+        """布局参数，参数相同时相同的输入一定得到相同的结果，可作为缓存的key"""
+        return self.m_rowCount, self.m_spacing, self.m_margins, self.m_titleHeight, self.m_optionActionWidth
+
+    def initialState(self) -> PannelKernelState:
+        """第一个item之前的布局状态"""
+        return 0, 0, 0, self.m_margins[0], SARibbonPannelLayoutKernel.RPNone
+
+    def layout(self, height: int, items: List[PannelKernelItem], state: PannelKernelState = None) -> tuple:
+        """
+        按列排布item，state为第一个item之前的布局状态，None表示从头开始，增量布局时传入上次记录的状态
+        行占比只能是RPLarge、RPMedium、RPSmall，RPNone需要调用者先根据窗口的扩展方向确定
+        返回(placements, states, endState)，states[i]为计算第i个item之前的状态，endState为计算完所有item后的状态
+        """
+        left, top, right, bottom = self.m_margins
+        spacing = self.m_spacing
+        rowCount = self.m_rowCount
+        largeH = height - (top + bottom) - self.m_titleHeight
+        smallH = (largeH - (rowCount - 1) * spacing) / rowCount
+        # Medium行的y坐标
+        medy0 = top if rowCount == 2 else top + (largeH - 2 * smallH) / 3
+        medy1 = top + smallH + spacing if rowCount == 2 else top + ((largeH - 2 * smallH) / 3) * 2 + smallH
+        # Small行的y坐标
+        smly0 = top
+        smly1 = top + smallH + spacing
+        smly2 = top + 2 * (smallH + spacing)
+        ismallH = int(smallH)
+        # row用于记录下个item应该属于第几行，columMaxWidth记录每列最大的宽度，x为x坐标
+        row, column, columMaxWidth, x, lastRow0RP = self.initialState() if state is None else state
+        placements: List[PannelKernelPlacement] = list()
+        states: List[PannelKernelState] = list()
+        for item in items:
+            states.append((row, column, columMaxWidth, x, lastRow0RP))
+            if item is None:
+                placements.append(None)
+                continue
+            w, rp = item
+            if SARibbonPannelLayoutKernel.RPLarge == rp:
+                # 在Large模式，如果不是处于新列的第一行，就需要进行换列处理
+                if row != 0:
+                    x += columMaxWidth + spacing
+                    column += 1
+                placements.append((x, top, w, largeH, 0, column))
+                # 换列，x自动递增到下个坐标，列数增加，行数归零，最大列宽归零
+                x += w + spacing
+                row = 0
+                column += 1
+                columMaxWidth = 0
+            elif SARibbonPannelLayoutKernel.RPMedium == rp:
+                if row > 1:  # row == 2表示前面一个item是small模式
+                    x += columMaxWidth + spacing
+                    row = 0
+                    column += 1
+                if row == 0:
+                    placements.append((x, int(medy0), w, ismallH, 0, column))
+                    row = 1
+                    columMaxWidth = w
+                    lastRow0RP = SARibbonPannelLayoutKernel.RPMedium
+                else:
+                    placements.append((x, int(medy1), w, ismallH, row, column))
+                    # 换列
+                    x += max(columMaxWidth, w) + spacing
+                    row = 0
+                    column += 1
+                    columMaxWidth = 0
+            else:   # RPSmall
+                if row == 0:
+                    placements.append((x, smly0, w, ismallH, 0, column))
+                    columMaxWidth = w
+                    row = 1
+                    lastRow0RP = SARibbonPannelLayoutKernel.RPSmall
+                elif row == 1:
+                    # 若第一行是Medium，按Medium排列
+                    y1 = medy1 if lastRow0RP == SARibbonPannelLayoutKernel.RPMedium else smly1
+                    placements.append((x, int(y1), w, ismallH, 1, column))
+                    if 2 == rowCount or lastRow0RP == SARibbonPannelLayoutKernel.RPMedium:
+                        x += max(columMaxWidth, w) + spacing
+                        row = 0
+                        column += 1
+                        columMaxWidth = 0
+                    else:
+                        row = 2
+                        columMaxWidth = max(columMaxWidth, w)
+                else:
+                    placements.append((x, int(smly2), w, ismallH, 2, column))
+                    # 换列
+                    x += max(columMaxWidth, w) + spacing
+                    row = 0
+                    column += 1
+                    columMaxWidth = 0
+        return placements, states, (row, column, columMaxWidth, x, lastRow0RP)
+
+    def measure(self, endState: PannelKernelState) -> Tuple[int, int]:
+        """根据布局完成后的状态计算(列数, 总宽度)"""
+        row, column, columMaxWidth, x, _ = endState
+        totalWidth = 0
+        if row == 0 and column == 0:
+            # 没有可显示的item
+            columnCount = 0
+        elif row == 0:
+            # 触发了换列，直接等于column索引
+            columnCount = column
+            totalWidth = x + self.m_margins[2]
+        else:
+            # 没有触发换列，真实列数等于column+1
+            columnCount = column + 1
+            totalWidth = x + self.m_margins[2] + columMaxWidth + self.m_spacing
+        # 在有optionButton的2行模式的情况下，需要调整totalWidth
+        if self.m_rowCount == 2:
+            totalWidth += self.m_optionActionWidth
+        return columnCount, totalWidth
+
+    @staticmethod
+    def expandColumns(items: List[PannelKernelColumnItem], columnCount: int,
+                      expandWidth: int) -> Optional[List[Optional[Tuple[int, int]]]]:
+        """
+        把多出的宽度expandWidth平均分给存在可扩展item的列，列宽不超过此列item的最大宽度
+        返回每个item的(x平移量, 新宽度)，宽度不变时新宽度为-1，不参与布局的item为None；没有需要扩展的列时返回None
+        先统计每列的宽度、最大宽度和可扩展的item，再遍历一次item完成扩展和平移，复杂度为O(item数+列数)
+        """
+        if expandWidth <= 0 or columnCount <= 0:
+            return None
+        columnWidths = [0] * columnCount            # 每列的宽度
+        columnMaximumWidths = [-1] * columnCount    # 每列的最大宽度
+        columnExpandable = [False] * columnCount    # 每列是否存在可扩展的item
+        for item in items:
+            if item is None or item[0] < 0 or item[0] >= columnCount:
+                continue
+            col, width, expandable, maximumWidth = item
+            columnWidths[col] = max(columnWidths[col], width)
+            columnMaximumWidths[col] = max(columnMaximumWidths[col], maximumWidth)
+            if expandable:
+                columnExpandable[col] = True
+        expandColumnCount = columnExpandable.count(True)
+        # 没有需要扩展的就退出
+        if expandColumnCount == 0:
+            return None
+
+        oneColCanexpandWidth = expandWidth / expandColumnCount
+        columnExpandedWidths = [0] * columnCount    # 每列扩展后的宽度，-1表示此列不扩展
+        columnOffsets = [0] * columnCount           # 每列由于前面列扩展需要平移的距离
+        offset = 0
+        for col in range(columnCount):
+            columnOffsets[col] = offset
+            oldColumnWidth, columnMaximumWidth = columnWidths[col], columnMaximumWidths[col]
+            if not columnExpandable[col] or oldColumnWidth > columnMaximumWidth:
+                columnExpandedWidths[col] = -1
+                continue
+            colwidth = int(oneColCanexpandWidth + oldColumnWidth)
+            columnExpandedWidths[col] = columnMaximumWidth if colwidth > columnMaximumWidth else colwidth
+            offset += columnExpandedWidths[col] - oldColumnWidth
+        # 可扩展的item调整宽度，后面列的item往右平移
+        result = list()
+        for item in items:
+            if item is None or item[0] < 0 or item[0] >= columnCount:
+                result.append(None)
+                continue
+            col, _, expandable, _ = item
+            result.append((columnOffsets[col], columnExpandedWidths[col] if expandable else -1))
+        return result
+
+    # RowProportion，和SARibbonPannelItem的定义保持一致
+    RPNone = 0
+    RPLarge = 1
+    RPMedium = 2
+    RPSmall = 3
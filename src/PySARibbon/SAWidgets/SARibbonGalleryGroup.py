@@ -11,6 +11,8 @@ from PyQt5.QtCore import Qt, QModelIndex, QSize, pyqtSignal, QAbstractListModel,
 from PyQt5.QtGui import QIcon, QPainter
 from PyQt5.QtWidgets import QAction, QStyledItemDelegate, QStyleOptionViewItem, QStyle, QListView
 
+from ..SATools.SARibbonIconPixmapCache import SARibbonIconPixmapCache
+
 
 class SARibbonGalleryItem:
     def __init__(self, *_args):
@@ -129,7 +131,7 @@ class SARibbonGalleryGroupItemDelegate(QStyledItemDelegate):
         iconRect = option.rect
         iconRect.adjust(3, 3, -3, -3)
         ico: QIcon = index.data(Qt.DecorationRole)
-        ico.paint(painter, iconRect, Qt.AlignCenter, QIcon.Normal, QIcon.On)
+        SARibbonIconPixmapCache.paintIcon(ico, painter, self.m_group, iconRect, Qt.AlignCenter, QIcon.Normal, QIcon.On)
         painter.restore()
 
     def paintIconWithText(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
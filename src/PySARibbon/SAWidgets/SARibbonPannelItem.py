@@ -10,7 +10,7 @@
 
  无窗口的action会在内部生成一个SARibbonToolButton
 """
-from PyQt5.QtCore import QRect
+from PyQt5.QtCore import QRect, QSize
 from PyQt5.QtWidgets import QWidgetItem, QAction
 
 
@@ -23,6 +23,13 @@ class SARibbonPannelItem(QWidgetItem):
         self.rowProportion = SARibbonPannelItem.RPNone
         self.itemWillSetGeometry = QRect()
         self.action: QAction = None
+        # 增量布局用的缓存
+        self.layoutState = None     # 计算此item之前的布局状态(row, column, columMaxWidth, x, lastRow0RP)
+        self.layoutHint = QSize()   # 上次布局时使用的sizeHint，用于检测自定义窗口尺寸变化
+        self.baseGeometry = QRect() # 未经过扩展处理的geometry
+        # 自适应缩减
+        self.reducedRowProportion = None    # 缩减后的行占比，None表示未缩减
+        self.restoreButtonState = None      # 缩减前按钮的(buttonType, toolButtonStyle)，用于恢复
 
     def isEmpty(self):
         ret = False
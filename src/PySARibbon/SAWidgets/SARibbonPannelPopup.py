@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+@Module     SARibbonPannelPopup
+@Author     ROOT
+
+@brief pannel折叠后的弹出窗口
+category宽度不足时，pannel会被折叠为一个按钮，pannel本身被放到此弹出窗口中，
+点击折叠按钮时在按钮下方弹出完整的pannel，点击pannel中的按钮后自动关闭
+"""
+from typing import List
+from PyQt5.QtCore import Qt, QPoint, QSize
+from PyQt5.QtWidgets import QFrame, QWidget, QApplication, QAbstractButton
+
+
+class SARibbonPannelPopup(QFrame):
+    def __init__(self, category: QWidget):
+        super().__init__(category, Qt.Popup)
+        self.m_category = category
+        self.m_pannel: QWidget = None
+        self.m_connectedButtons: List[QAbstractButton] = list()
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setAutoFillBackground(True)
+
+    def category(self) -> QWidget:
+        """弹出窗口所属的category"""
+        return self.m_category
+
+    def pannel(self) -> QWidget:
+        return self.m_pannel
+
+    def setPannel(self, pannel: QWidget):
+        """把pannel放入弹出窗口"""
+        self.m_pannel = pannel
+        if pannel:
+            pannel.setParent(self)
+            pannel.show()
+
+    def takePannel(self) -> QWidget:
+        """取出pannel，pannel的parent需要调用者重新设置"""
+        pannel = self.m_pannel
+        self.m_pannel = None
+        return pannel
+
+    def popup(self, pos: QPoint, height: int):
+        """在pos位置弹出，height为pannel的高度"""
+        if not self.m_pannel:
+            return
+        fw = self.frameWidth()
+        s = QSize(self.m_pannel.sizeHint().width(), height)
+        self.m_pannel.setGeometry(fw, fw, s.width(), s.height())
+        self.resize(s.width() + 2 * fw, s.height() + 2 * fw)
+        # 保证弹出窗口在屏幕内
+        screen = QApplication.desktop().availableGeometry(pos)
+        x = min(pos.x(), screen.right() - self.width())
+        self.move(max(x, screen.left()), pos.y())
+        # 点击pannel中的按钮后关闭弹出窗口
+        for btn in self.m_pannel.findChildren(QAbstractButton):
+            btn.clicked.connect(self.hide)
+            self.m_connectedButtons.append(btn)
+        self.show()
+
+    def hideEvent(self, e):
+        for btn in self.m_connectedButtons:
+            try:
+                btn.clicked.disconnect(self.hide)
+            except (RuntimeError, TypeError):
+                pass    # 按钮已被删除
+        self.m_connectedButtons = list()
+        super().hideEvent(e)
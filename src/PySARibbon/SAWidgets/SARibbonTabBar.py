@@ -11,6 +11,7 @@ class SARibbonTabBar(QTabBar):
     def __init__(self, parent):
         super().__init__(parent)
         self.m_tabMargin: QMargins = QMargins(6, 0, 0, 0)
+        self.m_layoutRevision = 0   # 标签布局的版本，每次重新布局标签时增加
         self.setExpanding(False)
 
     def tabMargin(self) -> QMargins:
@@ -18,3 +19,11 @@ class SARibbonTabBar(QTabBar):
 
     def setTabMargin(self, margin: QMargins):
         self.m_tabMargin = margin
+
+    def layoutRevision(self) -> int:
+        """标签布局的版本，版本不变时tabRect的结果不变，用于缓存依赖标签位置的绘制内容"""
+        return self.m_layoutRevision
+
+    def tabLayoutChange(self):
+        self.m_layoutRevision += 1
+        super().tabLayoutChange()
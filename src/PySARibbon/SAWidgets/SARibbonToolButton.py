@@ -4,18 +4,28 @@
 @Author     ROOT
 """
 from PyQt5.QtCore import Qt, QSize, QRect, QEvent, QPoint
-from PyQt5.QtGui import QPixmap, QPainter, QIcon, QCursor, QPalette
+from PyQt5.QtGui import QPixmap, QPainter, QIcon, QCursor, QPalette, QRegion
 from PyQt5.QtWidgets import QToolButton, QAction, QStyleOptionToolButton, QWidget, QStyle, QSizePolicy, QStylePainter, QStyleOption
 
+from ..SATools.SARibbonIconPixmapCache import SARibbonIconPixmapCache
+from ..SATools.SARibbonButtonBackgroundCache import SARibbonButtonBackgroundCache
+
 LITE_LARGE_BUTTON_ICON_HIGHT_RATE = 0.52
 ARROW_WIDTH = 10
+SIZE_HINT_CACHE_MAX_COUNT = 4   # 每个按钮缓存的sizeHint个数，对应不同的样式
 
 
 class SARibbonToolButton(QToolButton):
     """
     Ribbon界面适用的toolButton
     相对于普通toolbutton，主要多了两个类型设置，setButtonType 和 setLargeButtonType
+
+    sizeHint的计算涉及文字测量，计算结果会按内容和样式缓存，
+    ActionChanged、字体变化、样式变化时缓存失效，可通过sizeHintCacheStatistics查看命中率
     """
+    s_sizeHintCacheHits = 0     # sizeHint缓存命中次数
+    s_sizeHintCacheMisses = 0   # sizeHint缓存未命中次数
+
     def __init__(self, *_args):
         """
         __init__(parent=None)
@@ -36,7 +46,11 @@ class SARibbonToolButton(QToolButton):
         self.m_mouseOnSubControl = False     # 用于标记MenuButtonPopup模式下，鼠标在文本区域
         self.m_menuButtonPressed = False
         self.m_iconRect = QRect()
+        self.m_hoverRegion = QRegion()       # 鼠标在子控件间移动时需要刷新的区域
+        self.m_hoverRegionKey = None         # m_hoverRegion对应的尺寸和图标区域
         self.m_isWordWrap = False            # 标记是否文字换行 @default false
+        self.m_sizeHintCache = dict()        # sizeHint缓存，key为sizeHintCacheKey()，value为(QSize, isWordWrap)
+        self.m_backgroundContext = None      # 背景缓存的样式上下文，None表示需要重新计算
 
         if act:
             self.setDefaultAction(act)
@@ -141,6 +155,28 @@ class SARibbonToolButton(QToolButton):
                     rect = buttonRect.adjusted(self.m_iconRect.width(), 0, -1, 0)
         return rect
 
+    def subControlNormalRect(self, isMouseOnSubControl: bool) -> QRect:
+        """MenuButtonPopup模式下鼠标悬停时，显示为正常状态的区域"""
+        if isMouseOnSubControl:
+            return self.m_iconRect.adjusted(1, 1, -1, -1)
+        return self.m_iconRect.adjusted(self.m_iconRect.width()+1, 1, -1, -1)
+
+    def subControlHoverRegion(self) -> QRegion:
+        """
+        MenuButtonPopup模式下，鼠标在图标区和文字区之间移动时外观会改变的区域，
+        即两种状态下显示为正常的区域之和，按尺寸和图标区域缓存
+        """
+        key = (self.width(), self.height(), self.m_iconRect.x(), self.m_iconRect.y(),
+               self.m_iconRect.width(), self.m_iconRect.height())
+        if self.m_hoverRegionKey != key:
+            region = QRegion()
+            for r in (self.subControlNormalRect(True), self.subControlNormalRect(False)):
+                # 文字区的矩形可能是无效的，style仍会在其边缘绘制，因此取规范化后的矩形并向外扩展
+                region |= QRegion(r.normalized().adjusted(-2, -2, 2, 2))
+            self.m_hoverRegion = region & QRegion(self.rect())
+            self.m_hoverRegionKey = key
+        return self.m_hoverRegion
+
     def calcIndicatorArrowDownRect(self, opt: QStyleOptionToolButton) -> QRect:
         """sub control 的下拉箭头的位置"""
         rect = opt.rect
@@ -156,6 +192,7 @@ class SARibbonToolButton(QToolButton):
         return rect
 
     def createIconPixmap(self, opt: QStyleOptionToolButton) -> QPixmap:
+        """图标pixmap通过全局的SARibbonIconPixmapCache获取，相同图标、尺寸、模式的按钮共享同一个pixmap"""
         if not opt.icon.isNull():  # 有图标
             state = QIcon.On if opt.state & QStyle.State_On else QIcon.Off
             if not (opt.state & QStyle.State_Enabled):
@@ -164,9 +201,26 @@ class SARibbonToolButton(QToolButton):
                 mode = QIcon.Active
             else:
                 mode = QIcon.Normal
-            return opt.icon.pixmap(self.window().windowHandle(), opt.rect.size().boundedTo(opt.iconSize), mode, state)
+            return SARibbonIconPixmapCache.pixmap(opt.icon, self, opt.rect.size().boundedTo(opt.iconSize), mode, state)
         return QPixmap()
 
+    def prewarmIconPixmap(self):
+        """预先生成绘制用到的图标pixmap，避免第一次绘制和鼠标悬停时才对图标进行缩放"""
+        opt = QStyleOptionToolButton()
+        self.initStyleOption(opt)
+        if opt.icon.isNull():
+            return
+        state = QIcon.On if opt.state & QStyle.State_On else QIcon.Off
+        if not (opt.state & QStyle.State_Enabled):
+            modes = (QIcon.Disabled, )
+        elif opt.state & QStyle.State_AutoRaise:
+            modes = (QIcon.Normal, QIcon.Active)
+        else:
+            modes = (QIcon.Normal, )
+        size = opt.rect.size().boundedTo(opt.iconSize)
+        for mode in modes:
+            SARibbonIconPixmapCache.pixmap(opt.icon, self, size, mode, state)
+
     def paintLargeButton(self, e: QEvent):
         p = QStylePainter(self)
         opt = QStyleOptionToolButton()
@@ -187,48 +241,42 @@ class SARibbonToolButton(QToolButton):
             elif opt.activeSubControls & QStyle.SC_ToolButtonMenu:
                 bflags |= QStyle.State_Sunken
                 mflags |= QStyle.State_MouseOver
-        # 绘制背景
+        # 绘制背景，绘制过程记录到ops中，通过缓存的pixmap绘制
+        ops = list()
         tool = QStyleOption(0)
-        tool.palette = opt.palette
         if (opt.subControls & QStyle.SC_ToolButton) and (opt.features & QStyleOptionToolButton.MenuButtonPopup):
             tool.rect = opt.rect
             tool.state = opt.state
             opt.activeSubControls &= QStyle.SC_ToolButtonMenu
             if opt.activeSubControls:
                 # 菜单激活
-                self.style().drawPrimitive(QStyle.PE_PanelButtonTool, tool, p, self)
+                ops.append((QStyle.PE_PanelButtonTool, QRect(tool.rect), tool.state))
                 tool.rect = self.m_iconRect.adjusted(1, 1, -1, -1)
                 tool.state = QStyle.State_Raised    # 把图标区域显示为正常
                 drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-                self.style().drawPrimitive(drawStyle, tool, p, self)
+                ops.append((drawStyle, QRect(tool.rect), tool.state))
             else:
-                self.style().drawPrimitive(QStyle.PE_PanelButtonTool, tool, p, self)
+                ops.append((QStyle.PE_PanelButtonTool, QRect(tool.rect), tool.state))
                 if tool.state & QStyle.State_MouseOver:
-                    if self.m_mouseOnSubControl:
-                        # 鼠标在文字区，把图标显示为正常
-                        tool.rect = self.m_iconRect.adjusted(1, 1, -1, -1)
-                        tool.state = QStyle.State_Raised  # 把图标区域显示为正常
-                        drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-                        self.style().drawPrimitive(drawStyle, tool, p, self)
-                    else:
-                        # 鼠标在图标区，把文字显示为正常
-                        tool.rect = self.m_iconRect.adjusted(self.m_iconRect.width()+1, 1, -1, -1)
-                        tool.state = QStyle.State_Raised  # 把图标区域显示为正常
-                        drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-                        self.style().drawPrimitive(drawStyle, tool, p, self)
+                    # 鼠标在文字区，把图标显示为正常，鼠标在图标区，把文字显示为正常
+                    tool.rect = self.subControlNormalRect(self.m_mouseOnSubControl)
+                    tool.state = QStyle.State_Raised
+                    drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
+                    ops.append((drawStyle, QRect(tool.rect), tool.state))
         elif (opt.subControls & QStyle.SC_ToolButton) and (opt.features & QStyleOptionToolButton.HasMenu):
             tool.rect = QRect(opt.rect)
             tool.state = bflags
             drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-            self.style().drawPrimitive(drawStyle, tool, p, self)
+            ops.append((drawStyle, QRect(tool.rect), tool.state))
         elif opt.subControls & QStyle.SC_ToolButton:
             tool.rect = QRect(opt.rect)
             tool.state = bflags
             if opt.state & QStyle.State_Sunken:
                 tool.state = tool.state & ~QStyle.State_MouseOver
             drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-            self.style().drawPrimitive(drawStyle, tool, p, self)
+            ops.append((drawStyle, QRect(tool.rect), tool.state))
 
+        self.drawBackground(p, opt.palette, ops)
         self.drawIconAndLabel(p, opt)
 
     def paintSmallButton(self, e: QEvent):
@@ -248,48 +296,42 @@ class SARibbonToolButton(QToolButton):
                 bflags = bflags | QStyle.State_Sunken
             elif opt.activeSubControls & QStyle.SC_ToolButtonMenu:
                 bflags = bflags | QStyle.State_MouseOver
-        # 绘制背景
+        # 绘制背景，绘制过程记录到ops中，通过缓存的pixmap绘制
+        ops = list()
         tool = QStyleOption(0)
-        tool.palette = opt.palette
         if (opt.subControls & QStyle.SC_ToolButton) and (opt.features & QStyleOptionToolButton.MenuButtonPopup):
             tool.rect = QRect(opt.rect)
             tool.state = bflags
             opt.activeSubControls = QStyle.SC_ToolButtonMenu & opt.activeSubControls
             if opt.activeSubControls:
                 # 菜单激活
-                self.style().drawPrimitive(QStyle.PE_PanelButtonTool, tool, p, self)
+                ops.append((QStyle.PE_PanelButtonTool, QRect(tool.rect), tool.state))
                 tool.rect = self.m_iconRect.adjusted(1, 1, -1, -1)
                 tool.state = QStyle.State_Raised  # 把图标区域显示为正常
                 drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-                self.style().drawPrimitive(drawStyle, tool, p, self)
+                ops.append((drawStyle, QRect(tool.rect), tool.state))
             else:
-                self.style().drawPrimitive(QStyle.PE_PanelButtonTool, tool, p, self)
+                ops.append((QStyle.PE_PanelButtonTool, QRect(tool.rect), tool.state))
                 if tool.state & QStyle.State_MouseOver:
-                    if self.m_mouseOnSubControl:
-                        # 鼠标在文字区，把图标显示为正常
-                        tool.rect = self.m_iconRect.adjusted(1, 1, -1, -1)
-                        tool.state = QStyle.State_Raised  # 把图标区域显示为正常
-                        drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-                        self.style().drawPrimitive(drawStyle, tool, p, self)
-                    else:
-                        # 鼠标在图标区，把文字显示为正常
-                        tool.rect = self.m_iconRect.adjusted(self.m_iconRect.width()+1, 1, -1, -1)
-                        tool.state = QStyle.State_Raised  # 把图标区域显示为正常
-                        drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-                        self.style().drawPrimitive(drawStyle, tool, p, self)
+                    # 鼠标在文字区，把图标显示为正常，鼠标在图标区，把文字显示为正常
+                    tool.rect = self.subControlNormalRect(self.m_mouseOnSubControl)
+                    tool.state = QStyle.State_Raised
+                    drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
+                    ops.append((drawStyle, QRect(tool.rect), tool.state))
         elif (opt.subControls & QStyle.SC_ToolButton) and (opt.features & QStyleOptionToolButton.HasMenu):
             tool.rect = QRect(opt.rect)
             tool.state = bflags
             drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-            self.style().drawPrimitive(drawStyle, tool, p, self)
+            ops.append((drawStyle, QRect(tool.rect), tool.state))
         elif opt.subControls & QStyle.SC_ToolButton:
             tool.rect = QRect(opt.rect)
             tool.state = bflags
             if opt.state & QStyle.State_Sunken:
                 tool.state = tool.state & ~QStyle.State_MouseOver
             drawStyle = QStyle.PE_PanelButtonTool if autoRaise else QStyle.PE_PanelButtonBevel
-            self.style().drawPrimitive(drawStyle, tool, p, self)
+            ops.append((drawStyle, QRect(tool.rect), tool.state))
 
+        self.drawBackground(p, opt.palette, ops)
         self.drawIconAndLabel(p, opt)
 
     def drawIconAndLabel(self, p: QPainter, opt: QStyleOptionToolButton):
@@ -382,7 +424,75 @@ class SARibbonToolButton(QToolButton):
             return not self.m_menuButtonPressed
         return False
 
+    def hasMenuFeature(self) -> bool:
+        """是否有菜单，和initStyleOption中HasMenu的判断一致"""
+        if self.menu() is not None:
+            return True
+        act = self.defaultAction()
+        return act is not None and act.menu() is not None
+
+    def sizeHintCacheKey(self) -> tuple:
+        """
+        sizeHint缓存的key，包含所有影响sizeHint的内容和样式
+        style()每次返回新的python对象，不能用id区分，样式变化通过StyleChange事件清空缓存
+        """
+        iconSize = self.iconSize()
+        return (self.text(), self.font().key(), self.m_buttonType, self.m_largeButtonType,
+                self.toolButtonStyle(), self.popupMode(), self.hasMenuFeature(), self.arrowType(),
+                self.icon().isNull(), iconSize.width(), iconSize.height())
+
+    def presetSizeHint(self, size: QSize, isWordWrap: bool, key: list = None) -> bool:
+        """
+        设置当前状态下的sizeHint，用于布局快照，之后的sizeHint直接返回此结果
+        key为记录时的sizeHintCacheKey，和当前状态不一致时不设置，返回False
+        """
+        current = self.sizeHintCacheKey()
+        if key is not None and list(current) != key:
+            return False
+        self.setSizeHintCache(current, size, isWordWrap)
+        return True
+
+    def setSizeHintCache(self, key: tuple, size: QSize, isWordWrap: bool):
+        """写入sizeHint缓存，超过SIZE_HINT_CACHE_MAX_COUNT时先移除最早写入的"""
+        if key not in self.m_sizeHintCache and len(self.m_sizeHintCache) >= SIZE_HINT_CACHE_MAX_COUNT:
+            self.m_sizeHintCache.pop(next(iter(self.m_sizeHintCache)))
+        self.m_sizeHintCache[key] = (QSize(size), isWordWrap)
+
+    def isWordWrap(self) -> bool:
+        """大按钮的文字是否换行，sizeHint计算后有效"""
+        return self.m_isWordWrap
+
+    def invalidateSizeHintCache(self):
+        """清空sizeHint缓存"""
+        self.m_sizeHintCache.clear()
+
+    @staticmethod
+    def sizeHintCacheStatistics() -> dict:
+        """所有SARibbonToolButton的sizeHint缓存命中统计"""
+        hits = SARibbonToolButton.s_sizeHintCacheHits
+        misses = SARibbonToolButton.s_sizeHintCacheMisses
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'hitRatio': hits / total if total else 0.0}
+
+    @staticmethod
+    def resetSizeHintCacheStatistics():
+        SARibbonToolButton.s_sizeHintCacheHits = 0
+        SARibbonToolButton.s_sizeHintCacheMisses = 0
+
     def sizeHint(self) -> QSize:
+        key = self.sizeHintCacheKey()
+        cache = self.m_sizeHintCache.get(key, None)
+        if cache is not None:
+            SARibbonToolButton.s_sizeHintCacheHits += 1
+            self.m_isWordWrap = cache[1]
+            return QSize(cache[0])
+        SARibbonToolButton.s_sizeHintCacheMisses += 1
+        s = self.calcSizeHint()
+        self.setSizeHintCache(key, s, self.m_isWordWrap)
+        return s
+
+    def calcSizeHint(self) -> QSize:
+        """计算sizeHint，不经过缓存"""
         s = super().sizeHint()
         opt = QStyleOptionToolButton()
         self.initStyleOption(opt)
@@ -427,8 +537,21 @@ class SARibbonToolButton(QToolButton):
         ]
         if e.type() in eList:
             self.m_mouseOnSubControl = False
+        if e.type() in (QEvent.ActionChanged, QEvent.FontChange, QEvent.StyleChange):
+            self.invalidateSizeHintCache()
+        if e.type() in (QEvent.StyleChange, QEvent.DynamicPropertyChange, QEvent.ParentChange, QEvent.Polish):
+            self.m_backgroundContext = None
         return super().event(e)
 
+    def drawBackground(self, p: QPainter, palette: QPalette, ops: list):
+        """绘制背景，开启背景缓存时样式上下文只在样式、动态属性、父窗口变化后重新计算"""
+        context = None
+        if SARibbonButtonBackgroundCache.isCacheEnabled():
+            if self.m_backgroundContext is None:
+                self.m_backgroundContext = SARibbonButtonBackgroundCache.styleContext(self)
+            context = self.m_backgroundContext
+        SARibbonButtonBackgroundCache.drawBackground(self, p, palette, ops, context)
+
     def paintEvent(self, e: QEvent):
         if self.m_buttonType == self.LargeButton:
             self.paintLargeButton(e)
@@ -445,7 +568,9 @@ class SARibbonToolButton(QToolButton):
             isMouseOnSubControl = not self.m_iconRect.contains(e.pos())
         if self.m_mouseOnSubControl != isMouseOnSubControl:
             self.m_mouseOnSubControl = isMouseOnSubControl
-            self.update()
+            # 只有MenuButtonPopup模式的外观和m_mouseOnSubControl有关，且只刷新外观改变的区域
+            if self.popupMode() == QToolButton.MenuButtonPopup:
+                self.update(self.subControlHoverRegion())
         super().mouseMoveEvent(e)
 
     def mousePressEvent(self, e):
@@ -5,14 +5,23 @@
 """
 
 from .SAFramelessHelper import SAFramelessHelper
+from .SARibbonActionRegistry import SARibbonActionRegistry, SARibbonActionPlacement
 from .SARibbonBar import SARibbonBar
 from .SARibbonButtonGroupWidget import SARibbonButtonGroupWidget
 from .SARibbonCategory import SARibbonCategory
 from .SARibbonCategoryLayout import SARibbonCategoryLayout
 from .SARibbonContextCategory import SARibbonContextCategory
 from .SARibbonGallery import SARibbonGallery
+from .SARibbonGeometryScheduler import SARibbonGeometryScheduler
+from .SARibbonLayoutSnapshot import SARibbonLayoutSnapshot
+from .SARibbonLazyCategory import SARibbonLazyCategory
 from .SARibbonMainWindow import SARibbonMainWindow
 from .SARibbonPannel import SARibbonPannel
 from .SARibbonPannelLayout import SARibbonPannelLayout
+from .SARibbonPrewarmScheduler import SARibbonPrewarmScheduler
+from .SARibbonProfiler import SARibbonProfiler
 from .SARibbonQuickAccessBar import SARibbonQuickAccessBar
+from .SARibbonSpecBuilder import SARibbonSpecBuilder
+from .SARibbonTabSwitchTracer import SARibbonTabSwitchTracer
+from .SARibbonTraceRecorder import SARibbonTraceRecorder
 from .SAWindowButtonGroup import SAWindowButtonGroup
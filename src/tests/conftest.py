@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+测试在offscreen平台下运行，所有测试共用一个QApplication
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+action注册表不能构建延迟构建的category，构建完成后其中的action需要注册
+"""
+from PyQt5.QtWidgets import QAction, QMainWindow
+
+from PySARibbon.SARibbonBar import SARibbonBar
+
+
+def createLazyPage(bar: SARibbonBar, title: str, action: QAction):
+    def factory(category):
+        category.addPannel('pannel').addLargeAction(action)
+    return bar.addLazyCategoryPage(title, factory)
+
+
+def test_lazy_category_not_realized(app):
+    window = QMainWindow()
+    bar = SARibbonBar(window)
+    window.setMenuWidget(bar)
+    normal = bar.addCategoryPage('normal')
+    normalAction = QAction('normal', window)
+    normal.addPannel('pannel').addLargeAction(normalAction)
+    before = createLazyPage(bar, 'before', QAction('before', window))
+    assert bar.existingActionRegistry() is None
+    registry = bar.actionRegistry()
+    assert bar.existingActionRegistry() is registry
+    after = createLazyPage(bar, 'after', QAction('after', window))
+    assert not before.isRealized() and not after.isRealized()
+    assert registry.isPlaced(normalAction)
+    assert registry.actionsOfCategory(before) == []
+
+    action = QAction('lazy', window)
+    lazy = createLazyPage(bar, 'lazy', action)
+    assert not registry.isPlaced(action)
+    bar.prewarmCategory(lazy)
+    assert lazy.isRealized()
+    assert [p.category for p in registry.placements(action)] == [lazy]
+    assert not before.isRealized() and not after.isRealized()
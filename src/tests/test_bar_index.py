@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+ribbonbar的tab索引和标题、objectName索引在tab增删、移动、隐藏显示、上下文标签切换、改名后只做局部更新，结果需要和逐个查找一致
+"""
+import random
+
+from PySARibbon.SARibbonBar import SARibbonBar
+
+
+def assertBarIndex(bar: SARibbonBar, categories):
+    tabBar = bar.ribbonTabBar()
+    tabs = [tabBar.tabData(i).category for i in range(tabBar.count())]
+    for c in categories:
+        expect = next((i for i, t in enumerate(tabs) if t is c), -1)
+        assert bar.categoryIndex(c) == expect
+    current = bar.categoryPages()
+    for name in {c.windowTitle() for c in categories}:
+        expect = next((c for c in current if c.windowTitle() == name), None)
+        assert bar.categoryByName(name) is expect
+    for name in {c.objectName() for c in categories}:
+        expect = next((c for c in current if c.objectName() == name), None)
+        assert bar.categoryByObjectName(name) is expect
+
+
+def test_bar_index(app):
+    rnd = random.Random(7)
+    bar = SARibbonBar()
+    categories = [bar.addCategoryPage('category %d' % (i % 3)) for i in range(6)]
+    contexts = list()
+    for i in range(2):
+        context = bar.addContextCategory('context %d' % i)
+        for j in range(2):
+            categories.append(context.addCategoryPage('category %d' % rnd.randrange(4)))
+        contexts.append(context)
+    normals = categories[:6]
+    hidden = list()
+    assertBarIndex(bar, categories)
+    for step in range(120):
+        op = rnd.randrange(7)
+        visible = [c for c in normals if c not in hidden]
+        count = bar.ribbonTabBar().count()
+        if op == 0 or len(visible) < 3:
+            c = bar.insertCategoryPage('category %d' % rnd.randrange(4), rnd.randrange(count + 1))
+            categories.append(c)
+            normals.append(c)
+        elif op == 1:
+            c = rnd.choice(visible)
+            bar.removeCategory(c)
+            normals.remove(c)
+        elif op == 2:
+            bar.moveCategory(rnd.randrange(count), rnd.randrange(count))
+        elif op == 3:
+            c = rnd.choice(visible)
+            bar.hideCategory(c)
+            hidden.append(c)
+        elif op == 4 and hidden:
+            c = hidden.pop(rnd.randrange(len(hidden)))
+            bar.showCategory(c)
+        elif op == 5:
+            context = rnd.choice(contexts)
+            bar.setContextCategoryVisible(context, not bar.isContextCategoryVisible(context))
+        else:
+            c = rnd.choice(categories)
+            if rnd.randrange(2):
+                c.setWindowTitle('category %d' % rnd.randrange(4))
+            else:
+                c.setObjectName('name %d' % rnd.randrange(4))
+        # 索引局部更新，不会被丢弃后重建
+        assert bar.m_d.tabIndexCache is not None and bar.m_d.titleIndexCache is not None
+        assertBarIndex(bar, categories)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+按钮背景缓存需要区分样式表的上下文：后代选择器匹配的祖先窗口、动态属性选择器
+"""
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QAction
+
+from PySARibbon import SARibbonMainWindow
+from PySARibbon.SATools.SARibbonButtonBackgroundCache import SARibbonButtonBackgroundCache
+
+STYLE_SHEET = '''
+SARibbonToolButton:hover { border: 1px solid #000000; }
+SARibbonPannel#red SARibbonToolButton:hover { background-color: #ff0000; }
+SARibbonPannel#blue SARibbonToolButton:hover { background-color: #0000ff; }
+SARibbonPannel#blue SARibbonToolButton[warn="true"]:hover { background-color: #00ff00; }
+'''
+
+
+def hoverColor(button):
+    button.setAttribute(Qt.WA_UnderMouse, True)
+    image = button.grab().toImage()
+    button.setAttribute(Qt.WA_UnderMouse, False)
+    return image.pixelColor(2, image.height() // 2).name()
+
+
+def test_style_sheet_context(app):
+    window = SARibbonMainWindow()
+    window.setStyleSheet(STYLE_SHEET)
+    category = window.ribbonBar().addCategoryPage('Main')
+    buttons = list()
+    for name in ('red', 'blue'):
+        pannel = category.addPannel(name)
+        pannel.setObjectName(name)
+        buttons.append(pannel.addSmallAction(QAction('same', window)))
+    window.resize(800, 400)
+    window.show()
+    app.processEvents()
+
+    SARibbonButtonBackgroundCache.setCacheEnabled(True)
+    SARibbonButtonBackgroundCache.invalidate()
+    assert [hoverColor(b) for b in buttons] == ['#ff0000', '#0000ff']
+
+    buttons[1].setProperty('warn', 'true')
+    buttons[1].style().unpolish(buttons[1])
+    buttons[1].style().polish(buttons[1])
+    assert hoverColor(buttons[1]) == '#00ff00'
+    buttons[1].setProperty('warn', 'false')
+    buttons[1].style().unpolish(buttons[1])
+    buttons[1].style().polish(buttons[1])
+    assert hoverColor(buttons[1]) == '#0000ff'
+    SARibbonButtonBackgroundCache.setCacheEnabled(False)
+    window.close()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+pannel布局的action索引和category的pannel索引在增删、移动、改名后只做局部更新，结果需要和逐个查找一致
+"""
+import random
+
+from PyQt5.QtWidgets import QAction, QWidget
+
+from PySARibbon.SARibbonCategory import SARibbonCategory
+from PySARibbon.SARibbonPannel import SARibbonPannel
+
+
+def firstIndex(values, value) -> int:
+    for i, v in enumerate(values):
+        if v is value:
+            return i
+    return -1
+
+
+def assertActionIndex(pannel: SARibbonPannel, actions):
+    lay = pannel.layout()
+    items = [it.action for it in lay.m_items]
+    for act in actions:
+        assert lay.indexOf(act) == firstIndex(items, act)
+
+
+def assertPannelIndex(category: SARibbonCategory, pannels):
+    current = category.pannelList()
+    for p in pannels:
+        assert category.pannelIndex(p) == firstIndex(current, p)
+    for name in {p.windowTitle() for p in pannels}:
+        expect = next((p for p in current if p.windowTitle() == name), None)
+        assert category.pannelByName(name) is expect
+    for name in {p.objectName() for p in pannels}:
+        expect = next((p for p in current if p.objectName() == name), None)
+        assert category.pannelByObjectName(name) is expect
+
+
+def test_action_index(app):
+    rnd = random.Random(3)
+    pannel = SARibbonPannel('pannel')
+    actions = [QAction('action %d' % i, pannel) for i in range(6)]
+    for _ in range(10):
+        pannel.addLargeAction(rnd.choice(actions))
+    assertActionIndex(pannel, actions)
+    lay = pannel.layout()
+    for _ in range(80):
+        op = rnd.randrange(3)
+        if op == 0 or lay.count() < 3:
+            pannel.addSmallAction(rnd.choice(actions))
+        elif op == 1:
+            lay.takeAt(rnd.randrange(lay.count()))
+        else:
+            lay.move(rnd.randrange(lay.count()), rnd.randrange(lay.count()))
+        # 索引局部更新，不会被丢弃后重建
+        assert lay.m_actionIndex is not None
+        assertActionIndex(pannel, actions)
+
+
+def test_pannel_index(app):
+    rnd = random.Random(5)
+    parent = QWidget()
+    category = SARibbonCategory(parent)
+    pannels = list()
+    for i in range(8):
+        pannels.append(category.addPannel('pannel %d' % (i % 3)))
+    assertPannelIndex(category, pannels)
+    for step in range(80):
+        op = rnd.randrange(4)
+        count = category.pannelCount()
+        if op == 0 or count < 3:
+            p = category.insertPannel('pannel %d' % rnd.randrange(4), rnd.randrange(count + 1))
+            pannels.append(p)
+        elif op == 1:
+            category.takePannel(category.pannelByIndex(rnd.randrange(count)))
+        elif op == 2:
+            category.movePannel(rnd.randrange(count), rnd.randrange(count))
+        else:
+            p = category.pannelByIndex(rnd.randrange(count))
+            if rnd.randrange(2):
+                p.setWindowTitle('pannel %d' % rnd.randrange(4))
+            else:
+                p.setObjectName('name %d' % rnd.randrange(4))
+        assert category.m_d.mPannelIndex is not None and category.m_d.mTitleIndex is not None
+        assertPannelIndex(category, pannels)
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+SARibbonMainWindow在Python3.10及以上版本中也能正常创建和调整尺寸(Qt的接口不再接受float参数)
+"""
+from PySARibbon import SARibbonMainWindow
+
+
+def test_create_and_resize(app):
+    window = SARibbonMainWindow()
+    window.ribbonBar().addCategoryPage('Main').addPannel('pannel')
+    window.resize(1001, 600)
+    window.show()
+    app.processEvents()
+    window.resize(777, 500)
+    app.processEvents()
+    window.close()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+增量布局和完整布局的结果必须一致，在添加、删除、移动action之后分别比较
+"""
+import random
+
+import pytest
+from PyQt5.QtCore import QRect
+from PyQt5.QtWidgets import QAction
+
+from PySARibbon.SARibbonPannel import SARibbonPannel
+from PySARibbon.SAWidgets.SARibbonPannelItem import SARibbonPannelItem
+
+RPS = (SARibbonPannelItem.RPLarge, SARibbonPannelItem.RPMedium, SARibbonPannelItem.RPSmall)
+
+
+def layoutResult(pannel: SARibbonPannel, incremental: bool = True):
+    lay = pannel.layout()
+    if not incremental:
+        lay.setIncrementalLayout(False)
+    lay.updateGeomArray(QRect(0, 0, 2000, 98))
+    if not incremental:
+        lay.setIncrementalLayout(True)
+    return [it.itemWillSetGeometry.getRect() for it in lay.m_items], lay.sizeHint().width()
+
+
+def assertSameAsFullLayout(pannel: SARibbonPannel):
+    incremental = layoutResult(pannel)
+    assert incremental == layoutResult(pannel, False)
+
+
+def createPannel(rps) -> tuple:
+    pannel = SARibbonPannel('pannel')
+    actions = list()
+    for i, rp in enumerate(rps):
+        act = QAction('Action %d' % i, pannel)
+        pannel.addAction(act, rp)
+        actions.append(act)
+    layoutResult(pannel)
+    return pannel, actions
+
+
+def test_remove_large(app):
+    pannel, actions = createPannel([SARibbonPannelItem.RPLarge] * 4)
+    pannel.removeAction(actions[1])
+    assertSameAsFullLayout(pannel)
+    pannel.removeAction(actions[3])
+    assertSameAsFullLayout(pannel)
+
+
+@pytest.mark.parametrize('fr, to', [(1, 3), (3, 1), (0, 3), (3, 0)])
+def test_move_large(app, fr, to):
+    pannel, _ = createPannel([SARibbonPannelItem.RPLarge] * 4)
+    pannel.layout().move(fr, to)
+    assertSameAsFullLayout(pannel)
+
+
+def test_random_mutations(app):
+    rnd = random.Random(7)
+    pannel, actions = createPannel([rnd.choice(RPS) for _ in range(12)])
+    for step in range(60):
+        op = rnd.randrange(3)
+        lay = pannel.layout()
+        if op == 0 or len(actions) < 3:
+            act = QAction('Added %d' % step, pannel)
+            pannel.addAction(act, rnd.choice(RPS))
+            actions.append(act)
+        elif op == 1:
+            pannel.removeAction(actions.pop(rnd.randrange(len(actions))))
+        else:
+            lay.move(rnd.randrange(lay.count()), rnd.randrange(lay.count()))
+        assertSameAsFullLayout(pannel)
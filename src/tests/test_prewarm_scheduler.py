@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+预热按标签页容器的当前尺寸布局，切换到预热过的标签页时pannel的位置不再变化
+"""
+import time
+
+from PyQt5.QtWidgets import QAction
+
+from PySARibbon import SARibbonMainWindow
+
+
+def pannelGeometries(category):
+    return [p.geometry().getRect() for p in category.pannelList()]
+
+
+def test_prewarm_uses_container_size(app):
+    window = SARibbonMainWindow()
+    bar = window.ribbonBar()
+    bar.addCategoryPage('Main').addPannel('pannel').addLargeAction(QAction('main', window))
+    window.resize(1200, 600)
+    window.show()
+    app.processEvents()
+    # 容器调整尺寸之后添加的标签页，隐藏时保持创建时的尺寸
+    page = bar.addCategoryPage('Added')
+    for i in range(4):
+        pannel = page.addPannel('pannel %d' % i)
+        pannel.addActions([QAction('action %d' % j, window) for j in range(6)])
+    assert bar.currentCategory() is bar.categoryByIndex(0)
+
+    scheduler = bar.prewarmScheduler()
+    finished = list()
+    scheduler.finished.connect(lambda: finished.append(True))
+    scheduler.start()
+    deadline = time.perf_counter() + 5
+    while not finished and time.perf_counter() < deadline:
+        app.processEvents()
+    assert finished
+    prewarmed = pannelGeometries(page)
+    assert page.size() == page.parentWidget().contentsRect().size()
+
+    bar.setCurrentIndex(bar.tabIndex(page))
+    app.processEvents()
+    assert bar.currentCategory() is page
+    assert pannelGeometries(page) == prewarmed
+    window.close()
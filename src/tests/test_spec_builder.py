@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+SARibbonSpecBuilder的构建耗时按category序号记录，pannel批量添加时只通知category布局一次
+"""
+from PyQt5.QtWidgets import QAction, QMainWindow
+
+from PySARibbon import SARibbonBar, SARibbonSpecBuilder
+from PySARibbon.SAWidgets.SARibbonPannelItem import SARibbonPannelItem
+
+
+def createBar():
+    window = QMainWindow()
+    bar = SARibbonBar(window)
+    window.setMenuWidget(bar)
+    return window, bar
+
+
+def test_same_title_build_times(app):
+    window, bar = createBar()
+    spec = {
+        'actions': [{'id': 'a'}, {'id': 'b'}],
+        'categories': [
+            {'title': 'Same', 'pannels': [{'title': 'p', 'items': ['a']}]},
+            {'title': 'Same', 'pannels': [{'title': 'p', 'items': [{'action': 'b', 'rp': 'small'}]}]},
+        ],
+    }
+    builder = SARibbonSpecBuilder(bar)
+    report = builder.build(spec)
+    assert sorted(report['categories']) == [0, 1]
+    pannel = bar.categoryByIndex(0).pannelByIndex(0)
+    assert pannel.layout().pannelItem(builder.action('a')).rowProportion == SARibbonPannelItem.RPLarge
+
+
+def test_pannel_batch_update(app):
+    window, bar = createBar()
+    pannel = bar.addCategoryPage('Main').addPannel('pannel')
+    requests = list()
+    bar.requestCategoryLayout = lambda category: requests.append(category)
+    with pannel.batchUpdate():
+        with pannel.batchUpdate():
+            pannel.addActions([QAction('action %d' % i, window) for i in range(5)])
+        assert pannel.isBatchUpdating()
+        pannel.addLargeAction(QAction('large', window))
+    assert not pannel.isBatchUpdating()
+    assert len(requests) == 1
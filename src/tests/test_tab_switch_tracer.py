@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+标签页切换跟踪在开启时挂接category的布局计时，布局耗时和等待第一次绘制的时间分开统计
+"""
+from PyQt5.QtWidgets import QAction
+
+from PySARibbon import SARibbonMainWindow
+from PySARibbon.SARibbonCategory import SARibbonCategoryPrivate
+from PySARibbon.SATools.SARibbonMethodHooks import SARibbonMethodHooks
+from PySARibbon.SARibbonTabSwitchTracer import TAB_SWITCH_PHASES
+
+
+def test_layout_phase(app):
+    w = SARibbonMainWindow()
+    rb = w.ribbonBar()
+    for c in range(2):
+        cat = rb.addCategoryPage('Cat %d' % c)
+        for p in range(3):
+            pannel = cat.addPannel('P%d' % p)
+            for i in range(4):
+                pannel.addLargeAction(QAction('a%d' % i, w))
+    w.resize(800, 400)
+    w.show()
+    for _ in range(10):
+        app.processEvents()
+    tracer = rb.tabSwitchTracer()
+    done = []
+    tracer.traceFinished.connect(done.append)
+    tracer.setEnabled(True)
+    assert SARibbonMethodHooks.isInstalled(SARibbonCategoryPrivate, 'updateItemGeometry', tracer)
+    for index in (1, 0, 1):
+        rb.setCurrentIndex(index)
+        for _ in range(10):
+            app.processEvents()
+    tracer.setEnabled(False)
+    assert not SARibbonMethodHooks.isInstalled(SARibbonCategoryPrivate, 'updateItemGeometry')
+    assert len(done) == 3
+    for trace in done:
+        phases = trace['phases_ms']
+        assert tuple(phases) == TAB_SWITCH_PHASES
+        assert all(v >= 0 for v in phases.values())
+        stamps = trace['timestamps']
+        assert abs(phases['layout'] + phases['wait'] - (stamps['first_paint'] - stamps['stacked_changed']) * 1000) < 1e-6
+        assert phases['layout'] <= trace['layout_ms']
+    assert any(trace['layout_calls'] > 0 for trace in done)
+    w.close()
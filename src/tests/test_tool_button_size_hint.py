@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+SARibbonToolButton的sizeHint缓存：状态不变时命中，状态改变后重新计算，缓存个数有上限
+"""
+from PyQt5.QtWidgets import QAction
+
+from PySARibbon.SAWidgets.SARibbonToolButton import SARibbonToolButton, SIZE_HINT_CACHE_MAX_COUNT
+
+
+def test_size_hint_cache_hits(app):
+    button = SARibbonToolButton()
+    button.setDefaultAction(QAction('action', button))
+    SARibbonToolButton.resetSizeHintCacheStatistics()
+    first = button.sizeHint()
+    assert button.sizeHint() == first
+    assert SARibbonToolButton.sizeHintCacheStatistics()['hits'] == 1
+    assert button.calcSizeHint() == first
+
+
+def test_size_hint_cache_limit(app):
+    button = SARibbonToolButton()
+    for i in range(SIZE_HINT_CACHE_MAX_COUNT + 3):
+        button.setText('text' * (i + 1))
+        assert button.sizeHint() == button.calcSizeHint()
+    assert len(button.m_sizeHintCache) == SIZE_HINT_CACHE_MAX_COUNT